@@ -3,6 +3,7 @@ Aplicação FastAPI para o Dashboard de Acidentes de Trânsito - Versão SQLite
 """
 from fastapi import FastAPI, Query, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 import uvicorn
 import os
 import sys
@@ -14,6 +15,7 @@ from dotenv import load_dotenv
 import logging
 from datetime import datetime
 import json
+import random
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, 
@@ -44,6 +46,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compressão gzip das respostas acima do tamanho mínimo (em bytes)
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=int(os.getenv('GZIP_MINIMUM_SIZE', '1024')),
+    compresslevel=int(os.getenv('GZIP_NIVEL', '6')),
+)
+
 # Dependência para obter sessão do banco de dados
 def get_db():
     db = SessionLocal()
@@ -88,8 +97,8 @@ async def get_acidentes(
             params['br'] = br
             
         if ano:
-            query += " AND strftime('%Y', data) = :ano"
-            params['ano'] = str(ano)
+            query += " AND ano = :ano"
+            params['ano'] = ano
         
         if causa:
             query += " AND causa_acidente = :causa"
@@ -138,46 +147,41 @@ async def get_estatisticas(
             params['uf'] = uf
             
         if ano:
-            query_base += " AND strftime('%Y', data) = :ano"
-            params['ano'] = str(ano)
-        
-        # Total de acidentes
-        query_acidentes = f"SELECT COUNT(*) AS total {query_base}"
-        total_acidentes = db.execute(text(query_acidentes), params).scalar()
-        
-        # Total de feridos
-        query_feridos = f"SELECT COALESCE(SUM(feridos), 0) AS total {query_base}"
-        total_feridos = db.execute(text(query_feridos), params).scalar()
-        
-        # Total de mortos
-        query_mortos = f"SELECT COALESCE(SUM(mortos), 0) AS total {query_base}"
-        total_mortos = db.execute(text(query_mortos), params).scalar()
+            query_base += " AND ano = :ano"
+            params['ano'] = ano
         
-        # Acidentes por causa
-        query_causas = f"""
+        # Uma única varredura agrupada por (causa, tipo): os totais e os
+        # rankings de causas e tipos são derivados dos mesmos grupos
+        query = f"""
         SELECT 
             causa_acidente AS causa, 
-            COUNT(*) AS total 
-        {query_base}
-        GROUP BY causa_acidente 
-        ORDER BY total DESC 
-        LIMIT 10
-        """
-        result_causas = db.execute(text(query_causas), params).fetchall()
-        acidentes_por_causa = [{'causa': row.causa, 'total': row.total} for row in result_causas]
-        
-        # Acidentes por tipo
-        query_tipos = f"""
-        SELECT 
             tipo_acidente AS tipo, 
-            COUNT(*) AS total 
+            COUNT(*) AS total,
+            COALESCE(SUM(feridos), 0) AS feridos,
+            COALESCE(SUM(mortos), 0) AS mortos
         {query_base}
-        GROUP BY tipo_acidente 
-        ORDER BY total DESC 
-        LIMIT 10
+        GROUP BY causa_acidente, tipo_acidente
         """
-        result_tipos = db.execute(text(query_tipos), params).fetchall()
-        acidentes_por_tipo = [{'tipo': row.tipo, 'total': row.total} for row in result_tipos]
+        result = db.execute(text(query), params).fetchall()
+        
+        total_acidentes = 0
+        total_feridos = 0
+        total_mortos = 0
+        totais_causa = {}
+        totais_tipo = {}
+        for row in result:
+            total_acidentes += row.total
+            total_feridos += row.feridos
+            total_mortos += row.mortos
+            totais_causa[row.causa] = totais_causa.get(row.causa, 0) + row.total
+            totais_tipo[row.tipo] = totais_tipo.get(row.tipo, 0) + row.total
+        
+        # Acidentes por causa e por tipo (top 10)
+        top_causas = sorted(totais_causa.items(), key=lambda x: x[1], reverse=True)[:10]
+        acidentes_por_causa = [{'causa': causa, 'total': total} for causa, total in top_causas]
+        
+        top_tipos = sorted(totais_tipo.items(), key=lambda x: x[1], reverse=True)[:10]
+        acidentes_por_tipo = [{'tipo': tipo, 'total': total} for tipo, total in top_tipos]
         
         return {
             "total_acidentes": total_acidentes,
@@ -287,6 +291,7 @@ async def get_pontos_mapa(
     causa: Optional[str] = None, 
     tipo: Optional[str] = None,
     limit: int = 1000,
+    semente: Optional[int] = None,
     db = Depends(get_db)
 ):
     try:
@@ -310,8 +315,8 @@ async def get_pontos_mapa(
             params['br'] = br
             
         if ano:
-            query += " AND strftime('%Y', data) = :ano"
-            params['ano'] = str(ano)
+            query += " AND ano = :ano"
+            params['ano'] = ano
         
         if causa:
             query += " AND causa_acidente = :causa"
@@ -321,11 +326,20 @@ async def get_pontos_mapa(
             query += " AND tipo_acidente = :tipo"
             params['tipo'] = tipo
         
-        query += " ORDER BY RANDOM() LIMIT :limit"
+        # Amostragem pela chave aleatória indexada 'amostra': percorre o índice a
+        # partir de um ponto inicial e lê apenas 'limit' linhas, sem ordenar a
+        # tabela inteira. A mesma semente devolve sempre a mesma amostra.
+        inicio = random.Random(semente).random() if semente is not None else random.random()
+        query_amostra = query + " AND amostra >= :inicio ORDER BY amostra LIMIT :limit"
+        params['inicio'] = inicio
         params['limit'] = limit
+        result = db.execute(text(query_amostra), params).fetchall()
         
-        # Executar consulta
-        result = db.execute(text(query), params).fetchall()
+        # Completar a amostra com o início do intervalo de chaves, se necessário
+        if len(result) < limit:
+            query_restante = query + " AND amostra < :inicio ORDER BY amostra LIMIT :limit"
+            params['limit'] = limit - len(result)
+            result += db.execute(text(query_restante), params).fetchall()
         
         # Converter para lista de dicionários
         pontos = []
@@ -355,8 +369,8 @@ async def get_estatisticas_por_ufs(
         params = {}
             
         if ano:
-            query_base += " AND strftime('%Y', data) = :ano"
-            params['ano'] = str(ano)
+            query_base += " AND ano = :ano"
+            params['ano'] = ano
         
         # Estatísticas por UF
         query = f"""
@@ -396,7 +410,7 @@ async def get_estatisticas_por_horas(
 ):
     try:
         # Construir consulta base
-        query_base = "FROM acidentes WHERE horario IS NOT NULL"
+        query_base = "FROM acidentes WHERE hora IS NOT NULL"
         params = {}
         
         if uf:
@@ -404,13 +418,13 @@ async def get_estatisticas_por_horas(
             params['uf'] = uf
             
         if ano:
-            query_base += " AND strftime('%Y', data) = :ano"
-            params['ano'] = str(ano)
+            query_base += " AND ano = :ano"
+            params['ano'] = ano
         
         # Estatísticas por hora
         query = f"""
         SELECT 
-            CAST(substr(horario, 1, 2) AS INTEGER) AS hora, 
+            hora, 
             COUNT(*) AS total_acidentes,
             COALESCE(SUM(mortos), 0) AS total_mortos,
             COALESCE(SUM(feridos), 0) AS total_feridos
@@ -0,0 +1,74 @@
+"""
+Script para avaliar os modelos de previsão com origem móvel (backtesting)
+
+Lê o CSV de acidentes (o mesmo usado pela API, em DATA_DIR) e, para vários
+cortes no histórico, ajusta cada modelo de tendência aos meses anteriores ao
+corte e compara a previsão dos meses seguintes com o observado, nas mesmas
+séries do treinamento (Brasil, UFs, rodovias com mais acidentes e tipos de
+acidente), em paralelo entre os núcleos. Reporta, por modelo, MAE, RMSE, MAPE
+e cobertura do intervalo de 95% de acidentes e mortes, o erro por horizonte e
+o tempo de ajuste e de previsão por série, para comparar o modelo atual
+(poisson_sazonal) com alternativas em precisão e custo.
+
+Uso:
+    python avaliar_modelos.py [--horizonte 12] [--passo 3] [--top-brs 30] [--processos 4] [--saida avaliacao.json]
+"""
+import os
+import sys
+import json
+import argparse
+import logging
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from backend.app.ml.avaliacao import avaliar_modelos
+from backend.app.ml.treinamento import TOP_BRS, versao_dados
+from backend.app.utils.data_loader import DataLoader
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('avaliar_modelos')
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Avalia os modelos de previsão com origem móvel (backtesting)")
+    parser.add_argument("--horizonte", type=int, default=12, help="Meses previstos a partir de cada corte")
+    parser.add_argument("--passo", type=int, default=3, help="Meses entre cortes consecutivos")
+    parser.add_argument("--top-brs", type=int, default=TOP_BRS, help="Rodovias com série própria")
+    parser.add_argument("--processos", type=int, help="Processos da avaliação (padrão: número de CPUs)")
+    parser.add_argument("--saida", help="Arquivo JSON para gravar o relatório completo")
+    args = parser.parse_args()
+
+    try:
+        loader = DataLoader()
+        inicio = time.perf_counter()
+        df = loader._load_data_sync()
+        logger.info(f"{len(df)} acidentes carregados em {time.perf_counter() - inicio:.1f} s")
+
+        relatorio = avaliar_modelos(df, args.horizonte, args.passo, args.top_brs, args.processos)
+        relatorio["versao_dados"] = versao_dados(loader.file_path)
+        logger.info(f"{relatorio['series']} séries, {len(relatorio['cortes'])} cortes "
+                    f"({relatorio['cortes'][0]} a {relatorio['cortes'][-1]}), horizonte de {relatorio['horizonte']} meses, "
+                    f"avaliadas em {relatorio['duracao_s']} s com {relatorio['processos']} processos")
+
+        logger.info(f"{'modelo':<18} {'MAE':>8} {'RMSE':>8} {'MAPE %':>8} {'cob. 95%':>9} "
+                    f"{'MAE mortes':>11} {'ajuste ms':>10} {'previsão ms':>12}")
+        for nome, modelo in relatorio["modelos"].items():
+            acidentes, mortes, latencia = modelo["acidentes"], modelo["mortes"], modelo["latencia"]
+            cobertura = "-" if acidentes["cobertura_95"] is None else f"{acidentes['cobertura_95']:.1f}"
+            logger.info(f"{nome:<18} {acidentes['mae']:>8.2f} {acidentes['rmse']:>8.2f} {acidentes['mape']:>8.2f} "
+                        f"{cobertura:>9} {mortes['mae']:>11.2f} {latencia['ajuste_ms_por_serie']:>10.4f} "
+                        f"{latencia['previsao_ms_por_serie']:>12.4f}")
+
+        if args.saida:
+            with open(args.saida, "w", encoding="utf-8") as f:
+                json.dump(relatorio, f, ensure_ascii=False, indent=2)
+            logger.info(f"Relatório gravado em {args.saida}")
+        logger.info("Processo concluído com sucesso!")
+    except Exception as e:
+        logger.error(f"Erro durante a execução: {e}")
+        raise
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from typing import List, Optional
-from sqlalchemy.orm import Session
-from backend.app.models.acidente import Acidente, AcidenteFilter, AcidenteResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.app.models.acidente import Acidente, AcidenteFilter, AcidenteResponse, CatalogoDimensoes
 from backend.app.services.acidente_service import AcidenteService
+from backend.app.services.dimensao_service import DimensaoService
 from backend.app.db.database import get_db
+from backend.app.utils.serializacao import RESPOSTAS_FORMATOS, resposta_negociada
 
 router = APIRouter()
 
-@router.get("/", response_model=List[AcidenteResponse])
+@router.get("/", response_model=List[AcidenteResponse], responses=RESPOSTAS_FORMATOS)
 async def listar_acidentes(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     uf: Optional[str] = Query(None, description="Estado (UF)"),
     ano: Optional[int] = Query(None, description="Ano do acidente"),
     causa: Optional[str] = Query(None, description="Causa do acidente"),
@@ -17,9 +19,15 @@ async def listar_acidentes(
     condicao_metereologica: Optional[str] = Query(None, description="Condição meteorológica"),
     limit: int = Query(100, description="Limite de resultados"),
     offset: int = Query(0, description="Offset para paginação"),
+    cursor: Optional[str] = Query(None, description="Cursor da próxima página (cabeçalho X-Next-Cursor da resposta anterior)"),
+    accept: Optional[str] = Header(None, description="Formato da resposta (JSON, colunar, Arrow ou MessagePack)"),
 ):
     """
     Retorna uma lista de acidentes com filtros opcionais.
+    
+    Quando a página está completa, o cabeçalho X-Next-Cursor traz o cursor
+    para buscar a página seguinte sem o custo de percorrer o offset.
+    O formato da resposta é negociado pelo cabeçalho Accept (veja api-docs.md).
     """
     filtros = AcidenteFilter(
         uf=uf,
@@ -28,52 +36,87 @@ async def listar_acidentes(
         tipo_acidente=tipo,
         condicao_metereologica=condicao_metereologica
     )
-    return await AcidenteService.get_acidentes(db, filtros, limit, offset)
+    try:
+        acidentes = await AcidenteService.get_acidentes(db, filtros, limit, offset, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    resposta = resposta_negociada(acidentes, list(AcidenteResponse.model_fields), accept)
+    if acidentes and len(acidentes) == limit:
+        resposta.headers["X-Next-Cursor"] = AcidenteService.codificar_cursor(acidentes[-1])
+    
+    return resposta
 
 @router.get("/total", response_model=int)
 async def contar_acidentes(
-    db: Session = Depends(get_db),
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     uf: Optional[str] = Query(None, description="Estado (UF)"),
     ano: Optional[int] = Query(None, description="Ano do acidente"),
     causa: Optional[str] = Query(None, description="Causa do acidente"),
     tipo: Optional[str] = Query(None, description="Tipo de acidente"),
     condicao_metereologica: Optional[str] = Query(None, description="Condição meteorológica"),
+    br: Optional[str] = Query(None, description="Rodovia (BR)"),
+    municipio: Optional[str] = Query(None, description="Município"),
+    estimativa: bool = Query(False, description="Aceitar total estimado para filtros sem contagem pré-agregada"),
 ):
     """
     Retorna o total de acidentes com filtros opcionais.
+    
+    Filtros por ano, UF, causa, tipo e condição meteorológica são respondidos
+    pelas contagens pré-agregadas. O cabeçalho X-Total-Exact indica se o total
+    é exato ("true") ou uma estimativa do banco ("false").
     """
     filtros = AcidenteFilter(
         uf=uf,
         ano=ano,
+        br=br,
+        municipio=municipio,
         causa_acidente=causa,
         tipo_acidente=tipo,
         condicao_metereologica=condicao_metereologica
     )
-    return await AcidenteService.count_acidentes(db, filtros)
+    total, exato = await AcidenteService.count_acidentes(db, filtros, estimativa)
+    response.headers["X-Total-Exact"] = "true" if exato else "false"
+    return total
+
+@router.get("/dimensoes", response_model=CatalogoDimensoes)
+async def listar_dimensoes(
+    db: AsyncSession = Depends(get_db),
+    ano: Optional[int] = Query(None, description="Ano do acidente"),
+    uf: Optional[str] = Query(None, description="Estado (UF)"),
+):
+    """
+    Retorna, em uma única chamada, os valores distintos de UF, rodovia, causa,
+    tipo e condição meteorológica, com o total de acidentes por ano e por UF.
+    
+    Com ano e/ou UF, apenas os valores presentes nesse recorte são retornados.
+    """
+    return await DimensaoService.get_catalogo(db, ano, uf)
 
 @router.get("/rodovias", response_model=List[str])
-async def listar_rodovias(db: Session = Depends(get_db)):
+async def listar_rodovias(db: AsyncSession = Depends(get_db)):
     """
     Retorna uma lista de todas as rodovias presentes nos dados.
     """
     return await AcidenteService.get_rodovias(db)
 
 @router.get("/causas", response_model=List[str])
-async def listar_causas(db: Session = Depends(get_db)):
+async def listar_causas(db: AsyncSession = Depends(get_db)):
     """
     Retorna uma lista de todas as causas de acidentes presentes nos dados.
     """
     return await AcidenteService.get_causas(db)
 
 @router.get("/tipos", response_model=List[str])
-async def listar_tipos(db: Session = Depends(get_db)):
+async def listar_tipos(db: AsyncSession = Depends(get_db)):
     """
     Retorna uma lista de todos os tipos de acidentes presentes nos dados.
     """
     return await AcidenteService.get_tipos(db)
 
 @router.get("/condicoes-meteorologicas", response_model=List[str])
-async def listar_condicoes_meteorologicas(db: Session = Depends(get_db)):
+async def listar_condicoes_meteorologicas(db: AsyncSession = Depends(get_db)):
     """
     Retorna uma lista de todas as condições meteorológicas presentes nos dados.
     """
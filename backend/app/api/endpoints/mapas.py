@@ -1,26 +1,31 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query
 from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from backend.app.services.mapa_service import MapaService
-from backend.app.models.ponto_mapa import PontoMapa, ClusterMapa, TrechoPerigoso
+from backend.app.models.ponto_mapa import PontoMapa, ClusterMapa, TrechoPerigoso, PontoHeatmap
 from backend.app.db.database import get_db
+from backend.app.utils.serializacao import RespostaJSON, RESPOSTAS_FORMATOS, resposta_negociada
 
 router = APIRouter()
 
-@router.get("/pontos", response_model=List[PontoMapa])
+@router.get("/pontos", response_model=List[PontoMapa], responses=RESPOSTAS_FORMATOS)
 async def obter_pontos_acidentes(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     uf: Optional[str] = Query(None, description="Estado (UF)"),
     ano: Optional[int] = Query(None, description="Ano dos acidentes"),
     br: Optional[str] = Query(None, description="Rodovia BR"),
     tipo_acidente: Optional[str] = Query(None, description="Tipo de acidente"),
     classificacao: Optional[str] = Query(None, description="Classificação do acidente"),
     limit: int = Query(1000, description="Limite de resultados"),
+    accept: Optional[str] = Header(None, description="Formato da resposta (JSON, colunar, Arrow ou MessagePack)"),
 ):
     """
     Retorna pontos de acidentes para visualização no mapa.
+    
+    O formato da resposta é negociado pelo cabeçalho Accept (veja api-docs.md).
     """
-    return await MapaService.get_pontos_acidentes(db, uf, ano, br, tipo_acidente, classificacao, limit)
+    pontos = await MapaService.get_pontos_acidentes(db, uf, ano, br, tipo_acidente, classificacao, limit)
+    return resposta_negociada(pontos, list(PontoMapa.model_fields), accept)
 
 @router.get("/clusters", response_model=List[ClusterMapa])
 async def obter_clusters_acidentes(
@@ -35,7 +40,7 @@ async def obter_clusters_acidentes(
 
 @router.get("/trechos-perigosos", response_model=List[TrechoPerigoso])
 async def obter_trechos_perigosos(
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     uf: Optional[str] = Query(None, description="Estado (UF)"),
     ano: Optional[int] = Query(None, description="Ano dos acidentes"),
     br: Optional[str] = Query(None, description="Rodovia BR"),
@@ -44,31 +49,54 @@ async def obter_trechos_perigosos(
     """
     Retorna os trechos mais perigosos com base na concentração de acidentes.
     """
-    return await MapaService.get_trechos_perigosos(db, uf, ano, br, top)
+    trechos = await MapaService.get_trechos_perigosos(db, uf, ano, br, top)
+    return RespostaJSON(trechos)
 
-@router.get("/heatmap", response_model=Dict[str, Any])
+@router.get("/heatmap", response_model=Dict[str, Any], responses=RESPOSTAS_FORMATOS)
 async def obter_dados_heatmap(
+    db: AsyncSession = Depends(get_db),
     uf: Optional[str] = Query(None, description="Estado (UF)"),
     ano: Optional[int] = Query(None, description="Ano dos acidentes"),
     tipo_acidente: Optional[str] = Query(None, description="Tipo de acidente"),
+    accept: Optional[str] = Header(None, description="Formato da resposta (JSON, colunar, Arrow ou MessagePack)"),
 ):
     """
     Retorna dados para geração de mapa de calor de concentração de acidentes.
+    
+    O formato dos pontos é negociado pelo cabeçalho Accept (veja api-docs.md).
     """
-    return await mapa_service.get_heatmap_data(uf, ano, tipo_acidente)
+    heatmap = await MapaService.get_heatmap_data(db, uf, ano, tipo_acidente)
+    pontos = heatmap.pop("data")
+    return resposta_negociada(pontos, list(PontoHeatmap.model_fields), accept, metadados=heatmap)
 
 @router.get("/ufs-geojson", response_model=Dict[str, Any])
-async def obter_geojson_ufs():
+async def obter_geojson_ufs(
+    zoom: Optional[int] = Query(None, ge=0, le=22, description="Nível de zoom do mapa (omitir para a geometria completa)"),
+    accept_encoding: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Retorna o GeoJSON com os limites dos estados brasileiros.
+    
+    Zooms menores recebem geometrias simplificadas, bem mais leves. O corpo é
+    pré-comprimido (gzip/brotli) e servido com ETag, permitindo respostas 304
+    quando o navegador já tem a versão atual.
     """
-    return await MapaService.get_ufs_geojson()
+    corpo = await MapaService.get_ufs_geojson_comprimido(zoom)
+    return corpo.responder(accept_encoding, if_none_match)
 
 @router.get("/rodovias-geojson", response_model=Dict[str, Any])
 async def obter_geojson_rodovias(
-    uf: Optional[str] = Query(None, description="Estado (UF)")
+    uf: Optional[str] = Query(None, description="Estado (UF)"),
+    accept_encoding: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
 ):
     """
-    Retorna o GeoJSON com as rodovias federais.
+    Retorna o GeoJSON com o traçado aproximado das rodovias federais.
+    
+    O traçado é derivado das coordenadas dos acidentes por gerar_rodovias_geojson.py
+    e mantido em memória, já recortado por UF. O corpo é pré-comprimido
+    (gzip/brotli) e servido com ETag.
     """
-    return await MapaService.get_rodovias_geojson(uf)
\ No newline at end of file
+    corpo = await MapaService.get_rodovias_geojson_comprimido(uf)
+    return corpo.responder(accept_encoding, if_none_match)
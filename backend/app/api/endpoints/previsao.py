@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Query, Body
 from typing import List, Optional, Dict, Any
 from backend.app.services.previsao_service import PrevisaoService
-from backend.app.models.previsao import PrevisaoRisco, CalculadoraRiscoInput, PrevisaoTendencia
+from backend.app.models.previsao import PrevisaoRisco, CalculadoraRiscoInput, CalculadoraRiscoLoteInput, TrajetoInput, PrevisaoTendencia
 
 router = APIRouter()
 previsao_service = PrevisaoService()
@@ -28,18 +28,47 @@ async def calcular_risco_personalizado(
     """
     return await previsao_service.calcular_risco_personalizado(dados)
 
+@router.post("/calculadora-risco/lote", response_model=List[Dict[str, Any]])
+async def calcular_risco_lote(
+    dados: CalculadoraRiscoLoteInput = Body(...)
+):
+    """
+    Calcula o risco personalizado de vários trechos/viagens em uma única
+    requisição (até 1000), retornando os resultados na ordem das entradas.
+    """
+    return await previsao_service.calcular_risco_lote(dados.itens)
+
+@router.post("/risco-trajeto", response_model=Dict[str, Any])
+async def calcular_risco_trajeto(
+    dados: TrajetoInput = Body(...)
+):
+    """
+    Calcula o risco de uma viagem por um trajeto com vários trechos
+    (rodovias e UFs), com o resultado de cada trecho e o total do trajeto.
+    """
+    return await previsao_service.calcular_risco_trajeto(dados)
+
 @router.get("/tendencias", response_model=List[PrevisaoTendencia])
 async def obter_tendencias_acidentes(
     uf: Optional[str] = Query(None, description="Estado (UF)"),
     br: Optional[str] = Query(None, description="Rodovia BR"),
     tipo_acidente: Optional[str] = Query(None, description="Tipo de acidente"),
-    meses_futuros: int = Query(12, description="Número de meses para previsão futura")
+    meses_futuros: int = Query(12, ge=1, le=60, description="Número de meses para previsão futura")
 ):
     """
     Retorna a previsão de tendências de acidentes para os próximos meses.
     """
     return await previsao_service.prever_tendencias(uf, br, tipo_acidente, meses_futuros)
 
+@router.get("/tendencias/ufs", response_model=Dict[str, List[PrevisaoTendencia]])
+async def obter_tendencias_ufs(
+    meses_futuros: int = Query(12, ge=1, le=60, description="Número de meses para previsão futura")
+):
+    """
+    Retorna a previsão de tendências de acidentes e mortes de todas as UFs.
+    """
+    return await previsao_service.prever_tendencias_ufs(meses_futuros)
+
 @router.get("/fatores-risco", response_model=Dict[str, Any])
 async def obter_fatores_risco():
     """
@@ -0,0 +1,44 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from typing import Dict, Any
+from backend.app.ml.armazem import ModeloNaoEncontradoError, armazem_modelos
+from backend.app.services.aquecimento_service import AquecimentoService
+from backend.app.utils.executor import executor_calculos
+
+router = APIRouter()
+
+@router.get("/executor", response_model=Dict[str, Any])
+async def obter_metricas_executor():
+    """
+    Retorna as métricas do executor dos cálculos pesados: tarefas em execução e
+    na fila, contadores de tarefas concluídas, com falha, recusadas (fila cheia)
+    e expiradas (tempo limite), e os tempos médio e máximo de fila e execução.
+    """
+    return executor_calculos.metricas()
+
+@router.get("/pronto", response_model=Dict[str, Any])
+async def verificar_prontidao():
+    """
+    Indica se o processo terminou o aquecimento (dados, agregados, modelo de
+    previsão e mapas) e está pronto para receber tráfego: 200 quando pronto,
+    503 enquanto aquece ou se alguma etapa falhou. Inclui o estado e a duração
+    de cada etapa.
+    """
+    estado = AquecimentoService.estado()
+    return JSONResponse(status_code=200 if estado["pronto"] else 503, content=estado)
+
+@router.get("/modelos", response_model=Dict[str, Any])
+async def obter_modelos():
+    """
+    Retorna os metadados da versão atual de cada modelo do armazém (versão dos
+    dados, features, data do treinamento e métricas de validação) e as versões
+    disponíveis. Modelos ainda não treinados aparecem com metadados nulos.
+    """
+    modelos = {}
+    for nome in ["tendencias", "fatal"]:
+        try:
+            metadados = armazem_modelos.metadados(nome)
+        except ModeloNaoEncontradoError:
+            metadados = None
+        modelos[nome] = {"atual": metadados, "versoes": armazem_modelos.versoes(nome)}
+    return modelos
@@ -1,9 +1,10 @@
 from fastapi import APIRouter
-from backend.app.api.endpoints import acidentes, estatisticas, mapas, previsao
+from backend.app.api.endpoints import acidentes, estatisticas, mapas, previsao, sistema
 
 api_router = APIRouter()
 
 api_router.include_router(acidentes.router, prefix="/acidentes", tags=["acidentes"])
 api_router.include_router(estatisticas.router, prefix="/estatisticas", tags=["estatisticas"])
 api_router.include_router(mapas.router, prefix="/mapas", tags=["mapas"])
-api_router.include_router(previsao.router, prefix="/previsao", tags=["previsao"])
\ No newline at end of file
+api_router.include_router(previsao.router, prefix="/previsao", tags=["previsao"])
+api_router.include_router(sistema.router, prefix="/sistema", tags=["sistema"])
\ No newline at end of file
@@ -1,4 +1,5 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import sys
@@ -7,18 +8,38 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
 from backend.app.core.config import settings
 
 # Criar engine do SQLAlchemy conectando com PostgreSQL
+# (usada pelos scripts de carga e manutenção, que rodam fora do event loop)
 engine = create_engine(settings.DATABASE_URL)
 
 # Criar uma classe de sessão local
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def _opcoes_pool() -> dict:
+    """Opções do pool de conexões da engine assíncrona, conforme settings."""
+    if settings.ASYNC_DATABASE_URL.startswith("sqlite") and ":memory:" in settings.ASYNC_DATABASE_URL:
+        # Banco em memória usa uma conexão única (StaticPool), sem opções de pool
+        return {}
+    return {
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        # Descarta conexões derrubadas pelo servidor antes de entregá-las a uma requisição
+        "pool_pre_ping": True,
+    }
+
+# Engine assíncrona (asyncpg/aiosqlite) usada pelos endpoints da API, para que
+# as consultas não bloqueiem o event loop
+async_engine = create_async_engine(settings.ASYNC_DATABASE_URL, **_opcoes_pool())
+
+# Sessões assíncronas; expire_on_commit=False mantém os valores lidos acessíveis
+# sem novas consultas implícitas (que não são permitidas em modo assíncrono)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 # Criar base para modelos declarativos
 Base = declarative_base()
 
 # Dependência para obter a sessão de banco de dados
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
@@ -3,12 +3,13 @@ import numpy as np
 import logging
 from datetime import datetime
 from sqlalchemy.orm import Session
+from sqlalchemy import func, insert, select
 from sqlalchemy.exc import SQLAlchemyError
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
 from backend.app.db.database import Base, engine
-from backend.app.db.models import Acidente, TrechoPerigoso
+from backend.app.db.models import Acidente, TrechoPerigoso, ContagemAcidentes, VersaoDados
 from backend.app.core.config import settings
 import json
 
@@ -21,6 +22,12 @@ def create_tables():
     logger.info("Criando tabelas no banco de dados...")
     try:
         Base.metadata.create_all(bind=engine)
+        
+        # create_all não adiciona índices novos a tabelas que já existem
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=engine, checkfirst=True)
+        
         logger.info("Tabelas criadas com sucesso!")
     except SQLAlchemyError as e:
         logger.error(f"Erro ao criar tabelas: {e}")
@@ -118,6 +125,24 @@ def process_csv(file_path: str) -> pd.DataFrame:
         logger.error(f"Erro ao processar o arquivo CSV: {e}")
         raise
 
+def registrar_alteracao(db: Session, tabela: str = "acidentes"):
+    """
+    Incrementa a versão dos dados de uma tabela, para que os caches da API
+    (ex.: o catálogo de dimensões) sejam reconstruídos.
+    
+    Deve ser chamada, na mesma transação, por toda escrita na tabela.
+    
+    Args:
+        db: Sessão do banco de dados
+        tabela: Nome da tabela alterada
+    """
+    registro = db.get(VersaoDados, tabela)
+    if registro is None:
+        registro = VersaoDados(tabela=tabela, versao=0)
+        db.add(registro)
+    registro.versao += 1
+    registro.atualizado_em = datetime.now()
+
 def populate_db_from_csv(db: Session, csv_path: str, batch_size: int = 1000):
     """
     Popula o banco de dados com os dados do CSV.
@@ -165,6 +190,7 @@ def populate_db_from_csv(db: Session, csv_path: str, batch_size: int = 1000):
                 db.add(acidente)
             
             # Commit do lote
+            registrar_alteracao(db)
             db.commit()
             logger.info(f"Importados registros {i+1} até {batch_end} de {total_records}")
         
@@ -330,6 +356,47 @@ def gerar_trechos_perigosos(db: Session, ano: int = None):
         logger.error(f"Erro ao gerar trechos perigosos: {e}")
         raise
 
+def gerar_contagens(db: Session):
+    """
+    Regenera as contagens pré-agregadas de acidentes por ano, UF, causa, tipo e
+    condição meteorológica, usadas para responder /acidentes/total.
+    
+    Deve ser executada sempre que a tabela de acidentes for alterada; também
+    registra a alteração na versão dos dados (veja registrar_alteracao).
+    
+    Args:
+        db: Sessão do banco de dados
+    """
+    try:
+        logger.info("Gerando contagens pré-agregadas de acidentes...")
+        
+        dimensoes = [
+            Acidente.ano,
+            Acidente.uf,
+            Acidente.causa_acidente,
+            Acidente.tipo_acidente,
+            Acidente.condicao_metereologica,
+        ]
+        agregado = select(*dimensoes, func.count(Acidente.id)).group_by(*dimensoes)
+        
+        db.query(ContagemAcidentes).delete()
+        db.execute(
+            insert(ContagemAcidentes).from_select(
+                ['ano', 'uf', 'causa_acidente', 'tipo_acidente', 'condicao_metereologica', 'total'],
+                agregado
+            )
+        )
+        registrar_alteracao(db)
+        db.commit()
+        
+        total_grupos = db.query(func.count(ContagemAcidentes.id)).scalar()
+        logger.info(f"Contagens geradas com sucesso! Total de combinações: {total_grupos}")
+    
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Erro ao gerar contagens de acidentes: {e}")
+        raise
+
 def init_db():
     """Inicializa o banco de dados e carrega os dados iniciais."""
     from backend.app.db.database import SessionLocal
@@ -346,6 +413,9 @@ def init_db():
             
             # Gerar trechos perigosos
             gerar_trechos_perigosos(db)
+            
+            # Gerar contagens pré-agregadas para os totais filtrados
+            gerar_contagens(db)
         else:
             logger.warning(f"Arquivo CSV não encontrado em {csv_path}. Pulando importação de dados.")
         
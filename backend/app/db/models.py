@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, Time, Boolean, ForeignKey, JSON
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Time, Boolean, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from backend.app.db.database import Base
 from datetime import date, time
@@ -49,6 +49,17 @@ class Acidente(Base):
     regional = Column(String)
     delegacia = Column(String)
     uop = Column(String)
+    
+    # Índice na mesma ordem da listagem paginada (data_inversa DESC NULLS LAST,
+    # id DESC), usado tanto pelo offset quanto pela paginação por cursor.
+    # O SQLite não aceita NULLS LAST em índices, mas já ordena NULL por último
+    # em DESC, então usa o índice simples percorrido de trás para frente.
+    __table_args__ = (
+        Index('ix_acidentes_data_inversa_id', data_inversa.desc().nulls_last(), id.desc())
+            .ddl_if(dialect='postgresql'),
+        Index('ix_acidentes_data_inversa_id_simples', data_inversa, id)
+            .ddl_if(callable_=lambda ddl, target, bind, **kw: kw['dialect'].name != 'postgresql'),
+    )
 
 class TrechoPerigoso(Base):
     """
@@ -72,4 +83,39 @@ class TrechoPerigoso(Base):
     principais_causas = Column(JSON) 
     municipios = Column(JSON)
     horarios_criticos = Column(JSON)
-    coordenadas = Column(JSON)  # JSON array de coordenadas para o polyline
\ No newline at end of file
+    coordenadas = Column(JSON)  # JSON array de coordenadas para o polyline
+
+class ContagemAcidentes(Base):
+    """
+    Modelo SQLAlchemy para a tabela de contagens pré-agregadas de acidentes.
+    Cada linha guarda o total de acidentes de uma combinação de ano, UF, causa,
+    tipo e condição meteorológica, permitindo responder totais filtrados sem
+    percorrer a tabela de acidentes. É regenerada por init_db.gerar_contagens.
+    """
+    __tablename__ = "contagem_acidentes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    ano = Column(Integer)
+    uf = Column(String(2))
+    causa_acidente = Column(String)
+    tipo_acidente = Column(String)
+    condicao_metereologica = Column(String)
+    total = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index('ix_contagem_acidentes_ano_uf', ano, uf),
+        Index('ix_contagem_acidentes_uf', uf),
+    )
+
+class VersaoDados(Base):
+    """
+    Modelo SQLAlchemy para a versão dos dados de cada tabela.
+    Os scripts de carga incrementam a versão de uma tabela a cada escrita
+    (init_db.registrar_alteracao), e os caches da API a usam para saber se
+    precisam ser reconstruídos.
+    """
+    __tablename__ = "versao_dados"
+
+    tabela = Column(String, primary_key=True)
+    versao = Column(Integer, nullable=False, default=0)
+    atualizado_em = Column(DateTime)
@@ -1,12 +1,35 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 # Fix import paths for local running
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 from backend.app.api.routes import api_router
+from backend.app.api.endpoints.estatisticas import estatistica_service
+from backend.app.api.endpoints.previsao import previsao_service
 from backend.app.core.config import settings
+from backend.app.db.database import async_engine
+from backend.app.ml.armazem import ModeloNaoEncontradoError
+from backend.app.services.aquecimento_service import AquecimentoService
+from backend.app.utils.executor import FilaCheiaError, TempoEsgotadoError, executor_calculos
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Aquecer dados, agregados, modelo de previsão e GeoJSON em segundo plano;
+    # as requisições já são atendidas enquanto isso (veja /sistema/pronto)
+    aquecimento = AquecimentoService.iniciar(estatistica_service, previsao_service)
+    yield
+    if aquecimento is not None and not aquecimento.done():
+        aquecimento.cancel()
+        await asyncio.gather(aquecimento, return_exceptions=True)
+    # Fechar as conexões do pool e o executor de cálculos ao encerrar o processo
+    await async_engine.dispose()
+    executor_calculos.encerrar()
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -15,6 +38,7 @@ app = FastAPI(
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # Configuração de CORS
@@ -24,8 +48,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Exact"],
+)
+
+# Compressão gzip das respostas acima do tamanho mínimo (respostas que já
+# definem Content-Encoding, como os GeoJSON pré-comprimidos, não são alteradas)
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=settings.GZIP_MINIMUM_SIZE,
+    compresslevel=settings.GZIP_NIVEL,
 )
 
+# Executor de cálculos sobrecarregado: recusar logo, sugerindo nova tentativa
+@app.exception_handler(FilaCheiaError)
+async def fila_cheia_handler(request: Request, exc: FilaCheiaError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+@app.exception_handler(TempoEsgotadoError)
+async def tempo_esgotado_handler(request: Request, exc: TempoEsgotadoError):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+# Modelo de previsão ainda não treinado (veja treinar_modelos.py)
+@app.exception_handler(ModeloNaoEncontradoError)
+async def modelo_nao_encontrado_handler(request: Request, exc: ModeloNaoEncontradoError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
 # Incluir as rotas da API
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -0,0 +1,107 @@
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import joblib
+from backend.app.core.config import settings
+
+class ModeloNaoEncontradoError(Exception):
+    """Não há modelo treinado no armazém com o nome (ou a versão) pedido."""
+
+class ArmazemModelos:
+    """
+    Armazém local de modelos treinados, versionados por nome.
+
+    Cada versão fica em <diretorio>/<nome>/<versao>/, com o modelo serializado
+    pelo joblib (modelo.joblib, sem compressão, para que os arrays NumPy possam
+    ser mapeados em memória na carga) e seus metadados (metadados.json: versão
+    dos dados, features, data do treinamento e métricas). O arquivo
+    <diretorio>/<nome>/ATUAL indica a versão servida pela API.
+    """
+
+    def __init__(self, diretorio: str):
+        self.diretorio = diretorio
+
+    def salvar(self, nome: str, modelo: Any, metadados: Dict[str, Any]) -> str:
+        """
+        Grava uma nova versão do modelo e a torna a versão atual.
+
+        Args:
+            nome: Nome do modelo (ex.: 'tendencias')
+            modelo: Objeto treinado (serializável pelo joblib)
+            metadados: Versão dos dados, features, métricas etc.
+
+        Returns:
+            Versão gravada (data e hora do treinamento, ex.: '20240131T153000')
+        """
+        treinado_em = datetime.now()
+        versao = treinado_em.strftime("%Y%m%dT%H%M%S")
+        pasta = os.path.join(self.diretorio, nome, versao)
+        os.makedirs(pasta, exist_ok=True)
+
+        joblib.dump(modelo, os.path.join(pasta, "modelo.joblib"))
+        metadados = {"nome": nome, "versao": versao, "treinado_em": treinado_em.isoformat(timespec="seconds"), **metadados}
+        with open(os.path.join(pasta, "metadados.json"), "w", encoding="utf-8") as f:
+            json.dump(metadados, f, ensure_ascii=False, indent=2)
+
+        # Trocar a versão atual só depois de o modelo estar completamente gravado
+        atual = os.path.join(self.diretorio, nome, "ATUAL")
+        with open(atual + ".tmp", "w", encoding="utf-8") as f:
+            f.write(versao)
+        os.replace(atual + ".tmp", atual)
+        return versao
+
+    def versao_atual(self, nome: str) -> str:
+        """
+        Retorna a versão atual do modelo.
+
+        Raises:
+            ModeloNaoEncontradoError: Se o modelo nunca foi treinado
+        """
+        try:
+            with open(os.path.join(self.diretorio, nome, "ATUAL"), encoding="utf-8") as f:
+                return f.read().strip()
+        except FileNotFoundError:
+            raise ModeloNaoEncontradoError(
+                f"Modelo '{nome}' não encontrado em {self.diretorio}; execute python treinar_modelos.py"
+            )
+
+    def versoes(self, nome: str) -> List[str]:
+        """Retorna as versões gravadas do modelo, da mais antiga para a mais recente."""
+        pasta = os.path.join(self.diretorio, nome)
+        if not os.path.isdir(pasta):
+            return []
+        return sorted(v for v in os.listdir(pasta) if os.path.isdir(os.path.join(pasta, v)))
+
+    def metadados(self, nome: str, versao: Optional[str] = None) -> Dict[str, Any]:
+        """Retorna os metadados de uma versão do modelo (a atual, se não informada)."""
+        versao = versao or self.versao_atual(nome)
+        with open(os.path.join(self.diretorio, nome, versao, "metadados.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def carregar(self, nome: str, versao: Optional[str] = None) -> Tuple[Any, Dict[str, Any]]:
+        """
+        Carrega uma versão do modelo (a atual, se não informada).
+
+        Os arrays NumPy do modelo são mapeados em memória (somente leitura), então
+        os processos da API que carregam a mesma versão compartilham as páginas
+        do arquivo em vez de manter cópias próprias.
+
+        Args:
+            nome: Nome do modelo
+            versao: Versão específica, ou None para a atual
+
+        Returns:
+            Tupla (modelo, metadados)
+
+        Raises:
+            ModeloNaoEncontradoError: Se o modelo ou a versão não existirem
+        """
+        versao = versao or self.versao_atual(nome)
+        caminho = os.path.join(self.diretorio, nome, versao, "modelo.joblib")
+        if not os.path.exists(caminho):
+            raise ModeloNaoEncontradoError(f"Versão '{versao}' do modelo '{nome}' não encontrada em {self.diretorio}")
+        return joblib.load(caminho, mmap_mode="r"), self.metadados(nome, versao)
+
+# Armazém usado pela API e pelo comando de treinamento
+armazem_modelos = ArmazemModelos(settings.MODELOS_DIR)
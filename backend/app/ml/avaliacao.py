@@ -0,0 +1,222 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from backend.app.ml.sazonal import MESES_MINIMOS, ajustar_poisson, matriz_sazonal, prever_poisson
+from backend.app.ml.treinamento import TOP_BRS, series_segmentos
+
+# Ajuste de um modelo: (contagens S x t, índice absoluto do primeiro mês) -> estado
+Ajuste = Callable[[np.ndarray, int], Any]
+# Previsão: (estado, índice do primeiro mês, índices dos meses futuros) ->
+# (previsão, limite inferior, limite superior), S x h (limites None se o modelo não tiver intervalo)
+Previsao = Callable[[Any, int, np.ndarray], Tuple[np.ndarray, Optional[np.ndarray], Optional[np.ndarray]]]
+
+def _ajustar_poisson_sazonal(Y: np.ndarray, origem: int) -> Any:
+    return ajustar_poisson(Y, matriz_sazonal(origem + np.arange(Y.shape[1]), origem))
+
+def _prever_poisson_sazonal(ajuste: Any, origem: int, indices: np.ndarray):
+    return prever_poisson(*ajuste, matriz_sazonal(indices, origem))
+
+def _ajustar_poisson_tendencia(Y: np.ndarray, origem: int) -> Any:
+    return ajustar_poisson(Y, matriz_sazonal(origem + np.arange(Y.shape[1]), origem)[:, :2])
+
+def _prever_poisson_tendencia(ajuste: Any, origem: int, indices: np.ndarray):
+    return prever_poisson(*ajuste, matriz_sazonal(indices, origem)[:, :2])
+
+def _ajustar_ingenuo_sazonal(Y: np.ndarray, origem: int) -> Any:
+    return Y[:, -12:], origem + Y.shape[1]
+
+def _prever_ingenuo_sazonal(ajuste: Any, origem: int, indices: np.ndarray):
+    ultimos_12, proximo = ajuste
+    return ultimos_12[:, (indices - proximo) % 12], None, None
+
+def _ajustar_media_12_meses(Y: np.ndarray, origem: int) -> Any:
+    return Y[:, -12:].mean(axis=1)
+
+def _prever_media_12_meses(ajuste: Any, origem: int, indices: np.ndarray):
+    return np.repeat(ajuste[:, None], len(indices), axis=1), None, None
+
+# Modelos avaliados: o usado pela API (poisson_sazonal) e referências simples
+MODELOS: Dict[str, Tuple[Ajuste, Previsao]] = {
+    "poisson_sazonal": (_ajustar_poisson_sazonal, _prever_poisson_sazonal),
+    "poisson_tendencia": (_ajustar_poisson_tendencia, _prever_poisson_tendencia),
+    "ingenuo_sazonal": (_ajustar_ingenuo_sazonal, _prever_ingenuo_sazonal),
+    "media_12_meses": (_ajustar_media_12_meses, _prever_media_12_meses),
+}
+
+def origens_avaliacao(meses: int, horizonte: int, passo: int) -> List[int]:
+    """
+    Pontos de corte da avaliação com origem móvel.
+
+    Args:
+        meses: Tamanho das séries
+        horizonte: Meses previstos a partir de cada corte
+        passo: Meses entre cortes consecutivos
+
+    Returns:
+        Número de meses de treino de cada corte, em ordem crescente; o último
+        corte é o mais recente com horizonte completo
+    """
+    return sorted(range(meses - horizonte, MESES_MINIMOS - 1, -passo))
+
+def _avaliar_lote(
+    origem: int,
+    contagens: np.ndarray,
+    cortes: List[int],
+    horizonte: int
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Avalia todos os modelos em um lote de séries (executado em um processo do pool).
+
+    Em cada corte, cada modelo é ajustado aos meses anteriores de todas as
+    séries do lote (acidentes e mortes juntos, em uma única chamada) e prevê
+    os horizonte meses seguintes. O tempo de ajuste e de previsão de cada
+    chamada é medido.
+
+    Args:
+        origem: Índice absoluto do primeiro mês
+        contagens: Séries do lote, s x T x 2 (acidentes, mortes)
+        cortes: Meses de treino de cada corte (veja origens_avaliacao)
+        horizonte: Meses previstos em cada corte
+
+    Returns:
+        {modelo: {"previsao", "inferior", "superior": s x 2 x cortes x horizonte
+        (limites NaN se o modelo não tiver intervalo), "ajuste_s", "previsao_s":
+        tempo total gasto no lote}}
+    """
+    s, T, _ = contagens.shape
+    Y = contagens.transpose(0, 2, 1).reshape(s * 2, T)
+
+    resultados = {}
+    for nome, (ajustar, prever) in MODELOS.items():
+        formato = (s * 2, len(cortes), horizonte)
+        previsao, inferior, superior = np.empty(formato), np.full(formato, np.nan), np.full(formato, np.nan)
+        tempo_ajuste = tempo_previsao = 0.0
+        for c, corte in enumerate(cortes):
+            inicio = time.perf_counter()
+            ajuste = ajustar(Y[:, :corte], origem)
+            meio = time.perf_counter()
+            p, inf, sup = prever(ajuste, origem, origem + corte + np.arange(horizonte))
+            tempo_ajuste += meio - inicio
+            tempo_previsao += time.perf_counter() - meio
+
+            previsao[:, c] = p
+            if inf is not None:
+                inferior[:, c], superior[:, c] = inf, sup
+
+        resultados[nome] = {
+            "previsao": previsao.reshape(s, 2, len(cortes), horizonte),
+            "inferior": inferior.reshape(s, 2, len(cortes), horizonte),
+            "superior": superior.reshape(s, 2, len(cortes), horizonte),
+            "ajuste_s": tempo_ajuste,
+            "previsao_s": tempo_previsao,
+        }
+    return resultados
+
+def _metricas(previsto: np.ndarray, real: np.ndarray, inferior: np.ndarray, superior: np.ndarray) -> Dict[str, Any]:
+    """MAE, RMSE, MAPE (com denominador mínimo 1) e cobertura do intervalo de 95%."""
+    erro = previsto - real
+    metricas = {
+        "mae": round(float(np.abs(erro).mean()), 3),
+        "rmse": round(float(np.sqrt((erro ** 2).mean())), 3),
+        "mape": round(float((np.abs(erro) / np.maximum(real, 1)).mean() * 100), 2),
+        "cobertura_95": None,
+    }
+    if not np.isnan(inferior).all():
+        metricas["cobertura_95"] = round(float(((real >= inferior) & (real <= superior)).mean() * 100), 1)
+    return metricas
+
+def avaliar_modelos(
+    df: pd.DataFrame,
+    horizonte: int = 12,
+    passo: int = 3,
+    top_brs: int = TOP_BRS,
+    processos: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Avaliação com origem móvel (backtesting) dos modelos de tendência.
+
+    As séries mensais são as mesmas do treinamento (Brasil, UFs, rodovias com
+    mais acidentes e tipos de acidente). Para cada corte, do primeiro com
+    MESES_MINIMOS meses de treino até o último com horizonte completo, cada
+    modelo é ajustado aos meses anteriores e prevê os meses seguintes, que
+    são comparados aos valores observados. As séries são divididas em lotes
+    avaliados em paralelo por um pool de processos.
+
+    Args:
+        df: DataFrame de acidentes pré-processado (veja DataLoader)
+        horizonte: Meses previstos a partir de cada corte
+        passo: Meses entre cortes consecutivos
+        top_brs: Número de rodovias com série própria
+        processos: Processos do pool (padrão: número de CPUs)
+
+    Returns:
+        Relatório com, por modelo: métricas de acidentes e de mortes, MAPE dos
+        acidentes por dimensão, MAE dos acidentes por horizonte e latência de
+        ajuste e de previsão por série
+
+    Raises:
+        ValueError: Se o histórico não comportar ao menos um corte
+    """
+    origem, series = series_segmentos(df, top_brs)
+    chaves = list(series)
+    contagens = np.stack([series[chave] for chave in chaves])
+    T = contagens.shape[1]
+    cortes = origens_avaliacao(T, horizonte, passo)
+    if not cortes:
+        raise ValueError(
+            f"Histórico insuficiente: são necessários ao menos {MESES_MINIMOS + horizonte} meses "
+            f"para avaliar previsões de {horizonte} meses"
+        )
+
+    processos = processos or os.cpu_count() or 1
+    lotes = np.array_split(contagens, min(len(chaves), processos))
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        avaliados = list(pool.map(
+            _avaliar_lote, [origem] * len(lotes), lotes, [cortes] * len(lotes), [horizonte] * len(lotes)
+        ))
+    duracao = time.perf_counter() - inicio
+
+    # Valores observados: S x 2 x cortes x horizonte
+    janelas = np.array(cortes)[:, None] + np.arange(horizonte)
+    real = contagens[:, janelas, :].transpose(0, 3, 1, 2)
+    dimensoes = np.array([chave[0] for chave in chaves])
+    ajustes_por_serie = len(chaves) * 2 * len(cortes)
+
+    modelos: Dict[str, Any] = {}
+    for nome in MODELOS:
+        previsao, inferior, superior = (
+            np.concatenate([lote[nome][campo] for lote in avaliados])
+            for campo in ("previsao", "inferior", "superior")
+        )
+        acidentes = (previsao[:, 0], real[:, 0], inferior[:, 0], superior[:, 0])
+        modelos[nome] = {
+            "acidentes": _metricas(*acidentes),
+            "mortes": _metricas(previsao[:, 1], real[:, 1], inferior[:, 1], superior[:, 1]),
+            "mape_acidentes_por_dimensao": {
+                dimensao: _metricas(*(valores[dimensoes == dimensao] for valores in acidentes))["mape"]
+                for dimensao in dict.fromkeys(dimensoes)
+            },
+            "mae_acidentes_por_horizonte": [
+                round(float(v), 3) for v in np.abs(previsao[:, 0] - real[:, 0]).mean(axis=(0, 1))
+            ],
+            "latencia": {
+                "ajuste_ms_por_serie": round(sum(lote[nome]["ajuste_s"] for lote in avaliados) / ajustes_por_serie * 1000, 4),
+                "previsao_ms_por_serie": round(sum(lote[nome]["previsao_s"] for lote in avaliados) / ajustes_por_serie * 1000, 4),
+            },
+        }
+
+    mes = lambda indice: f"{indice // 12}-{indice % 12 + 1:02d}"
+    return {
+        "periodo": [mes(origem), mes(origem + T - 1)],
+        "series": len(chaves),
+        "horizonte": horizonte,
+        # Primeiro mês previsto em cada corte
+        "cortes": [mes(origem + corte) for corte in cortes],
+        "processos": processos,
+        "duracao_s": round(duracao, 2),
+        "modelos": modelos,
+    }
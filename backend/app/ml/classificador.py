@@ -0,0 +1,312 @@
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+# Features do classificador de acidentes fatais: as condições conhecidas
+# antes da viagem (informadas na calculadora de risco), na ordem das colunas
+FEATURES_FATAL = ["hora", "dia_semana", "condicao_metereologica", "uf", "br", "km"]
+
+# Features categóricas e a coluna do DataFrame de cada uma
+CATEGORICAS = {"dia_semana": "dia_semana", "condicao_metereologica": "condicao_metereologica", "uf": "uf", "br": "br"}
+
+# Máximo de acidentes usados no treinamento (amostra aleatória acima disso)
+MAX_LINHAS_TREINO = 300_000
+
+def _normalizar(valor: Any) -> str:
+    """Chave de uma categoria: texto sem espaços nas pontas e em minúsculas."""
+    return str(valor).strip().lower()
+
+class ClassificadorFatal:
+    """
+    Classificador da probabilidade de um acidente ser fatal (ao menos um morto)
+    dadas as condições da viagem, em forma compacta para inferência só com NumPy.
+
+    As árvores de um GradientBoostingClassifier treinado são convertidas para a
+    representação do QuickScorer: as folhas de cada árvore, completada até a
+    profundidade máxima, são numeradas da esquerda para a direita, e cada nó
+    interno guarda a máscara de bits das folhas que continuam alcançáveis
+    quando o teste x <= limiar falha (as da subárvore esquerda saem). A folha
+    de saída é o bit mais baixo do AND das máscaras dos testes que falharam.
+
+    Os nós de cada feature ficam ordenados pelo limiar; como os testes que
+    falham são os de limiar menor que o valor, uma busca binária por feature
+    dá quantos falharam, e o AND acumulado das máscaras desses nós, por
+    árvore, já está calculado em mascaras. Uma linha é avaliada com uma busca
+    binária por feature, o AND de uma linha de cada tabela e a soma dos
+    valores das folhas: sem percorrer as árvores nem objetos do sklearn.
+
+    As categorias são codificadas pela ordem da taxa de acidentes fatais no
+    treinamento, para que os cortes das árvores separem categorias de risco
+    parecido; valores desconhecidos recebem a posição da taxa geral.
+    """
+    # Profundidade máxima suportada: as máscaras das 2^6 folhas cabem em 64 bits
+    PROFUNDIDADE_MAXIMA = 6
+
+    # Linhas avaliadas por vez em lotes grandes (mantém as máscaras no cache)
+    BLOCO = 1024
+
+    def __init__(
+        self,
+        limiares: List[np.ndarray],
+        mascaras: List[np.ndarray],
+        folhas: np.ndarray,
+        inicial: float,
+        taxa_aprendizado: float,
+        categorias: Dict[str, Dict[str, float]],
+        desconhecidos: Dict[str, float],
+        medianas: Dict[str, float]
+    ):
+        """
+        Args:
+            limiares: Limiares dos nós de cada feature, em ordem crescente
+            mascaras: Por feature, (nós + 1) x árvores: AND das máscaras de
+                folhas dos k primeiros nós da feature em cada árvore
+            folhas: Valor de cada folha, árvores x 2^profundidade
+            inicial: Log-odds inicial do modelo
+            taxa_aprendizado: Peso de cada árvore
+            categorias: {feature: {categoria normalizada: código}}
+            desconhecidos: Código de categorias desconhecidas, por feature
+            medianas: Valor usado quando uma feature numérica não é informada
+        """
+        self.limiares = limiares
+        self.mascaras = mascaras
+        self.folhas = folhas
+        self.inicial = inicial
+        self.taxa_aprendizado = taxa_aprendizado
+        self.categorias = categorias
+        self.desconhecidos = desconhecidos
+        self.medianas = medianas
+
+        arvores, n_folhas = folhas.shape
+        self.deslocamentos = np.arange(arvores, dtype=np.intp)
+        if n_folhas <= 8:
+            # Máscaras de 8 bits: tabela do valor da folha de saída de cada
+            # máscara possível, por árvore, indexada pela máscara diretamente
+            valores = np.arange(1, 256)
+            bit_mais_baixo = np.zeros(256, dtype=np.intp)
+            bit_mais_baixo[1:] = np.log2(valores & -valores).astype(np.intp)
+            self.valores_mascara = np.ascontiguousarray(
+                np.where(np.arange(256) < 2 ** n_folhas, folhas[:, np.minimum(bit_mais_baixo, n_folhas - 1)], 0.0)
+            ).ravel()
+            self.deslocamentos = self.deslocamentos * 256
+        else:
+            self.valores_mascara = None
+            self.deslocamentos = self.deslocamentos * n_folhas
+
+    @classmethod
+    def de_sklearn(cls, modelo: Any, categorias: Dict[str, Dict[str, float]], desconhecidos: Dict[str, float],
+                   medianas: Dict[str, float], exemplo: np.ndarray) -> "ClassificadorFatal":
+        """
+        Exporta um GradientBoostingClassifier binário treinado.
+
+        Args:
+            modelo: GradientBoostingClassifier treinado sobre FEATURES_FATAL codificadas
+            categorias, desconhecidos, medianas: Codificação usada no treinamento
+            exemplo: Uma linha codificada, para obter o log-odds inicial do modelo
+
+        Raises:
+            ValueError: Se as árvores forem mais profundas que PROFUNDIDADE_MAXIMA
+        """
+        arvores = [estimador.tree_ for estimador in modelo.estimators_[:, 0]]
+        profundidade = max(arvore.max_depth for arvore in arvores)
+        if profundidade > cls.PROFUNDIDADE_MAXIMA:
+            raise ValueError(f"Árvores de profundidade {profundidade}; o máximo suportado é {cls.PROFUNDIDADE_MAXIMA}")
+        n_folhas = 2 ** profundidade
+        tipo = {8: np.uint8, 16: np.uint16, 32: np.uint32, 64: np.uint64}[max(8, n_folhas)]
+        todas = (1 << n_folhas) - 1
+
+        # Nós internos de cada feature: (limiar, árvore, máscara das folhas mantidas)
+        nos: List[List[Tuple[float, int, int]]] = [[] for _ in FEATURES_FATAL]
+        folhas = np.zeros((len(arvores), n_folhas))
+        for t, arvore in enumerate(arvores):
+            pilha = [(0, 0, n_folhas)]
+            while pilha:
+                no, primeira, largura = pilha.pop()
+                if arvore.children_left[no] < 0:
+                    # Folha rasa: o valor vale para todas as folhas completadas abaixo dela
+                    folhas[t, primeira:primeira + largura] = arvore.value[no, 0, 0]
+                    continue
+                metade = largura // 2
+                esquerda = ((1 << metade) - 1) << primeira
+                nos[arvore.feature[no]].append((float(arvore.threshold[no]), t, todas & ~esquerda))
+                pilha.append((arvore.children_left[no], primeira, metade))
+                pilha.append((arvore.children_right[no], primeira + metade, metade))
+
+        limiares, mascaras = [], []
+        for nos_feature in nos:
+            nos_feature.sort(key=lambda item: item[0])
+            acumulada = np.full((len(nos_feature) + 1, len(arvores)), todas, dtype=tipo)
+            for k, (_, t, mascara) in enumerate(nos_feature):
+                acumulada[k + 1] = acumulada[k]
+                acumulada[k + 1, t] &= tipo(mascara)
+            limiares.append(np.array([limiar for limiar, _, _ in nos_feature]))
+            mascaras.append(acumulada)
+
+        # decision_function = log-odds inicial + taxa * soma das árvores
+        exemplo = np.asarray(exemplo, dtype=float).reshape(1, -1)
+        soma_arvores = sum(estimador.predict(exemplo)[0] for estimador in modelo.estimators_[:, 0])
+        inicial = float(modelo.decision_function(exemplo)[0] - modelo.learning_rate * soma_arvores)
+
+        return cls(limiares, mascaras, folhas, inicial, float(modelo.learning_rate), categorias, desconhecidos, medianas)
+
+    def codificar(self, registros: Sequence[Dict[str, Any]]) -> np.ndarray:
+        """
+        Monta a matriz de features de uma lista de registros.
+
+        Args:
+            registros: Dicionários com as chaves de FEATURES_FATAL; valores
+                ausentes (None) usam a mediana (numéricas) ou o código de
+                categoria desconhecida
+
+        Returns:
+            Matriz len(registros) x len(FEATURES_FATAL)
+        """
+        X = np.empty((len(registros), len(FEATURES_FATAL)))
+        for j, nome in enumerate(FEATURES_FATAL):
+            if nome in self.categorias:
+                codigos, desconhecido = self.categorias[nome], self.desconhecidos[nome]
+                X[:, j] = [
+                    desconhecido if r.get(nome) is None else codigos.get(_normalizar(r[nome]), desconhecido)
+                    for r in registros
+                ]
+            else:
+                X[:, j] = [self.medianas[nome] if r.get(nome) is None else float(r[nome]) for r in registros]
+        return X
+
+    def probabilidade(self, X: np.ndarray) -> np.ndarray:
+        """
+        Probabilidade de acidente fatal de cada linha de X (veja codificar).
+
+        Returns:
+            Array com uma probabilidade por linha
+        """
+        # As árvores do sklearn comparam as features em float32
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        # Número de testes que falham (limiar < valor) em cada feature
+        posicoes = [np.searchsorted(limiares, X[:, j]) for j, limiares in enumerate(self.limiares)]
+
+        soma = np.empty(len(X))
+        for inicio in range(0, len(X), self.BLOCO):
+            bloco = slice(inicio, inicio + self.BLOCO)
+            mascara = self.mascaras[0][posicoes[0][bloco]]
+            for mascaras, posicao in zip(self.mascaras[1:], posicoes[1:]):
+                mascara &= mascaras[posicao[bloco]]
+            if self.valores_mascara is not None:
+                valores = self.valores_mascara.take(mascara + self.deslocamentos)
+            else:
+                folha = np.log2((mascara & (~mascara + 1)).astype(np.float64)).astype(np.intp)
+                valores = self.folhas.ravel().take(folha + self.deslocamentos)
+            soma[bloco] = valores.sum(axis=1)
+
+        log_odds = self.inicial + self.taxa_aprendizado * soma
+        return 1.0 / (1.0 + np.exp(-log_odds))
+
+    def prever(self, registro: Dict[str, Any]) -> float:
+        """Probabilidade de acidente fatal de um único registro."""
+        return float(self.probabilidade(self.codificar([registro]))[0])
+
+def _dados_treino(df: pd.DataFrame, max_linhas: int, semente: int) -> Tuple[pd.DataFrame, np.ndarray]:
+    """Features brutas (categorias normalizadas) e alvo dos acidentes, em amostra de no máximo max_linhas."""
+    if len(df) > max_linhas:
+        df = df.sample(max_linhas, random_state=semente)
+    brutos = pd.DataFrame({
+        "hora": df['HORA'].where(df['HORA'] >= 0).astype(float).to_numpy(),
+        "km": df['km'].astype(float).to_numpy(),
+    })
+    for nome, coluna in CATEGORICAS.items():
+        brutos[nome] = df[coluna].astype(str).str.strip().str.lower().to_numpy()
+    return brutos[FEATURES_FATAL], (df['mortos'].to_numpy() > 0).astype(int)
+
+def treinar_classificador_fatal(
+    df: pd.DataFrame,
+    max_linhas: int = MAX_LINHAS_TREINO,
+    arvores: int = 150,
+    profundidade: int = 3,
+    semente: int = 42
+) -> Tuple[ClassificadorFatal, Dict[str, Any]]:
+    """
+    Treina o classificador de acidentes fatais e o exporta para a forma compacta.
+
+    Um quinto dos acidentes fica fora do treinamento para as métricas
+    (AUC, log-loss e Brier, comparados a prever sempre a taxa de treino) e
+    para conferir que a inferência NumPy reproduz o sklearn.
+
+    Args:
+        df: DataFrame de acidentes pré-processado (veja DataLoader)
+        max_linhas: Máximo de acidentes usados (amostra aleatória acima disso)
+        arvores: Número de árvores do gradient boosting
+        profundidade: Profundidade máxima das árvores
+        semente: Semente da amostragem e do modelo
+
+    Returns:
+        Tupla (classificador, metadados com features, hiperparâmetros e métricas)
+    """
+    classificador, _, metadados = _treinar(df, max_linhas, arvores, profundidade, semente)
+    return classificador, metadados
+
+def _treinar(
+    df: pd.DataFrame,
+    max_linhas: int,
+    arvores: int,
+    profundidade: int,
+    semente: int
+) -> Tuple[ClassificadorFatal, Tuple[Any, np.ndarray], Dict[str, Any]]:
+    """Treinamento de treinar_classificador_fatal; retorna também o modelo do sklearn e a validação codificada."""
+    from sklearn.ensemble import GradientBoostingClassifier
+    from sklearn.metrics import brier_score_loss, log_loss, roc_auc_score
+    from sklearn.model_selection import train_test_split
+
+    brutos, y = _dados_treino(df, max_linhas, semente)
+    treino, validacao, y_treino, y_validacao = train_test_split(
+        brutos, y, test_size=0.2, random_state=semente, stratify=y if 0 < y.sum() < len(y) else None
+    )
+    taxa_geral = float(y_treino.mean())
+
+    # Categorias ordenadas pela taxa de acidentes fatais no treinamento
+    categorias, desconhecidos = {}, {}
+    for nome in CATEGORICAS:
+        taxas = pd.Series(y_treino).groupby(treino[nome].to_numpy()).mean().sort_values(kind="stable")
+        categorias[nome] = {str(valor): float(i) for i, valor in enumerate(taxas.index)}
+        desconhecidos[nome] = float(np.searchsorted(taxas.to_numpy(), taxa_geral)) - 0.5
+    medianas = {nome: float(np.nanmedian(treino[nome])) for nome in FEATURES_FATAL if nome not in CATEGORICAS}
+
+    def codificar(brutos: pd.DataFrame) -> np.ndarray:
+        colunas = []
+        for nome in FEATURES_FATAL:
+            if nome in CATEGORICAS:
+                colunas.append(brutos[nome].map(categorias[nome]).fillna(desconhecidos[nome]).to_numpy(dtype=float))
+            else:
+                colunas.append(brutos[nome].fillna(medianas[nome]).to_numpy(dtype=float))
+        return np.column_stack(colunas)
+
+    X_treino, X_validacao = codificar(treino), codificar(validacao)
+    modelo = GradientBoostingClassifier(
+        n_estimators=arvores, max_depth=profundidade, learning_rate=0.1, subsample=0.8, random_state=semente
+    )
+    modelo.fit(X_treino, y_treino)
+    classificador = ClassificadorFatal.de_sklearn(modelo, categorias, desconhecidos, medianas, X_treino[0])
+
+    probabilidade = classificador.probabilidade(X_validacao)
+    referencia = np.full(len(y_validacao), taxa_geral)
+    metricas: Dict[str, Optional[float]] = {
+        "taxa_fatal_treino": round(taxa_geral, 4),
+        "auc": None,
+        "log_loss": round(float(log_loss(y_validacao, probabilidade, labels=[0, 1])), 4),
+        "log_loss_taxa_constante": round(float(log_loss(y_validacao, referencia, labels=[0, 1])), 4),
+        "brier": round(float(brier_score_loss(y_validacao, probabilidade)), 4),
+        "brier_taxa_constante": round(float(brier_score_loss(y_validacao, referencia)), 4),
+        "diferenca_maxima_sklearn": float(np.abs(probabilidade - modelo.predict_proba(X_validacao)[:, 1]).max()),
+    }
+    if 0 < y_validacao.sum() < len(y_validacao):
+        metricas["auc"] = round(float(roc_auc_score(y_validacao, probabilidade)), 4)
+
+    metadados = {
+        "features": FEATURES_FATAL,
+        "algoritmo": "GradientBoostingClassifier exportado para tabelas NumPy (QuickScorer, inferência sem sklearn)",
+        "hiperparametros": {"arvores": arvores, "profundidade": profundidade, "taxa_aprendizado": 0.1, "subamostra": 0.8},
+        "linhas_treino": int(len(treino)),
+        "linhas_validacao": int(len(validacao)),
+        "nos": int(sum(len(limiares) for limiares in classificador.limiares)),
+        "metricas": metricas,
+    }
+    return classificador, (modelo, X_validacao), metadados
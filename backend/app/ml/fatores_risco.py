@@ -0,0 +1,262 @@
+import hashlib
+import json
+import os
+import unicodedata
+from typing import Any, Dict
+import numpy as np
+import pandas as pd
+from scipy import stats
+from backend.app.core.config import settings
+from backend.app.ml.treinamento import versao_dados
+
+# Dimensões analisadas: nome no relatório -> coluna do DataFrame
+DIMENSOES = {
+    "causa": "causa_acidente",
+    "condicao": "condicao_metereologica",
+    "hora": "HORA",
+    "tracado": "tracado_via",
+}
+
+# Versão do formato da análise gravada; incremente ao mudar os campos calculados
+FORMATO = 2
+
+# Fatores de risco apresentados ao usuário. Descrição e recomendações são
+# fixas; as causas e condições de cada fator são as dos dados cujo texto
+# (sem acentos, em minúsculas) contém uma das palavras-chave, e o impacto é
+# medido nos dados (veja calcular_fatores_risco). Cada palavra-chave deve
+# pertencer a um único fator, para que um acidente não conte em dois fatores
+CATALOGO = [
+    {
+        "nome": "Excesso de velocidade",
+        "descricao": "Dirigir acima do limite de velocidade da via",
+        "palavras": ["velocidade", "ultrapassagem"],
+        "recomendacoes": [
+            "Respeite os limites de velocidade",
+            "Use o controle de velocidade do veículo",
+            "Planeje suas viagens com antecedência para evitar pressa"
+        ],
+    },
+    {
+        "nome": "Consumo de álcool",
+        "descricao": "Dirigir sob efeito de álcool",
+        "palavras": ["alcool", "psicoativa"],
+        "recomendacoes": [
+            "Nunca dirija após consumir álcool",
+            "Utilize alternativas como transporte por aplicativo ou táxi",
+            "Defina um motorista da rodada que não beberá"
+        ],
+    },
+    {
+        "nome": "Uso de celular",
+        "descricao": "Utilizar aparelhos eletrônicos durante a condução",
+        # Nenhuma causa do datatran cita o celular; a falta de atenção genérica fica em Fadiga
+        "palavras": ["celular"],
+        "recomendacoes": [
+            "Mantenha o celular fora do alcance enquanto dirige",
+            "Use recursos de modo carro/direção do smartphone",
+            "Faça paradas para verificar mensagens se necessário"
+        ],
+    },
+    {
+        "nome": "Chuva forte",
+        "descricao": "Condução sob chuva intensa que reduz visibilidade",
+        "palavras": ["chuva", "garoa", "escorregadia", "neblina", "nevoeiro"],
+        "recomendacoes": [
+            "Reduza a velocidade em condições de chuva",
+            "Mantenha distância segura do veículo à frente",
+            "Verifique a condição dos pneus e das palhetas do limpador"
+        ],
+    },
+    {
+        "nome": "Fadiga",
+        "descricao": "Dirigir sob condição de cansaço extremo",
+        "palavras": ["atencao a conducao", "dormindo", "sono", "fadiga"],
+        "recomendacoes": [
+            "Faça paradas a cada 2 horas para descansar",
+            "Não dirija por mais de 8 horas por dia",
+            "Descanse adequadamente antes de viagens longas"
+        ],
+    },
+]
+
+def _normalizar(texto: str) -> str:
+    """Texto em minúsculas e sem acentos, para comparar com as palavras-chave."""
+    return unicodedata.normalize("NFKD", str(texto)).encode("ascii", "ignore").decode().lower()
+
+def _risco_relativo(fatais: np.ndarray, expostos: np.ndarray, total_fatais: int, total: int):
+    """
+    Risco relativo de desfecho fatal dos expostos contra os não expostos, com
+    intervalo de 95% pelo erro padrão do log, para vários grupos de uma vez.
+    Contagens zeradas recebem a correção de 0,5 (Haldane).
+    """
+    a, n1 = fatais.astype(float), expostos.astype(float)
+    c, n0 = total_fatais - a, total - n1
+    zerado = (a == 0) | (c == 0) | (n1 == a) | (n0 == c)
+    a, c = np.where(zerado, a + 0.5, a), np.where(zerado, c + 0.5, c)
+    n1, n0 = np.where(zerado, n1 + 1, n1), np.where(zerado, n0 + 1, n0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_rr = np.log((a / n1) / (c / n0))
+        erro = np.sqrt(1 / a - 1 / n1 + 1 / c - 1 / n0)
+    z = stats.norm.ppf(0.975)
+    return np.exp(log_rr), np.exp(log_rr - z * erro), np.exp(log_rr + z * erro)
+
+def calcular_fatores_risco(df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Mede nos dados o risco de desfecho fatal (acidente com ao menos um morto)
+    associado a cada causa, condição meteorológica, hora do dia e traçado da
+    via, e a cada fator do CATALOGO.
+
+    Todos os grupos são contados juntos: os códigos das dimensões são
+    deslocados para um único espaço de códigos e contados com duas chamadas a
+    np.bincount (acidentes e acidentes fatais); a exposição aos fatores é uma
+    matriz fatores x acidentes, contada com um produto matricial.
+
+    O impacto de um fator (0 a 1) é a fração atribuível nos expostos,
+    1 - 1/RR, com RR o risco relativo de desfecho fatal dos acidentes com as
+    causas ou condições do fator contra os demais (0 se RR <= 1). Fatores sem
+    nenhuma causa ou condição nos dados não são medidos: impacto e risco
+    relativo ficam nulos e medido é falso.
+
+    As horas de um fator são aquelas em que a fração de acidentes expostos
+    ao fator é significativamente maior (95%, unilateral) que no total dos
+    acidentes.
+
+    Args:
+        df: DataFrame de acidentes pré-processado (veja DataLoader)
+
+    Returns:
+        Dicionário com os totais, os fatores do catálogo (do maior para o
+        menor impacto, com os não medidos no fim), o risco relativo de cada
+        valor das dimensões (do maior para o menor) e os fatores associados a
+        cada causa, condição meteorológica e hora
+    """
+    fatal = (df['mortos'].to_numpy() > 0).astype(float)
+    total, total_fatais = len(df), int(fatal.sum())
+
+    codigos, valores, deslocamento = [], {}, 0
+    for nome, coluna in DIMENSOES.items():
+        codigo, unicos = pd.factorize(df[coluna])
+        codigos.append(np.where(codigo >= 0, codigo + deslocamento, -1))
+        valores[nome] = (deslocamento, unicos.tolist())
+        deslocamento += len(unicos)
+    codigos = np.concatenate(codigos)
+    validos = codigos >= 0
+    acidentes = np.bincount(codigos[validos], minlength=deslocamento)
+    fatais = np.bincount(codigos[validos], weights=np.tile(fatal, len(DIMENSOES))[validos], minlength=deslocamento)
+    rr, inferior, superior = _risco_relativo(fatais, acidentes, total_fatais, total)
+
+    dimensoes = {}
+    for nome, (inicio, unicos) in valores.items():
+        grupos = [
+            {
+                "valor": valor,
+                "acidentes": int(acidentes[inicio + i]),
+                "acidentes_fatais": int(fatais[inicio + i]),
+                "taxa_fatal": round(float(fatais[inicio + i] / acidentes[inicio + i]), 4),
+                "risco_relativo": round(float(rr[inicio + i]), 3),
+                "ic_95": [round(float(inferior[inicio + i]), 3), round(float(superior[inicio + i]), 3)],
+            }
+            for i, valor in enumerate(unicos)
+        ]
+        dimensoes[nome] = sorted(grupos, key=lambda grupo: grupo["risco_relativo"], reverse=True)
+
+    # Exposição de cada acidente a cada fator, pelas causas e condições do fator
+    causas, condicoes = valores["causa"][1], valores["condicao"][1]
+    associados = lambda lista, palavras: np.array([any(p in _normalizar(v) for p in palavras) for v in lista], dtype=bool)
+    exposicao_causa = np.array([associados(causas, fator["palavras"]) for fator in CATALOGO]).reshape(len(CATALOGO), -1)
+    exposicao_condicao = np.array([associados(condicoes, fator["palavras"]) for fator in CATALOGO]).reshape(len(CATALOGO), -1)
+    codigo_causa = pd.Index(causas).get_indexer(df['causa_acidente'])
+    codigo_condicao = pd.Index(condicoes).get_indexer(df['condicao_metereologica'])
+    expostos = (
+        (exposicao_causa[:, codigo_causa] & (codigo_causa >= 0))
+        | (exposicao_condicao[:, codigo_condicao] & (codigo_condicao >= 0))
+    )
+    acidentes_fator = expostos.sum(axis=1)
+    fatais_fator = expostos.astype(float) @ fatal
+    rr_fator, inferior_fator, superior_fator = _risco_relativo(fatais_fator, acidentes_fator, total_fatais, total)
+
+    # Horas em que os acidentes expostos a cada fator são mais frequentes que
+    # no total, com excesso acima de 1,96 desvios padrão da binomial
+    horas = valores["hora"][1]
+    codigo_hora = pd.Index(horas).get_indexer(df['HORA'])
+    com_hora = codigo_hora >= 0
+    acidentes_hora = np.bincount(codigo_hora[com_hora], minlength=len(horas))
+    expostos_hora = np.stack([
+        np.bincount(codigo_hora[com_hora], weights=linha[com_hora], minlength=len(horas)) for linha in expostos
+    ]).reshape(len(CATALOGO), len(horas))
+    fracao = acidentes_fator / total if total else np.zeros(len(CATALOGO))
+    esperado = np.outer(fracao, acidentes_hora)
+    desvio = np.sqrt(esperado * (1 - fracao)[:, None])
+    frequente_hora = (desvio > 0) & (expostos_hora - esperado > stats.norm.ppf(0.975) * desvio)
+
+    fatores = []
+    for i, fator in enumerate(CATALOGO):
+        medido = bool(acidentes_fator[i])
+        risco = float(rr_fator[i])
+        fatores.append({
+            "nome": fator["nome"],
+            "descricao": fator["descricao"],
+            "medido": medido,
+            "impacto": round(max(0.0, 1 - 1 / risco), 3) if medido else None,
+            "risco_relativo": round(risco, 3) if medido else None,
+            "ic_95": [round(float(inferior_fator[i]), 3), round(float(superior_fator[i]), 3)] if medido else None,
+            "acidentes": int(acidentes_fator[i]),
+            "acidentes_fatais": int(fatais_fator[i]),
+            "causas": [c for c, associada in zip(causas, exposicao_causa[i]) if associada],
+            "condicoes": [c for c, associada in zip(condicoes, exposicao_condicao[i]) if associada],
+            "horas": [int(h) for h, frequente in zip(horas, frequente_hora[i]) if frequente],
+            "recomendacoes": fator["recomendacoes"],
+        })
+    # Fatores medidos do maior para o menor impacto; os não medidos no fim
+    fatores.sort(key=lambda fator: (fator["medido"], fator["impacto"] or 0.0), reverse=True)
+
+    return {
+        "acidentes": total,
+        "acidentes_fatais": total_fatais,
+        "taxa_fatal": round(total_fatais / total, 4) if total else 0.0,
+        "fatores": fatores,
+        "dimensoes": dimensoes,
+        "fatores_por_causa": {
+            causa: [fator["nome"] for fator in fatores if causa in fator["causas"]] for causa in causas
+        },
+        "fatores_por_condicao": {
+            condicao: [fator["nome"] for fator in fatores if condicao in fator["condicoes"]] for condicao in condicoes
+        },
+        "fatores_por_hora": {
+            str(hora): [fator["nome"] for fator in fatores if hora in fator["horas"]] for hora in horas
+        },
+    }
+
+def carregar_fatores_risco(df: pd.DataFrame, caminho_dados: str, diretorio: str = settings.MODELOS_DIR) -> Dict[str, Any]:
+    """
+    Retorna a análise de fatores de risco da versão atual do dataset,
+    calculando-a só se ainda não houver uma gravada para essa versão.
+
+    A análise fica em <diretorio>/fatores_risco/<versão dos dados>_<versão do
+    catálogo>.json, então é refeita apenas quando o CSV, o CATALOGO ou o
+    FORMATO da análise mudam, e reaproveitada pelos demais processos e
+    reinicializações.
+
+    Args:
+        df: DataFrame de acidentes pré-processado (veja DataLoader)
+        caminho_dados: Arquivo CSV de onde df foi carregado
+        diretorio: Pasta do armazém de modelos
+
+    Returns:
+        Análise (veja calcular_fatores_risco), com a versão dos dados
+    """
+    versao = versao_dados(caminho_dados)
+    catalogo = hashlib.sha256(json.dumps([FORMATO, CATALOGO], sort_keys=True).encode()).hexdigest()[:8]
+    arquivo = os.path.join(diretorio, "fatores_risco", f"{versao}_{catalogo}.json")
+    if os.path.exists(arquivo):
+        with open(arquivo, encoding="utf-8") as f:
+            return json.load(f)
+
+    analise = {"versao_dados": versao, **calcular_fatores_risco(df)}
+    os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+    # Arquivo temporário por processo: vários processos da API podem calcular ao mesmo tempo
+    temporario = f"{arquivo}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(analise, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, arquivo)
+    return analise
@@ -0,0 +1,223 @@
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from scipy import stats
+
+# Mínimo de meses de histórico para ajustar os modelos
+MESES_MINIMOS = 24
+
+# Chave de um segmento no registro: (dimensão, valor), ex.: ('uf', 'SC'), ('br', '101')
+ChaveSegmento = Tuple[str, str]
+
+# Ordem de preferência das dimensões quando a requisição combina filtros
+# (a mais específica primeiro); 'brasil' é a série nacional
+DIMENSOES = ["br", "tipo", "uf", "brasil"]
+
+# Número de coeficientes: intercepto, tendência e 11 indicadores de mês
+NUM_COEFICIENTES = 13
+
+def matriz_sazonal(indices: np.ndarray, origem: int) -> np.ndarray:
+    """
+    Matriz de regressão para índices de mês absolutos (ano * 12 + mês - 1),
+    com a tendência contada a partir do mês de origem da série.
+
+    Colunas: intercepto, tendência linear (em anos) e indicadores dos meses de
+    fevereiro a dezembro (janeiro é a referência).
+    """
+    meses = indices % 12
+    X = np.zeros((len(indices), NUM_COEFICIENTES))
+    X[:, 0] = 1.0
+    X[:, 1] = (indices - origem) / 12.0
+    X[np.arange(len(indices))[meses > 0], meses[meses > 0] + 1] = 1.0
+    return X
+
+def ajustar_poisson(Y: np.ndarray, X: np.ndarray, iteracoes: int = 50, tolerancia: float = 1e-8) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Ajusta uma regressão de Poisson (ligação log) a muitas séries de uma vez,
+    por mínimos quadrados reponderados iterativamente (IRLS).
+
+    Todas as séries compartilham a matriz de regressão; cada iteração resolve
+    os S sistemas p x p em lote (np.linalg.solve sobre a primeira dimensão).
+
+    Args:
+        Y: Contagens, matriz S x T (uma série por linha)
+        X: Matriz de regressão T x p
+        iteracoes: Máximo de iterações
+        tolerancia: Variação máxima dos coeficientes para considerar convergido
+
+    Returns:
+        Tupla (coeficientes S x p, covariâncias S x p x p, dispersão S), com a
+        covariância já multiplicada pela dispersão (sobredispersão de Pearson,
+        no mínimo 1)
+    """
+    S, T = Y.shape
+    p = X.shape[1]
+    # Pequena regularização: séries com um mês zerado em todos os anos não
+    # identificam o efeito desse mês
+    regularizacao = 1e-6 * np.eye(p)
+
+    beta = np.zeros((S, p))
+    beta[:, 0] = np.log(Y.mean(axis=1) + 0.5)
+    for _ in range(iteracoes):
+        eta = np.clip(beta @ X.T, -30, 30)
+        mu = np.exp(eta)
+        z = eta + (Y - mu) / mu
+        XtWX = np.einsum("st,tp,tq->spq", mu, X, X) + regularizacao
+        XtWz = np.einsum("st,tp->sp", mu * z, X)
+        novo = np.linalg.solve(XtWX, XtWz[..., None])[..., 0]
+        convergiu = np.abs(novo - beta).max() < tolerancia
+        beta = novo
+        if convergiu:
+            break
+
+    mu = np.exp(np.clip(beta @ X.T, -30, 30))
+    XtWX = np.einsum("st,tp,tq->spq", mu, X, X) + regularizacao
+    pearson = ((Y - mu) ** 2 / mu).sum(axis=1) / max(T - p, 1)
+    dispersao = np.maximum(pearson, 1.0)
+    covariancias = np.linalg.inv(XtWX) * dispersao[:, None, None]
+    return beta, covariancias, dispersao
+
+def prever_poisson(
+    coeficientes: np.ndarray,
+    covariancias: np.ndarray,
+    dispersao: np.ndarray,
+    X: np.ndarray,
+    confianca: float = 0.95
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Previsão e intervalo de previsão de muitas séries de uma vez.
+
+    A variância de cada mês soma a variação da própria contagem (dispersão x
+    média) à incerteza da média estimada (método delta: mu² · x' Cov x), que
+    cresce com o horizonte pela extrapolação da tendência.
+
+    Args:
+        coeficientes: S x p
+        covariancias: S x p x p
+        dispersao: S
+        X: Matriz de regressão dos meses futuros, h x p
+        confianca: Nível do intervalo
+
+    Returns:
+        Tupla (previsão, limite inferior, limite superior), cada uma S x h
+    """
+    mu = np.exp(np.clip(coeficientes @ X.T, -30, 30))
+    variancia_eta = np.einsum("hp,spq,hq->sh", X, covariancias, X)
+    variancia = dispersao[:, None] * mu + mu ** 2 * variancia_eta
+    margem = stats.norm.ppf(0.5 + confianca / 2) * np.sqrt(variancia)
+    return mu, np.maximum(mu - margem, 0.0), mu + margem
+
+class RegistroModelos:
+    """
+    Registro dos modelos de tendência por segmento: Brasil, cada UF, as
+    rodovias com mais acidentes e cada tipo de acidente.
+
+    Cada segmento tem uma regressão de Poisson com tendência linear e efeito
+    do mês do ano, para os acidentes e para as mortes. Os coeficientes ficam
+    empilhados em arrays (um segmento por linha), de modo que a previsão de
+    qualquer conjunto de segmentos, como todas as UFs, é uma única operação
+    vetorizada.
+    """
+
+    def __init__(
+        self,
+        chaves: List[ChaveSegmento],
+        origem: int,
+        fim: int,
+        coeficientes: np.ndarray,
+        covariancias: np.ndarray,
+        dispersao: np.ndarray,
+        ultimos_12: np.ndarray,
+        meses_com_dados: Optional[np.ndarray] = None
+    ):
+        """
+        Args:
+            chaves: Segmentos, na ordem das linhas dos arrays
+            origem: Índice absoluto (ano * 12 + mês - 1) do primeiro mês das séries
+            fim: Índice absoluto do último mês das séries
+            coeficientes: S x 2 x p (acidentes, mortes)
+            covariancias: S x 2 x p x p
+            dispersao: S x 2
+            ultimos_12: Totais de acidentes e mortes nos últimos 12 meses, S x 2
+            meses_com_dados: Meses com ao menos um acidente em cada segmento, S
+        """
+        self.chaves = chaves
+        self.origem = origem
+        self.fim = fim
+        self.coeficientes = coeficientes
+        self.covariancias = covariancias
+        self.dispersao = dispersao
+        self.ultimos_12 = ultimos_12
+        self.meses_com_dados = meses_com_dados
+        self.posicoes: Dict[ChaveSegmento, int] = {chave: i for i, chave in enumerate(chaves)}
+
+    def obter(
+        self,
+        uf: Optional[str] = None,
+        br: Optional[str] = None,
+        tipo_acidente: Optional[str] = None
+    ) -> Tuple[ChaveSegmento, int]:
+        """
+        Seleciona o segmento mais específico entre os filtros informados.
+
+        Com um único filtro (ou nenhum) e um modelo para ele, a previsão é a do
+        próprio segmento. Com filtros combinados (ex.: UF e BR), ou para valores
+        sem modelo próprio, é usado o segmento mais específico disponível, e
+        quem chama ajusta a escala pela participação do recorte (veja ultimos_12).
+
+        Returns:
+            Tupla (chave do segmento escolhido, posição no registro)
+        """
+        filtros = {"br": br, "tipo": tipo_acidente, "uf": uf}
+        for dimensao in DIMENSOES[:-1]:
+            valor = filtros[dimensao]
+            if valor and (dimensao, valor) in self.posicoes:
+                return (dimensao, valor), self.posicoes[(dimensao, valor)]
+        return ("brasil", ""), self.posicoes[("brasil", "")]
+
+    def segmentos(self, dimensao: str) -> List[ChaveSegmento]:
+        """Retorna os segmentos de uma dimensão ('uf', 'br', 'tipo' ou 'brasil')."""
+        return [chave for chave in self.chaves if chave[0] == dimensao]
+
+    def prever(
+        self,
+        posicoes: Sequence[int],
+        meses_futuros: int,
+        confianca: float = 0.95
+    ) -> Tuple[List[date], np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Prevê os meses seguintes ao fim das séries para vários segmentos de uma vez.
+
+        Args:
+            posicoes: Posições dos segmentos no registro
+            meses_futuros: Número de meses à frente
+            confianca: Nível do intervalo de previsão
+
+        Returns:
+            Tupla (datas, previsão, limite inferior, limite superior), com os
+            valores em arrays len(posicoes) x meses_futuros x 2 (acidentes, mortes)
+        """
+        posicoes = np.asarray(posicoes)
+        indices = np.arange(self.fim + 1, self.fim + meses_futuros + 1)
+        X = matriz_sazonal(indices, self.origem)
+
+        n = len(posicoes)
+        p = self.coeficientes.shape[-1]
+        previsao, inferior, superior = prever_poisson(
+            self.coeficientes[posicoes].reshape(n * 2, p),
+            self.covariancias[posicoes].reshape(n * 2, p, p),
+            self.dispersao[posicoes].reshape(n * 2),
+            X,
+            confianca,
+        )
+        formato = lambda valores: valores.reshape(n, 2, meses_futuros).transpose(0, 2, 1)
+        datas = [date(int(i // 12), int(i % 12) + 1, 1) for i in indices]
+        return datas, formato(previsao), formato(inferior), formato(superior)
+
+    def __setstate__(self, estado: Dict):
+        # Registros gravados antes de meses_com_dados existir
+        estado.setdefault("meses_com_dados", None)
+        self.__dict__.update(estado)
+
+    def __len__(self) -> int:
+        return len(self.chaves)
@@ -0,0 +1,159 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+from backend.app.ml.sazonal import MESES_MINIMOS, ChaveSegmento, RegistroModelos, ajustar_poisson, matriz_sazonal, prever_poisson
+
+# Features dos modelos de tendência, na ordem dos coeficientes
+FEATURES_TENDENCIAS = ["intercepto", "tendencia_anual"] + [f"mes_{mes}" for mes in range(2, 13)]
+
+# Meses finais da série reservados para medir o erro do modelo
+MESES_VALIDACAO = 12
+
+# Rodovias com modelo próprio (as de maior número de acidentes)
+TOP_BRS = 30
+
+def versao_dados(caminho: str) -> str:
+    """
+    Identifica a versão do dataset pelo conteúdo do arquivo.
+
+    Args:
+        caminho: Arquivo CSV usado no treinamento
+
+    Returns:
+        Os 16 primeiros caracteres do SHA-256 do arquivo
+    """
+    resumo = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1 << 20), b""):
+            resumo.update(bloco)
+    return resumo.hexdigest()[:16]
+
+def series_segmentos(df: pd.DataFrame, top_brs: int = TOP_BRS) -> Tuple[int, Dict[ChaveSegmento, np.ndarray]]:
+    """
+    Monta as séries mensais de acidentes e mortes de cada segmento: Brasil,
+    cada UF, as top_brs rodovias com mais acidentes e cada tipo de acidente.
+
+    Todas as séries cobrem o mesmo período (do primeiro ao último mês do
+    dataset), com zero nos meses sem acidentes no segmento.
+
+    Args:
+        df: DataFrame de acidentes pré-processado (veja DataLoader)
+        top_brs: Número de rodovias com modelo próprio
+
+    Returns:
+        Tupla (índice absoluto do primeiro mês, {chave do segmento: matriz meses x 2})
+    """
+    base = pd.DataFrame({
+        "indice": df['data_inversa'].dt.year * 12 + df['data_inversa'].dt.month - 1,
+        "mortos": df['mortos'],
+        "uf": df['uf'],
+        "br": df['br'].astype(str),
+        "tipo": df['tipo_acidente'],
+    }).dropna(subset=["indice"])
+    base["indice"] = base["indice"].astype(int)
+    meses = np.arange(base["indice"].min(), base["indice"].max() + 1)
+
+    def contagens(dados: pd.DataFrame) -> np.ndarray:
+        agrupado = dados.groupby("indice").agg(acidentes=("indice", "size"), mortos=("mortos", "sum"))
+        return agrupado.reindex(meses, fill_value=0).to_numpy(dtype=float)
+
+    series = {("brasil", ""): contagens(base)}
+    top = base["br"].value_counts().head(top_brs).index
+    for dimensao, dados in [("uf", base), ("br", base[base["br"].isin(top)]), ("tipo", base)]:
+        for valor, grupo in dados.groupby(dimensao):
+            series[(dimensao, str(valor))] = contagens(grupo)
+    return int(meses[0]), series
+
+def _ajustar_lote(origem: int, contagens: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Ajusta os modelos de um lote de séries (executado em um processo do pool).
+
+    Acidentes e mortes de todas as séries do lote são ajustados juntos, em uma
+    única chamada vetorizada. O erro de cada série é medido em modelos
+    ajustados sem os últimos MESES_VALIDACAO meses; os modelos devolvidos usam
+    as séries completas.
+
+    Args:
+        origem: Índice absoluto do primeiro mês
+        contagens: Séries do lote, s x T x 2 (acidentes, mortes)
+
+    Returns:
+        Tupla (coeficientes s x 2 x p, covariâncias s x 2 x p x p, dispersão
+        s x 2, erros s x 2 com MAE e MAPE dos acidentes na validação, ou NaN)
+    """
+    s, T, _ = contagens.shape
+    Y = contagens.transpose(0, 2, 1).reshape(s * 2, T)
+    X = matriz_sazonal(origem + np.arange(T), origem)
+
+    erros = np.full((s, 2), np.nan)
+    if T >= MESES_MINIMOS + MESES_VALIDACAO:
+        acidentes = Y[0::2]
+        coeficientes, covariancias, dispersao = ajustar_poisson(acidentes[:, :-MESES_VALIDACAO], X[:-MESES_VALIDACAO])
+        previsto, _, _ = prever_poisson(coeficientes, covariancias, dispersao, X[-MESES_VALIDACAO:])
+        real = acidentes[:, -MESES_VALIDACAO:]
+        erros[:, 0] = np.abs(previsto - real).mean(axis=1)
+        erros[:, 1] = (np.abs(previsto - real) / np.maximum(real, 1)).mean(axis=1) * 100
+
+    coeficientes, covariancias, dispersao = ajustar_poisson(Y, X)
+    p = X.shape[1]
+    return (coeficientes.reshape(s, 2, p), covariancias.reshape(s, 2, p, p), dispersao.reshape(s, 2), erros)
+
+def treinar_registro_tendencias(
+    df: pd.DataFrame,
+    top_brs: int = TOP_BRS,
+    processos: Optional[int] = None
+) -> Tuple[RegistroModelos, Dict[str, Any]]:
+    """
+    Treina os modelos de tendência de todos os segmentos, em paralelo entre os núcleos.
+
+    As séries são divididas em lotes; cada processo ajusta o seu lote em uma
+    única regressão de Poisson vetorizada (veja ajustar_poisson).
+
+    Args:
+        df: DataFrame de acidentes pré-processado (veja DataLoader)
+        top_brs: Número de rodovias com modelo próprio
+        processos: Processos do pool (padrão: número de CPUs)
+
+    Returns:
+        Tupla (registro, metadados) com as features, o período, o número de
+        segmentos e as métricas de validação por dimensão
+    """
+    origem, series = series_segmentos(df, top_brs)
+    chaves = list(series)
+    contagens = np.stack([series[chave] for chave in chaves])
+    T = contagens.shape[1]
+    if T < MESES_MINIMOS:
+        raise ValueError(f"Histórico insuficiente: são necessários ao menos {MESES_MINIMOS} meses de dados")
+
+    processos = processos or os.cpu_count() or 1
+    lotes = np.array_split(contagens, min(len(chaves), processos))
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        ajustados = list(pool.map(_ajustar_lote, [origem] * len(lotes), lotes))
+    coeficientes, covariancias, dispersao, erros = (np.concatenate(partes) for partes in zip(*ajustados))
+
+    fim = origem + T - 1
+    registro = RegistroModelos(chaves, origem, fim, coeficientes, covariancias, dispersao,
+                               contagens[:, -12:, :].sum(axis=1), (contagens[:, :, 0] > 0).sum(axis=1))
+
+    dimensoes = ["brasil", "uf", "br", "tipo"]
+    metricas: Dict[str, Any] = {"meses_treinamento": int(T)}
+    for dimensao in dimensoes:
+        linhas = [i for i, chave in enumerate(chaves) if chave[0] == dimensao and not np.isnan(erros[i, 0])]
+        if linhas:
+            metricas[dimensao] = {
+                "modelos": len(linhas),
+                "mae_mediano": round(float(np.median(erros[linhas, 0])), 2),
+                "mape_mediano": round(float(np.median(erros[linhas, 1])), 2),
+            }
+
+    metadados = {
+        "features": FEATURES_TENDENCIAS,
+        "algoritmo": "Regressão de Poisson (tendência linear + efeito do mês) por segmento, IRLS vetorizado",
+        "periodo": [f"{origem // 12}-{origem % 12 + 1:02d}", f"{fim // 12}-{fim % 12 + 1:02d}"],
+        "segmentos": {dimensao: len(registro.segmentos(dimensao)) for dimensao in dimensoes},
+        "metricas": metricas,
+    }
+    return registro, metadados
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from datetime import datetime
 
 class AcidenteFilter(BaseModel):
@@ -69,4 +69,21 @@ class AcidenteResponse(BaseModel):
     longitude: Optional[float] = Field(None, description="Longitude do local do acidente")
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ValorDimensao(BaseModel):
+    """Valor distinto de uma dimensão dos acidentes, com suas contagens."""
+    valor: str = Field(..., description="Valor da dimensão")
+    total: int = Field(..., description="Total de acidentes com este valor")
+    por_ano: Dict[int, int] = Field(default_factory=dict, description="Total de acidentes por ano")
+    por_uf: Dict[str, int] = Field(default_factory=dict, description="Total de acidentes por UF")
+
+class CatalogoDimensoes(BaseModel):
+    """Catálogo com os valores distintos das dimensões usadas nos filtros."""
+    versao: str = Field(..., description="Versão dos dados usada para montar o catálogo")
+    anos: List[int] = Field(default_factory=list, description="Anos presentes nos dados")
+    ufs: List[ValorDimensao] = Field(default_factory=list, description="UFs presentes nos dados")
+    rodovias: List[ValorDimensao] = Field(default_factory=list, description="Rodovias presentes nos dados")
+    causas: List[ValorDimensao] = Field(default_factory=list, description="Causas de acidentes")
+    tipos: List[ValorDimensao] = Field(default_factory=list, description="Tipos de acidentes")
+    condicoes_meteorologicas: List[ValorDimensao] = Field(default_factory=list, description="Condições meteorológicas")
@@ -19,6 +19,12 @@ class PontoMapa(BaseModel):
     classificacao_acidente: str = Field(..., description="Classificação do acidente")
     condicao_metereologica: str = Field(..., description="Condição meteorológica")
 
+class PontoHeatmap(BaseModel):
+    """Modelo para um ponto do mapa de calor."""
+    lat: float = Field(..., description="Latitude do ponto")
+    lng: float = Field(..., description="Longitude do ponto")
+    intensity: int = Field(..., description="Intensidade do ponto (1 + 2 x mortos)")
+
 class ClusterMapa(BaseModel):
     """Modelo para um cluster de pontos no mapa."""
     latitude: float = Field(..., description="Latitude central do cluster")
@@ -2,6 +2,9 @@ from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 from datetime import date
 
+# Horário no formato HH:MM (00:00 a 23:59), lido pela calculadora de risco
+PADRAO_HORARIO = r"^([01]?\d|2[0-3]):[0-5]\d$"
+
 class PrevisaoRisco(BaseModel):
     """Modelo para previsão de risco por trecho de rodovia."""
     uf: str = Field(..., description="Estado (UF)")
@@ -19,7 +22,7 @@ class CalculadoraRiscoInput(BaseModel):
     rodovia_br: str = Field(..., description="Rodovia BR planejada")
     uf: str = Field(..., description="Estado (UF) da viagem")
     dia_semana: str = Field(..., description="Dia da semana planejado")
-    horario: str = Field(..., description="Horário planejado (formato HH:MM)")
+    horario: str = Field(..., pattern=PADRAO_HORARIO, description="Horário planejado (formato HH:MM)")
     periodo_viagem: str = Field(..., description="Período da viagem (diurno/noturno)")
     duracao_estimada: float = Field(..., description="Duração estimada em horas")
     condicao_metereologica: Optional[str] = Field(None, description="Condição meteorológica prevista")
@@ -31,6 +34,31 @@ class CalculadoraRiscoInput(BaseModel):
     km_inicial: Optional[float] = Field(None, description="Quilômetro inicial")
     km_final: Optional[float] = Field(None, description="Quilômetro final")
 
+class CalculadoraRiscoLoteInput(BaseModel):
+    """Modelo para entrada da calculadora de risco em lote (ex.: todos os trechos de um itinerário)."""
+    itens: List[CalculadoraRiscoInput] = Field(..., min_length=1, max_length=1000, description="Trechos/viagens a avaliar")
+
+class TrechoTrajeto(BaseModel):
+    """Modelo para um trecho de rodovia de um trajeto."""
+    rodovia_br: str = Field(..., description="Rodovia BR do trecho")
+    uf: str = Field(..., description="Estado (UF) do trecho")
+    km_inicial: float = Field(..., description="Quilômetro inicial")
+    km_final: float = Field(..., description="Quilômetro final")
+
+class TrajetoInput(BaseModel):
+    """Modelo para entrada do cálculo de risco de um trajeto com vários trechos (rodovias/UFs)."""
+    trechos: List[TrechoTrajeto] = Field(..., min_length=1, max_length=100, description="Trechos do trajeto, na ordem da viagem")
+    dia_semana: str = Field(..., description="Dia da semana planejado")
+    horario: str = Field(..., pattern=PADRAO_HORARIO, description="Horário planejado (formato HH:MM)")
+    periodo_viagem: str = Field(..., description="Período da viagem (diurno/noturno)")
+    duracao_estimada: float = Field(..., description="Duração estimada em horas")
+    condicao_metereologica: Optional[str] = Field(None, description="Condição meteorológica prevista")
+    perfil_condutor: Optional[str] = Field(None, description="Perfil do condutor (experiente, iniciante, etc.)")
+    tipo_veiculo: Optional[str] = Field(None, description="Tipo de veículo")
+    carga: Optional[bool] = Field(None, description="Transportará carga?")
+    velocidade_media: Optional[int] = Field(None, description="Velocidade média planejada (km/h)")
+    passageiros: Optional[int] = Field(None, description="Número de passageiros")
+
 class PrevisaoTendencia(BaseModel):
     """Modelo para previsão de tendências de acidentes."""
     data_referencia: date = Field(..., description="Data de referência da previsão")
@@ -45,5 +73,5 @@ class FatorRisco(BaseModel):
     """Modelo para um fator de risco."""
     nome: str = Field(..., description="Nome do fator de risco")
     descricao: str = Field(..., description="Descrição do fator de risco")
-    impacto: float = Field(..., description="Impacto do fator na probabilidade de acidente (0-1)")
+    impacto: Optional[float] = Field(None, description="Impacto do fator no risco de desfecho fatal (0-1); nulo se não medido nos dados")
     recomendacoes: List[str] = Field(..., description="Recomendações para mitigar o risco")
\ No newline at end of file
@@ -1,80 +1,272 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, desc, distinct
-from typing import List, Optional, Dict, Any
-from datetime import datetime
-from backend.app.db.models import Acidente as AcidenteDB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, or_, desc, distinct, tuple_, select
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime, date
+import base64
+import json
+from backend.app.db.models import Acidente as AcidenteDB, ContagemAcidentes
 from backend.app.models.acidente import Acidente, AcidenteFilter, AcidenteResponse
+from backend.app.services.dimensao_service import DimensaoService
+from backend.app.utils.serializacao import formatar_data, formatar_hora
 
 class AcidenteService:
+    # Colunas lidas para a listagem, na ordem usada por _linha_para_resposta
+    COLUNAS_RESPOSTA = (
+        AcidenteDB.id,
+        AcidenteDB.data_inversa,
+        AcidenteDB.dia_semana,
+        AcidenteDB.horario,
+        AcidenteDB.uf,
+        AcidenteDB.br,
+        AcidenteDB.km,
+        AcidenteDB.municipio,
+        AcidenteDB.causa_acidente,
+        AcidenteDB.tipo_acidente,
+        AcidenteDB.classificacao_acidente,
+        AcidenteDB.condicao_metereologica,
+        AcidenteDB.mortos,
+        AcidenteDB.feridos,
+        AcidenteDB.veiculos,
+        AcidenteDB.latitude,
+        AcidenteDB.longitude,
+    )
+    
     @staticmethod
-    async def get_acidentes(db: Session, filtros: AcidenteFilter, limit: int = 100, offset: int = 0) -> List[AcidenteResponse]:
+    async def get_acidentes(
+        db: AsyncSession,
+        filtros: AcidenteFilter,
+        limit: int = 100,
+        offset: int = 0,
+        cursor: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """
         Retorna uma lista de acidentes conforme os filtros aplicados.
         
+        Apenas as colunas da resposta são lidas do banco, e cada linha é
+        convertida diretamente para um dicionário no formato de AcidenteResponse,
+        pronto para ser codificado em JSON.
+        
         Args:
             db: Sessão do banco de dados
             filtros: Filtros a serem aplicados
             limit: Limite de registros
-            offset: Deslocamento para paginação
+            offset: Deslocamento para paginação (ignorado quando há cursor)
+            cursor: Cursor opaco retornado pela página anterior
             
         Returns:
-            Lista de acidentes como objetos AcidenteResponse
+            Lista de acidentes no formato de AcidenteResponse
+            
+        Raises:
+            ValueError: Se o cursor for inválido
         """
-        query = db.query(AcidenteDB)
+        query = select(*AcidenteService.COLUNAS_RESPOSTA)
         
         # Aplicar filtros
         query = AcidenteService._apply_filters(query, filtros)
         
-        # Ordenar por data (mais recentes primeiro) e ID
-        query = query.order_by(desc(AcidenteDB.data_inversa), desc(AcidenteDB.id))
-        
-        # Aplicar paginação
-        acidentes = query.offset(offset).limit(limit).all()
-        
-        # Converter para o modelo de resposta
-        result = []
-        for acidente in acidentes:
-            acidente_resp = AcidenteResponse(
-                id=acidente.id,
-                data=acidente.data_inversa.isoformat() if acidente.data_inversa else None,
-                dia_semana=acidente.dia_semana,
-                hora=acidente.horario.strftime("%H:%M") if acidente.horario else None,
-                uf=acidente.uf,
-                br=acidente.br,
-                km=acidente.km,
-                municipio=acidente.municipio,
-                causa_acidente=acidente.causa_acidente,
-                tipo_acidente=acidente.tipo_acidente,
-                classificacao_acidente=acidente.classificacao_acidente or "Não classificado",
-                condicao_metereologica=acidente.condicao_metereologica,
-                mortos=acidente.mortos or 0,
-                feridos=acidente.feridos or 0,
-                veiculos=acidente.veiculos or 0,
-                latitude=acidente.latitude,
-                longitude=acidente.longitude
-            )
-            result.append(acidente_resp)
-        
-        return result
+        # Ordenar por data (mais recentes primeiro, sem data por último) e ID
+        ordem = (desc(AcidenteDB.data_inversa).nulls_last(), desc(AcidenteDB.id))
+        
+        if cursor:
+            # Paginação por cursor: continuar após a última linha da página anterior
+            # usando o índice (data_inversa, id), sem percorrer as linhas já lidas
+            data_cursor, id_cursor = AcidenteService._decodificar_cursor(cursor)
+            sem_data = query.filter(AcidenteDB.data_inversa.is_(None))
+            
+            if data_cursor is not None:
+                resultado = await db.execute(query.filter(
+                    tuple_(AcidenteDB.data_inversa, AcidenteDB.id) < tuple_(data_cursor, id_cursor)
+                ).order_by(*ordem).limit(limit))
+                acidentes = resultado.all()
+                
+                # Acidentes sem data vêm depois de todos os datados
+                if len(acidentes) < limit:
+                    resultado = await db.execute(sem_data.order_by(desc(AcidenteDB.id)).limit(limit - len(acidentes)))
+                    acidentes += resultado.all()
+            else:
+                resultado = await db.execute(sem_data.filter(AcidenteDB.id < id_cursor)
+                                                     .order_by(desc(AcidenteDB.id))
+                                                     .limit(limit))
+                acidentes = resultado.all()
+        else:
+            # Paginação por offset (mantida por compatibilidade)
+            resultado = await db.execute(query.order_by(*ordem).offset(offset).limit(limit))
+            acidentes = resultado.all()
+        
+        return [AcidenteService._linha_para_resposta(linha) for linha in acidentes]
+    
+    @staticmethod
+    def _linha_para_resposta(linha: Tuple) -> Dict[str, Any]:
+        """
+        Converte uma linha com as colunas de COLUNAS_RESPOSTA para o formato de AcidenteResponse.
+        
+        Args:
+            linha: Tupla lida do banco
+            
+        Returns:
+            Dicionário com os campos de AcidenteResponse
+        """
+        (id_, data_inversa, dia_semana, horario, uf, br, km, municipio, causa, tipo,
+         classificacao, condicao, mortos, feridos, veiculos, latitude, longitude) = linha
+        return {
+            "id": id_,
+            "data": formatar_data(data_inversa),
+            "dia_semana": dia_semana,
+            "hora": formatar_hora(horario),
+            "uf": uf,
+            "br": br,
+            "km": km,
+            "municipio": municipio,
+            "causa_acidente": causa,
+            "tipo_acidente": tipo,
+            "classificacao_acidente": classificacao or "Não classificado",
+            "condicao_metereologica": condicao,
+            "mortos": mortos or 0,
+            "feridos": feridos or 0,
+            "veiculos": veiculos or 0,
+            "latitude": latitude,
+            "longitude": longitude,
+        }
+    
+    @staticmethod
+    def codificar_cursor(acidente: Dict[str, Any]) -> str:
+        """
+        Gera o cursor opaco que aponta para depois do acidente informado.
+        
+        Args:
+            acidente: Último acidente da página atual, como retornado por get_acidentes
+            
+        Returns:
+            Cursor codificado em base64 (URL-safe)
+        """
+        conteudo = json.dumps([acidente["data"], acidente["id"]], separators=(',', ':'))
+        return base64.urlsafe_b64encode(conteudo.encode()).decode().rstrip('=')
+    
+    @staticmethod
+    def _decodificar_cursor(cursor: str) -> Tuple[Optional[date], int]:
+        """
+        Decodifica um cursor gerado por codificar_cursor.
+        
+        Args:
+            cursor: Cursor opaco
+            
+        Returns:
+            Tupla (data_inversa, id) do último acidente da página anterior
+            
+        Raises:
+            ValueError: Se o cursor for inválido
+        """
+        try:
+            conteudo = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            data_cursor, id_cursor = json.loads(conteudo)
+            data_cursor = date.fromisoformat(data_cursor) if data_cursor is not None else None
+            return data_cursor, int(id_cursor)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Cursor inválido: {cursor}") from e
+    
+    # Filtros que podem ser respondidos pela tabela de contagens pré-agregadas
+    FILTROS_CONTAGEM = {
+        'ano': ContagemAcidentes.ano,
+        'uf': ContagemAcidentes.uf,
+        'causa_acidente': ContagemAcidentes.causa_acidente,
+        'tipo_acidente': ContagemAcidentes.tipo_acidente,
+        'condicao_metereologica': ContagemAcidentes.condicao_metereologica,
+    }
     
     @staticmethod
-    async def count_acidentes(db: Session, filtros: AcidenteFilter) -> int:
+    async def count_acidentes(db: AsyncSession, filtros: AcidenteFilter, estimativa: bool = False) -> Tuple[int, bool]:
         """
         Retorna o total de acidentes conforme os filtros aplicados.
         
+        Quando todos os filtros informados estão entre as dimensões da tabela de
+        contagens pré-agregadas, o total é a soma das contagens correspondentes.
+        Caso contrário, é feita a contagem exata na tabela de acidentes ou, se
+        solicitado, usada a estimativa do planejador do banco.
+        
         Args:
             db: Sessão do banco de dados
             filtros: Filtros a serem aplicados
+            estimativa: Se True, aceita a estimativa do planejador (PostgreSQL)
+                para filtros não cobertos pelas contagens
             
         Returns:
-            Número total de acidentes
+            Tupla (total, exato), em que exato indica se o total é uma contagem exata
         """
-        query = db.query(func.count(AcidenteDB.id))
+        total = await AcidenteService._contar_pre_agregado(db, filtros)
+        if total is not None:
+            return total, True
+        
+        if estimativa:
+            total = await AcidenteService._estimar_total(db, filtros)
+            if total is not None:
+                return total, False
+        
+        query = select(func.count(AcidenteDB.id))
         query = AcidenteService._apply_filters(query, filtros)
-        return query.scalar()
+        return await db.scalar(query), True
+    
+    @staticmethod
+    async def _contar_pre_agregado(db: AsyncSession, filtros: AcidenteFilter) -> Optional[int]:
+        """
+        Soma as contagens pré-agregadas que correspondem aos filtros.
+        
+        Args:
+            db: Sessão do banco de dados
+            filtros: Filtros a serem aplicados
+            
+        Returns:
+            Total de acidentes, ou None se os filtros não forem cobertos pelas
+            contagens ou se a tabela de contagens ainda não tiver sido gerada
+        """
+        # Mesma regra de _apply_filters: valores vazios não filtram
+        valores = {campo: valor for campo, valor in filtros.model_dump().items() if valor}
+        if any(campo not in AcidenteService.FILTROS_CONTAGEM for campo in valores):
+            return None
+        
+        query = select(func.sum(ContagemAcidentes.total))
+        for campo, valor in valores.items():
+            query = query.filter(AcidenteService.FILTROS_CONTAGEM[campo] == valor)
+        total = await db.scalar(query)
+        
+        if total is None:
+            # Nenhuma combinação encontrada: distinguir total zero de tabela vazia
+            if await db.scalar(select(ContagemAcidentes.id).limit(1)) is None:
+                return None
+            return 0
+        return int(total)
     
     @staticmethod
-    async def get_rodovias(db: Session) -> List[str]:
+    async def _estimar_total(db: AsyncSession, filtros: AcidenteFilter) -> Optional[int]:
+        """
+        Estima o total de acidentes pelo número de linhas previsto no plano de
+        execução do PostgreSQL, sem executar a consulta.
+        
+        Args:
+            db: Sessão do banco de dados
+            filtros: Filtros a serem aplicados
+            
+        Returns:
+            Total estimado, ou None se o banco não for PostgreSQL
+        """
+        dialeto = db.get_bind().dialect
+        if dialeto.name != 'postgresql':
+            return None
+        
+        query = AcidenteService._apply_filters(select(AcidenteDB.id), filtros)
+        # Os valores dos filtros seguem como parâmetros do driver, nunca no texto do SQL
+        compilado = query.compile(dialect=dialeto)
+        parametros = compilado.construct_params()
+        if compilado.positional:
+            parametros = tuple(parametros[nome] for nome in compilado.positiontup)
+        conexao = await db.connection()
+        resultado = await conexao.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compilado}", parametros)
+        plano = resultado.scalar()
+        if isinstance(plano, str):
+            plano = json.loads(plano)
+        return int(plano[0]["Plan"]["Plan Rows"])
+    
+    @staticmethod
+    async def get_rodovias(db: AsyncSession) -> List[str]:
         """
         Retorna a lista de rodovias presentes nos dados.
         
@@ -84,16 +276,10 @@ class AcidenteService:
         Returns:
             Lista de rodovias
         """
-        result = db.query(AcidenteDB.br) \
-                  .filter(AcidenteDB.br.isnot(None)) \
-                  .distinct() \
-                  .order_by(AcidenteDB.br) \
-                  .all()
-        
-        return [r[0] for r in result if r[0]]
+        return await DimensaoService.get_valores(db, 'rodovias')
     
     @staticmethod
-    async def get_causas(db: Session) -> List[str]:
+    async def get_causas(db: AsyncSession) -> List[str]:
         """
         Retorna a lista de causas de acidentes presentes nos dados.
         
@@ -103,16 +289,10 @@ class AcidenteService:
         Returns:
             Lista de causas de acidentes
         """
-        result = db.query(AcidenteDB.causa_acidente) \
-                  .filter(AcidenteDB.causa_acidente.isnot(None)) \
-                  .distinct() \
-                  .order_by(AcidenteDB.causa_acidente) \
-                  .all()
-        
-        return [r[0] for r in result if r[0]]
+        return await DimensaoService.get_valores(db, 'causas')
     
     @staticmethod
-    async def get_tipos(db: Session) -> List[str]:
+    async def get_tipos(db: AsyncSession) -> List[str]:
         """
         Retorna a lista de tipos de acidentes presentes nos dados.
         
@@ -122,16 +302,10 @@ class AcidenteService:
         Returns:
             Lista de tipos de acidentes
         """
-        result = db.query(AcidenteDB.tipo_acidente) \
-                  .filter(AcidenteDB.tipo_acidente.isnot(None)) \
-                  .distinct() \
-                  .order_by(AcidenteDB.tipo_acidente) \
-                  .all()
-        
-        return [r[0] for r in result if r[0]]
+        return await DimensaoService.get_valores(db, 'tipos')
     
     @staticmethod
-    async def get_condicoes_meteorologicas(db: Session) -> List[str]:
+    async def get_condicoes_meteorologicas(db: AsyncSession) -> List[str]:
         """
         Retorna a lista de condições meteorológicas presentes nos dados.
         
@@ -141,13 +315,7 @@ class AcidenteService:
         Returns:
             Lista de condições meteorológicas
         """
-        result = db.query(AcidenteDB.condicao_metereologica) \
-                  .filter(AcidenteDB.condicao_metereologica.isnot(None)) \
-                  .distinct() \
-                  .order_by(AcidenteDB.condicao_metereologica) \
-                  .all()
-        
-        return [r[0] for r in result if r[0]]
+        return await DimensaoService.get_valores(db, 'condicoes_meteorologicas')
     
     @staticmethod
     def _apply_filters(query, filtros: AcidenteFilter):
@@ -155,7 +323,7 @@ class AcidenteService:
         Aplica os filtros na consulta SQL.
         
         Args:
-            query: Query SQLAlchemy
+            query: Consulta SQLAlchemy (select)
             filtros: Filtros a serem aplicados
             
         Returns:
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from backend.app.core.config import settings
+from backend.app.db.database import AsyncSessionLocal
+from backend.app.services.dimensao_service import DimensaoService
+from backend.app.services.estatistica_service import EstatisticaService
+from backend.app.services.mapa_service import MapaService
+from backend.app.services.previsao_service import PrevisaoService
+from backend.app.utils.data_loader import DataLoader
+
+logger = logging.getLogger(__name__)
+
+class AquecimentoService:
+    """
+    Aquecimento da aplicação em segundo plano, logo após a inicialização.
+
+    Carrega o dataset, calcula os agregados pedidos pelo painel ao abrir (sem
+    filtros), monta a tabela de risco por trecho, o índice por km das
+    rodovias e a análise de fatores de risco, carrega os modelos de previsão e
+    prepara os GeoJSON comprimidos, para que a primeira requisição de um
+    processo novo não pague por esse trabalho.
+    A aplicação atende requisições durante o aquecimento; /sistema/pronto só
+    informa que está pronta quando todas as etapas terminaram.
+    """
+    # Etapas na ordem de execução (os agregados, a tabela de risco e o modelo dependem do dataset)
+    ETAPAS = ["dados", "agregados", "risco", "modelo", "mapas"]
+
+    # Estado de cada etapa: pendente, executando, concluida ou falhou
+    etapas: Dict[str, Dict[str, Any]] = {}
+    iniciado_em: Optional[float] = None
+    concluido_em: Optional[float] = None
+
+    @staticmethod
+    def iniciar(estatistica_service: EstatisticaService, previsao_service: PrevisaoService) -> Optional[asyncio.Task]:
+        """
+        Dispara o aquecimento em segundo plano.
+
+        Args:
+            estatistica_service: Instância usada pelos endpoints de estatísticas
+            previsao_service: Instância usada pelos endpoints de previsão
+
+        Returns:
+            Tarefa do aquecimento, ou None se ele estiver desativado (AQUECIMENTO_ATIVO)
+        """
+        AquecimentoService.etapas = {
+            nome: {"estado": "pendente", "duracao_ms": None, "erro": None}
+            for nome in AquecimentoService.ETAPAS
+        }
+        AquecimentoService.iniciado_em = time.perf_counter()
+        AquecimentoService.concluido_em = None
+
+        if not settings.AQUECIMENTO_ATIVO:
+            AquecimentoService.etapas = {}
+            AquecimentoService.concluido_em = AquecimentoService.iniciado_em
+            return None
+
+        return asyncio.create_task(AquecimentoService._aquecer(estatistica_service, previsao_service))
+
+    @staticmethod
+    def pronto() -> bool:
+        """Indica se o aquecimento terminou com todas as etapas concluídas."""
+        return (
+            AquecimentoService.concluido_em is not None
+            and all(etapa["estado"] == "concluida" for etapa in AquecimentoService.etapas.values())
+        )
+
+    @staticmethod
+    def estado() -> Dict[str, Any]:
+        """
+        Retorna o estado do aquecimento.
+
+        Returns:
+            Dicionário com o indicador de prontidão, o estado e a duração de cada
+            etapa e a duração total (em milissegundos, quando concluído)
+        """
+        duracao_total = None
+        if AquecimentoService.concluido_em is not None:
+            duracao_total = round((AquecimentoService.concluido_em - AquecimentoService.iniciado_em) * 1000, 1)
+        return {
+            "pronto": AquecimentoService.pronto(),
+            "etapas": AquecimentoService.etapas,
+            "duracao_total_ms": duracao_total,
+        }
+
+    @staticmethod
+    async def _aquecer(estatistica_service: EstatisticaService, previsao_service: PrevisaoService):
+        """Executa as etapas em sequência, registrando o tempo gasto em cada uma."""
+        acoes: Dict[str, Callable[[], Awaitable[Any]]] = {
+            "dados": lambda: DataLoader().load_data(),
+            "agregados": lambda: AquecimentoService._aquecer_agregados(estatistica_service),
+            "risco": lambda: asyncio.gather(
+                previsao_service.carregar_tabela_risco(),
+                previsao_service.carregar_indice_km(),
+                previsao_service.get_fatores_risco(),
+            ),
+            "modelo": lambda: asyncio.gather(
+                previsao_service.prever_tendencias(),
+                previsao_service.carregar_classificador_fatal(),
+            ),
+            "mapas": lambda: asyncio.to_thread(MapaService.preparar_geojson),
+        }
+
+        logger.info("Aquecimento iniciado")
+        for nome in AquecimentoService.ETAPAS:
+            etapa = AquecimentoService.etapas[nome]
+            etapa["estado"] = "executando"
+            inicio = time.perf_counter()
+            try:
+                await acoes[nome]()
+                etapa["estado"] = "concluida"
+            except Exception as e:
+                # Uma etapa com falha não impede as seguintes; as requisições
+                # ainda tentam calcular sob demanda
+                etapa["estado"] = "falhou"
+                etapa["erro"] = str(e)
+                logger.exception(f"Aquecimento: falha na etapa '{nome}'")
+            etapa["duracao_ms"] = round((time.perf_counter() - inicio) * 1000, 1)
+            logger.info(f"Aquecimento: etapa '{nome}' {etapa['estado']} em {etapa['duracao_ms']:.0f} ms")
+
+        AquecimentoService.concluido_em = time.perf_counter()
+        logger.info(
+            f"Aquecimento finalizado em {(AquecimentoService.concluido_em - AquecimentoService.iniciado_em) * 1000:.0f} ms"
+            f" ({'pronto' if AquecimentoService.pronto() else 'com falhas'})"
+        )
+
+    @staticmethod
+    async def _aquecer_agregados(estatistica_service: EstatisticaService):
+        """Calcula os agregados sem filtros exibidos na abertura do painel e o catálogo de filtros."""
+        calculos: List[Callable[[], Awaitable[Any]]] = [
+            estatistica_service.get_resumo,
+            estatistica_service.get_estatisticas_anuais,
+            estatistica_service.get_estatisticas_por_uf,
+            estatistica_service.get_estatisticas_por_causa,
+            estatistica_service.get_estatisticas_por_tipo,
+            estatistica_service.get_estatisticas_por_hora,
+            estatistica_service.get_estatisticas_por_periodo_dia,
+            estatistica_service.get_estatisticas_por_dia_semana,
+            estatistica_service.get_estatisticas_por_classificacao,
+        ]
+        # Em sequência: o aquecimento não deve ocupar todo o executor de cálculos
+        for calculo in calculos:
+            await calculo()
+
+        async with AsyncSessionLocal() as db:
+            await DimensaoService.get_catalogo(db)
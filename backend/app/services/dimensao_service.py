@@ -0,0 +1,192 @@
+import time
+from typing import List, Optional, Dict, Tuple
+from collections import defaultdict
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, inspect, select
+from backend.app.db.models import Acidente as AcidenteDB, VersaoDados
+from backend.app.models.acidente import CatalogoDimensoes, ValorDimensao
+from backend.app.core.config import settings
+
+class DimensaoService:
+    """
+    Catálogo em memória dos valores distintos das dimensões usadas nos filtros
+    (UF, rodovia, causa, tipo e condição meteorológica), com contagens por ano e UF.
+    
+    O catálogo é montado no primeiro uso e reaproveitado enquanto a versão dos
+    dados não mudar. A versão combina a registrada pelos scripts de carga na
+    tabela versao_dados (que muda a cada escrita, inclusive atualizações de
+    valores) com o número de linhas e o maior id da tabela de acidentes, que
+    mudam com inserções e exclusões mesmo em cargas que não a registram. A
+    versão é conferida no banco no máximo a cada settings.DIMENSOES_TTL segundos.
+    """
+    # Nome da dimensão no catálogo -> coluna da tabela de acidentes
+    DIMENSOES = {
+        'ufs': AcidenteDB.uf,
+        'rodovias': AcidenteDB.br,
+        'causas': AcidenteDB.causa_acidente,
+        'tipos': AcidenteDB.tipo_acidente,
+        'condicoes_meteorologicas': AcidenteDB.condicao_metereologica,
+    }
+    
+    # contagens[dimensao][valor][(ano, uf)] = total de acidentes
+    contagens: Optional[Dict[str, Dict[str, Dict[Tuple[int, str], int]]]] = None
+    catalogo: Optional[CatalogoDimensoes] = None
+    versao: Optional[str] = None
+    verificado_em: float = 0.0
+    # Se o banco tem a tabela versao_dados (bancos antigos podem não ter)
+    versao_registrada: Optional[bool] = None
+    
+    @staticmethod
+    async def get_catalogo(
+        db: AsyncSession,
+        ano: Optional[int] = None,
+        uf: Optional[str] = None
+    ) -> CatalogoDimensoes:
+        """
+        Retorna o catálogo de dimensões, opcionalmente restrito a um ano e/ou UF.
+        
+        Args:
+            db: Sessão do banco de dados
+            ano: Considerar apenas acidentes deste ano
+            uf: Considerar apenas acidentes desta UF
+            
+        Returns:
+            Catálogo com os valores de cada dimensão, ordenados, e suas contagens
+        """
+        await DimensaoService._atualizar(db)
+        
+        if not ano and not uf:
+            return DimensaoService.catalogo
+        return DimensaoService._montar_catalogo(ano, uf)
+    
+    @staticmethod
+    async def get_valores(db: AsyncSession, dimensao: str) -> List[str]:
+        """
+        Retorna os valores distintos de uma dimensão, em ordem alfabética.
+        
+        Args:
+            db: Sessão do banco de dados
+            dimensao: Nome da dimensão no catálogo (ex.: 'rodovias', 'causas')
+            
+        Returns:
+            Lista de valores da dimensão
+        """
+        catalogo = await DimensaoService.get_catalogo(db)
+        return [item.valor for item in getattr(catalogo, dimensao)]
+    
+    @staticmethod
+    def invalidar():
+        """Descarta o catálogo, forçando sua reconstrução no próximo uso."""
+        DimensaoService.contagens = None
+        DimensaoService.catalogo = None
+        DimensaoService.versao = None
+        DimensaoService.verificado_em = 0.0
+    
+    @staticmethod
+    async def _atualizar(db: AsyncSession):
+        """
+        Reconstrói o catálogo se ele ainda não existir ou se a versão dos dados mudou.
+        
+        Args:
+            db: Sessão do banco de dados
+        """
+        agora = time.monotonic()
+        if DimensaoService.catalogo is not None and agora - DimensaoService.verificado_em < settings.DIMENSOES_TTL:
+            return
+        
+        versao = await DimensaoService._versao_dados(db)
+        DimensaoService.verificado_em = agora
+        if DimensaoService.catalogo is not None and versao == DimensaoService.versao:
+            return
+        
+        DimensaoService.contagens = await DimensaoService._carregar_contagens(db)
+        DimensaoService.versao = versao
+        DimensaoService.catalogo = DimensaoService._montar_catalogo()
+    
+    @staticmethod
+    async def _versao_dados(db: AsyncSession) -> str:
+        """
+        Versão atual dos dados de acidentes: "<versão registrada>.<linhas>.<maior id>".
+        
+        Args:
+            db: Sessão do banco de dados
+        """
+        if not DimensaoService.versao_registrada:
+            conexao = await db.connection()
+            DimensaoService.versao_registrada = await conexao.run_sync(
+                lambda sincrona: inspect(sincrona).has_table(VersaoDados.__tablename__)
+            )
+        
+        registrada = 0
+        if DimensaoService.versao_registrada:
+            registrada = await db.scalar(
+                select(VersaoDados.versao).filter(VersaoDados.tabela == AcidenteDB.__tablename__)
+            ) or 0
+        linhas, maior_id = (await db.execute(select(func.count(AcidenteDB.id), func.max(AcidenteDB.id)))).one()
+        return f"{registrada}.{linhas}.{maior_id or 0}"
+    
+    @staticmethod
+    async def _carregar_contagens(db: AsyncSession) -> Dict[str, Dict[str, Dict[Tuple[int, str], int]]]:
+        """
+        Conta os acidentes de cada valor das dimensões, por ano e UF.
+        
+        Args:
+            db: Sessão do banco de dados
+            
+        Returns:
+            Dicionário dimensão -> valor -> (ano, uf) -> total
+        """
+        contagens = {}
+        for nome, coluna in DimensaoService.DIMENSOES.items():
+            por_valor = defaultdict(dict)
+            resultado = await db.execute(
+                select(coluna, AcidenteDB.ano, AcidenteDB.uf, func.count(AcidenteDB.id))
+                .filter(coluna.isnot(None))
+                .group_by(coluna, AcidenteDB.ano, AcidenteDB.uf)
+            )
+            for valor, ano, uf, total in resultado.all():
+                if valor:
+                    por_valor[valor][(ano, uf)] = total
+            contagens[nome] = dict(por_valor)
+        return contagens
+    
+    @staticmethod
+    def _montar_catalogo(ano: Optional[int] = None, uf: Optional[str] = None) -> CatalogoDimensoes:
+        """
+        Monta o catálogo a partir das contagens em memória.
+        
+        Args:
+            ano: Considerar apenas acidentes deste ano
+            uf: Considerar apenas acidentes desta UF
+            
+        Returns:
+            Catálogo de dimensões
+        """
+        anos = set()
+        dimensoes = {}
+        for nome, por_valor in DimensaoService.contagens.items():
+            itens = []
+            for valor in sorted(por_valor):
+                total_valor = 0
+                por_ano = defaultdict(int)
+                por_uf = defaultdict(int)
+                for (ano_valor, uf_valor), total in por_valor[valor].items():
+                    if (ano and ano_valor != ano) or (uf and uf_valor != uf):
+                        continue
+                    total_valor += total
+                    if ano_valor is not None:
+                        por_ano[ano_valor] += total
+                        anos.add(ano_valor)
+                    if uf_valor is not None:
+                        por_uf[uf_valor] += total
+                
+                if total_valor:
+                    itens.append(ValorDimensao(
+                        valor=valor,
+                        total=total_valor,
+                        por_ano=dict(sorted(por_ano.items())),
+                        por_uf=dict(sorted(por_uf.items()))
+                    ))
+            dimensoes[nome] = itens
+        
+        return CatalogoDimensoes(versao=DimensaoService.versao, anos=sorted(anos), **dimensoes)
@@ -1,6 +1,6 @@
 import pandas as pd
 import numpy as np
-from typing import List, Optional, Dict, Any
+from typing import Any, Callable, Dict, List, Optional
 from backend.app.models.estatistica import (
     EstatisticaAnual, 
     EstatisticaCausa,
@@ -10,11 +10,20 @@ from backend.app.models.estatistica import (
     EstatisticaClassificacao
 )
 from backend.app.utils.data_loader import DataLoader
+from backend.app.utils.executor import executar
+from backend.app.utils.singleflight import SingleFlight
 
 class EstatisticaService:
+    # Máximo de resultados guardados (os mais antigos são descartados primeiro)
+    MAX_RESULTADOS = 512
+    
     def __init__(self):
         self.data_loader = DataLoader()
         self.df = None
+        # Requisições concorrentes com os mesmos parâmetros compartilham um único cálculo
+        self.calculos = SingleFlight()
+        # Resultados já calculados, por método e parâmetros
+        self.resultados: Dict[tuple, Any] = {}
     
     async def _load_data(self):
         """Carrega os dados dos acidentes."""
@@ -22,11 +31,44 @@ class EstatisticaService:
             self.df = await self.data_loader.load_data()
         return self.df
     
+    async def _calcular(self, chave: tuple, funcao: Callable, *args) -> Any:
+        """
+        Executa um cálculo sobre o DataFrame no pool de threads, uma única vez por chave.
+        
+        O DataFrame não muda enquanto o processo está ativo, então o resultado é
+        guardado e reaproveitado pelas próximas requisições com os mesmos parâmetros.
+        
+        Args:
+            chave: Nome do cálculo e seus parâmetros
+            funcao: Método _calcular_* que recebe o DataFrame e os argumentos
+            *args: Argumentos do cálculo, após o DataFrame
+            
+        Returns:
+            Resultado do cálculo
+        """
+        if chave in self.resultados:
+            return self.resultados[chave]
+        
+        async def calcular():
+            df = await self._load_data()
+            return await executar(funcao, df, *args)
+        
+        resultado = await self.calculos.executar(chave, calcular)
+        if chave not in self.resultados:
+            if len(self.resultados) >= self.MAX_RESULTADOS:
+                del self.resultados[next(iter(self.resultados))]
+            self.resultados[chave] = resultado
+        return resultado
+    
     async def get_resumo(self, ano: Optional[int] = None, uf: Optional[str] = None) -> Dict[str, Any]:
         """
         Retorna um resumo estatístico dos acidentes.
         """
-        df = await self._load_data()
+        return await self._calcular(("resumo", ano, uf), self._calcular_resumo, ano, uf)
+    
+    def _calcular_resumo(self, df: pd.DataFrame, ano: Optional[int] = None, uf: Optional[str] = None) -> Dict[str, Any]:
+        """Cálculo de get_resumo, executado no pool de threads."""
+        df_completo = df
         
         # Filtrar por ano e UF, se especificados
         if ano:
@@ -55,8 +97,7 @@ class EstatisticaService:
         # Comparativo de mortes em relação ao ano anterior, se filtro por ano for aplicado
         comparativo_ano_anterior = None
         if ano and ano > 2014:  # Supondo que 2014 é o primeiro ano nos dados
-            df_ano_anterior = await self._load_data()
-            df_ano_anterior = df_ano_anterior[df_ano_anterior['year'] == ano - 1]
+            df_ano_anterior = df_completo[df_completo['year'] == ano - 1]
             if uf:
                 df_ano_anterior = df_ano_anterior[df_ano_anterior['uf'] == uf]
             
@@ -85,7 +126,10 @@ class EstatisticaService:
         """
         Retorna estatísticas agrupadas por ano.
         """
-        df = await self._load_data()
+        return await self._calcular(("anuais", uf), self._calcular_estatisticas_anuais, uf)
+    
+    def _calcular_estatisticas_anuais(self, df: pd.DataFrame, uf: Optional[str] = None) -> List[EstatisticaAnual]:
+        """Cálculo de get_estatisticas_anuais, executado no pool de threads."""
         
         # Filtrar por UF, se especificado
         if uf:
@@ -125,7 +169,10 @@ class EstatisticaService:
         """
         Retorna estatísticas agrupadas por causa de acidente.
         """
-        df = await self._load_data()
+        return await self._calcular(("por_causa", ano, uf, top), self._calcular_estatisticas_por_causa, ano, uf, top)
+    
+    def _calcular_estatisticas_por_causa(self, df: pd.DataFrame, ano: Optional[int] = None, uf: Optional[str] = None, top: int = 10) -> List[EstatisticaCausa]:
+        """Cálculo de get_estatisticas_por_causa, executado no pool de threads."""
         
         # Filtrar por ano e UF, se especificados
         if ano:
@@ -168,7 +215,10 @@ class EstatisticaService:
         """
         Retorna estatísticas agrupadas por tipo de acidente.
         """
-        df = await self._load_data()
+        return await self._calcular(("por_tipo", ano, uf, top), self._calcular_estatisticas_por_tipo, ano, uf, top)
+    
+    def _calcular_estatisticas_por_tipo(self, df: pd.DataFrame, ano: Optional[int] = None, uf: Optional[str] = None, top: int = 10) -> List[EstatisticaTipo]:
+        """Cálculo de get_estatisticas_por_tipo, executado no pool de threads."""
         
         # Filtrar por ano e UF, se especificados
         if ano:
@@ -211,7 +261,10 @@ class EstatisticaService:
         """
         Retorna estatísticas agrupadas por hora do dia.
         """
-        df = await self._load_data()
+        return await self._calcular(("por_hora", ano, uf, condicao_metereologica), self._calcular_estatisticas_por_hora, ano, uf, condicao_metereologica)
+    
+    def _calcular_estatisticas_por_hora(self, df: pd.DataFrame, ano: Optional[int] = None, uf: Optional[str] = None, condicao_metereologica: Optional[str] = None) -> List[EstatisticaHora]:
+        """Cálculo de get_estatisticas_por_hora, executado no pool de threads."""
         
         # Filtrar por ano, UF e condição meteorológica, se especificados
         if ano:
@@ -265,7 +318,10 @@ class EstatisticaService:
         """
         Retorna estatísticas agrupadas por UF.
         """
-        df = await self._load_data()
+        return await self._calcular(("por_uf", ano), self._calcular_estatisticas_por_uf, ano)
+    
+    def _calcular_estatisticas_por_uf(self, df: pd.DataFrame, ano: Optional[int] = None) -> List[EstatisticaUF]:
+        """Cálculo de get_estatisticas_por_uf, executado no pool de threads."""
         
         # Filtrar por ano, se especificado
         if ano:
@@ -316,7 +372,10 @@ class EstatisticaService:
         """
         Retorna estatísticas agrupadas por período do dia.
         """
-        df = await self._load_data()
+        return await self._calcular(("por_periodo_dia", ano, uf), self._calcular_estatisticas_por_periodo_dia, ano, uf)
+    
+    def _calcular_estatisticas_por_periodo_dia(self, df: pd.DataFrame, ano: Optional[int] = None, uf: Optional[str] = None) -> Dict[str, Any]:
+        """Cálculo de get_estatisticas_por_periodo_dia, executado no pool de threads."""
         
         # Filtrar por ano e UF, se especificados
         if ano:
@@ -355,7 +414,10 @@ class EstatisticaService:
         """
         Retorna estatísticas agrupadas por dia da semana.
         """
-        df = await self._load_data()
+        return await self._calcular(("por_dia_semana", ano, uf), self._calcular_estatisticas_por_dia_semana, ano, uf)
+    
+    def _calcular_estatisticas_por_dia_semana(self, df: pd.DataFrame, ano: Optional[int] = None, uf: Optional[str] = None) -> Dict[str, Any]:
+        """Cálculo de get_estatisticas_por_dia_semana, executado no pool de threads."""
         
         # Filtrar por ano e UF, se especificados
         if ano:
@@ -367,9 +429,10 @@ class EstatisticaService:
         total_acidentes = len(df)
         
         # Mapear dias da semana para tipo (útil ou fim de semana)
-        df['tipo_dia'] = df['dia_semana'].apply(
+        # (em uma cópia: o DataFrame em cache é compartilhado entre as threads do executor)
+        df = df.assign(tipo_dia=df['dia_semana'].apply(
             lambda x: 'Fim de Semana' if x.lower() in ['sábado', 'sabado', 'domingo'] else 'Dia Útil'
-        )
+        ))
         
         # Agrupar por dia da semana
         df_dia = df.groupby(['dia_semana', 'tipo_dia']).agg({
@@ -425,7 +488,10 @@ class EstatisticaService:
         """
         Retorna estatísticas agrupadas por classificação de acidente.
         """
-        df = await self._load_data()
+        return await self._calcular(("por_classificacao", ano, uf, top), self._calcular_estatisticas_por_classificacao, ano, uf, top)
+    
+    def _calcular_estatisticas_por_classificacao(self, df: pd.DataFrame, ano: Optional[int] = None, uf: Optional[str] = None, top: int = 10) -> List[EstatisticaClassificacao]:
+        """Cálculo de get_estatisticas_por_classificacao, executado no pool de threads."""
         
         # Filtrar por ano e UF, se especificados
         if ano:
@@ -1,85 +1,176 @@
+import asyncio
 import pandas as pd
 import numpy as np
-import requests
 import json
 import os
-from typing import List, Optional, Dict, Any, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import func, and_, or_, desc, distinct
+from typing import Callable, List, Optional, Dict, Any, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, or_, desc, distinct, select
 from backend.app.models.ponto_mapa import PontoMapa, ClusterMapa, TrechoPerigoso
 from backend.app.db.models import Acidente as AcidenteDB, TrechoPerigoso as TrechoPerigosoDB
 from backend.app.core.config import settings
+from backend.app.utils.serializacao import formatar_data, formatar_hora
+from backend.app.utils.compressao import CorpoPreComprimido
+from backend.app.utils.geo import NIVEIS_ZOOM_UFS, nivel_para_zoom
+from backend.app.utils.singleflight import SingleFlight
 from geopy.distance import geodesic
 from collections import defaultdict
 
 class MapaService:
-    ufs_geojson = None
-    rodovias_geojson = None
-    geojson_url_ufs = "https://raw.githubusercontent.com/codeforamerica/click_that_hood/master/public/data/brazil-states.geojson"
+    # GeoJSON dos estados por nível de zoom (None = geometria completa)
+    ufs_geojson: Dict[Optional[int], Dict[str, Any]] = {}
+    # GeoJSON das rodovias por UF (None = todas), montado na inicialização
+    rodovias_geojson: Optional[Dict[Optional[str], Dict[str, Any]]] = None
+    # Corpos JSON já codificados e comprimidos, por chave ('ufs:4', 'rodovias:SC', ...)
+    corpos_geojson: Dict[str, CorpoPreComprimido] = {}
+    # Cargas e compressões concorrentes de um mesmo GeoJSON compartilham uma única execução
+    calculos = SingleFlight()
+    # Pasta com os GeoJSON gerados por gerar_geojson_ufs.py e gerar_rodovias_geojson.py
+    geo_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "static", "geo")
     
     @staticmethod
-    async def _load_ufs_geojson():
-        """Carrega o GeoJSON dos estados brasileiros."""
-        if MapaService.ufs_geojson is None:
-            response = requests.get(MapaService.geojson_url_ufs)
-            MapaService.ufs_geojson = response.json()
-            
-            # Mapear nomes de estados para UFs
-            state_name_to_code = {
-                'Acre': 'AC', 'Alagoas': 'AL', 'Amapá': 'AP', 'Amazonas': 'AM', 'Bahia': 'BA',
-                'Ceará': 'CE', 'Distrito Federal': 'DF', 'Espírito Santo': 'ES', 'Goiás': 'GO',
-                'Maranhão': 'MA', 'Mato Grosso': 'MT', 'Mato Grosso do Sul': 'MS', 'Minas Gerais': 'MG',
-                'Pará': 'PA', 'Paraíba': 'PB', 'Paraná': 'PR', 'Pernambuco': 'PE', 'Piauí': 'PI',
-                'Rio de Janeiro': 'RJ', 'Rio Grande do Norte': 'RN', 'Rio Grande do Sul': 'RS',
-                'Rondônia': 'RO', 'Roraima': 'RR', 'Santa Catarina': 'SC', 'São Paulo': 'SP',
-                'Sergipe': 'SE', 'Tocantins': 'TO'
-            }
-            
-            for feature in MapaService.ufs_geojson['features']:
-                state_name = feature['properties']['name']
-                uf = state_name_to_code.get(state_name)
-                feature['properties']['uf'] = uf
+    def carregar_ufs_geojson():
+        """
+        Carrega do disco o GeoJSON dos estados e suas versões simplificadas.
+        
+        Chamado uma vez na inicialização da aplicação. Níveis de zoom sem arquivo
+        gerado são ignorados e atendidos pelo próximo nível mais detalhado.
+        """
+        arquivos = {None: "ufs.geojson"}
+        arquivos.update({nivel: f"ufs_z{nivel}.geojson" for nivel in NIVEIS_ZOOM_UFS})
         
-        return MapaService.ufs_geojson
+        carregados = {}
+        for nivel, nome in arquivos.items():
+            caminho = os.path.join(MapaService.geo_dir, nome)
+            if not os.path.exists(caminho):
+                if nivel is None:
+                    raise FileNotFoundError(f"GeoJSON dos estados não encontrado: {caminho}")
+                continue
+            with open(caminho, encoding="utf-8") as f:
+                carregados[nivel] = json.load(f)
+        
+        MapaService.ufs_geojson = carregados
     
     @staticmethod
-    async def _load_rodovias_geojson(uf: Optional[str] = None):
+    async def _garantir_ufs_geojson():
+        """Carrega o GeoJSON dos estados, se ainda não carregado, em uma thread (fora do event loop)."""
+        if not MapaService.ufs_geojson:
+            await MapaService.calculos.executar(
+                ("carregar", "ufs"), lambda: asyncio.to_thread(MapaService.carregar_ufs_geojson)
+            )
+    
+    @staticmethod
+    def _nivel_ufs(zoom: Optional[int] = None) -> Optional[int]:
+        """Retorna o nível carregado mais leve que atende ao zoom (None para o completo)."""
+        if zoom is None:
+            return None
+        disponiveis = sorted(nivel for nivel in MapaService.ufs_geojson if nivel is not None)
+        return nivel_para_zoom(zoom, {nivel: NIVEIS_ZOOM_UFS[nivel] for nivel in disponiveis})
+    
+    @staticmethod
+    async def _load_ufs_geojson(zoom: Optional[int] = None):
+        """Retorna o GeoJSON dos estados brasileiros adequado ao zoom."""
+        await MapaService._garantir_ufs_geojson()
+        return MapaService.ufs_geojson[MapaService._nivel_ufs(zoom)]
+    
+    @staticmethod
+    def carregar_rodovias_geojson():
         """
-        Esta é uma implementação simplificada.
-        Em um cenário real, você precisaria de um arquivo GeoJSON com as rotas das rodovias.
+        Carrega do disco o GeoJSON das rodovias e monta os recortes por UF.
+        
+        O arquivo é gerado por gerar_rodovias_geojson.py a partir das coordenadas
+        dos acidentes. Se ainda não tiver sido gerado, as rodovias são servidas
+        como uma FeatureCollection vazia.
         """
-        # Em um cenário real, você carregaria de uma fonte de dados real
-        # Por enquanto, retornamos um GeoJSON vazio
+        caminho = os.path.join(MapaService.geo_dir, "rodovias.geojson")
+        if os.path.exists(caminho):
+            with open(caminho, encoding="utf-8") as f:
+                geojson = json.load(f)
+        else:
+            geojson = {"type": "FeatureCollection", "features": []}
+        
+        features = geojson["features"]
+        indice = geojson.get("indice")
+        if indice is None:
+            # Arquivos sem índice: agrupar as feições pela UF
+            posicoes = defaultdict(list)
+            for feature in features:
+                posicoes[feature["properties"].get("uf")].append(feature)
+            recortes = {uf: lista for uf, lista in posicoes.items() if uf}
+        else:
+            recortes = {uf: features[inicio:fim] for uf, (inicio, fim) in indice.items()}
+        
+        MapaService.rodovias_geojson = {None: {"type": "FeatureCollection", "features": features}}
+        MapaService.rodovias_geojson.update({
+            uf: {"type": "FeatureCollection", "features": lista}
+            for uf, lista in recortes.items()
+        })
+        
+        # Descartar corpos comprimidos de uma carga anterior
+        for chave in [chave for chave in MapaService.corpos_geojson if chave.startswith("rodovias:")]:
+            del MapaService.corpos_geojson[chave]
+    
+    @staticmethod
+    async def _garantir_rodovias_geojson():
+        """Carrega o GeoJSON das rodovias, se ainda não carregado, em uma thread (fora do event loop)."""
         if MapaService.rodovias_geojson is None:
-            MapaService.rodovias_geojson = {
-                "type": "FeatureCollection",
-                "features": []
-            }
+            await MapaService.calculos.executar(
+                ("carregar", "rodovias"), lambda: asyncio.to_thread(MapaService.carregar_rodovias_geojson)
+            )
+    
+    @staticmethod
+    def _recorte_rodovias(uf: Optional[str] = None) -> Optional[str]:
+        """Retorna a chave do recorte de rodovias da UF ('' para UFs sem rodovias)."""
+        if not uf:
+            return None
+        uf = uf.upper()
+        return uf if uf in MapaService.rodovias_geojson else ""
+    
+    @staticmethod
+    async def _load_rodovias_geojson(uf: Optional[str] = None):
+        """Retorna o GeoJSON das rodovias federais, opcionalmente de uma UF."""
+        await MapaService._garantir_rodovias_geojson()
+        recorte = MapaService._recorte_rodovias(uf)
+        if recorte == "":
+            return {"type": "FeatureCollection", "features": []}
+        return MapaService.rodovias_geojson[recorte]
+    
+    @staticmethod
+    def preparar_geojson():
+        """
+        Carrega do disco os GeoJSON dos estados e das rodovias e já codifica e
+        comprime todos os corpos servidos: cada nível de zoom dos estados, as
+        rodovias de todo o país, as de cada UF e o recorte vazio das UFs sem
+        rodovias.
         
-        # Se uma UF for especificada, filtre as rodovias
-        if uf:
-            filtered_features = [f for f in MapaService.rodovias_geojson["features"] 
-                                if f["properties"].get("uf") == uf]
-            return {
-                "type": "FeatureCollection",
-                "features": filtered_features
-            }
+        Síncrono (leitura de arquivos e compressão); chamado em uma thread pelo
+        aquecimento da aplicação.
+        """
+        MapaService.carregar_ufs_geojson()
+        MapaService.carregar_rodovias_geojson()
         
-        return MapaService.rodovias_geojson
+        for nivel, geojson in MapaService.ufs_geojson.items():
+            MapaService.corpos_geojson[f"ufs:{nivel if nivel is not None else ''}"] = CorpoPreComprimido(geojson)
+        for recorte, geojson in MapaService.rodovias_geojson.items():
+            MapaService.corpos_geojson[f"rodovias:{recorte if recorte is not None else '*'}"] = CorpoPreComprimido(geojson)
+        MapaService.corpos_geojson["rodovias:"] = CorpoPreComprimido({"type": "FeatureCollection", "features": []})
     
     @staticmethod
     async def get_pontos_acidentes(
-        db: Session,
+        db: AsyncSession,
         uf: Optional[str] = None, 
         ano: Optional[int] = None,
         br: Optional[str] = None,
         tipo_acidente: Optional[str] = None,
         classificacao: Optional[str] = None,
         limit: int = 1000
-    ) -> List[PontoMapa]:
+    ) -> List[Dict[str, Any]]:
         """
         Retorna pontos de acidentes para visualização no mapa.
         
+        Apenas as colunas do ponto são lidas do banco, e cada linha é convertida
+        diretamente para um dicionário no formato de PontoMapa.
+        
         Args:
             db: Sessão do banco de dados
             uf: Filtro por UF
@@ -90,9 +181,25 @@ class MapaService:
             limit: Limite de registros a retornar
             
         Returns:
-            Lista de pontos de acidentes
+            Lista de pontos de acidentes no formato de PontoMapa
         """
-        query = db.query(AcidenteDB) \
+        query = select(
+                    AcidenteDB.id,
+                    AcidenteDB.latitude,
+                    AcidenteDB.longitude,
+                    AcidenteDB.data_inversa,
+                    AcidenteDB.horario,
+                    AcidenteDB.br,
+                    AcidenteDB.km,
+                    AcidenteDB.uf,
+                    AcidenteDB.municipio,
+                    AcidenteDB.tipo_acidente,
+                    AcidenteDB.causa_acidente,
+                    AcidenteDB.mortos,
+                    AcidenteDB.feridos,
+                    AcidenteDB.classificacao_acidente,
+                    AcidenteDB.condicao_metereologica
+                ) \
                 .filter(AcidenteDB.latitude.isnot(None), AcidenteDB.longitude.isnot(None))
         
         # Aplicar filtros, se especificados
@@ -115,40 +222,40 @@ class MapaService:
         query = query.order_by(desc(AcidenteDB.data_inversa))
         
         # Limitar a quantidade de registros
-        acidentes = query.limit(limit).all()
-        
-        # Converter para o modelo
-        result = []
-        for acidente in acidentes:
-            ponto = PontoMapa(
-                id=acidente.id,
-                latitude=float(acidente.latitude),
-                longitude=float(acidente.longitude),
-                data=acidente.data_inversa.isoformat() if acidente.data_inversa else None,
-                hora=acidente.horario.strftime('%H:%M') if acidente.horario else None,
-                br=acidente.br,
-                km=float(acidente.km) if acidente.km else 0.0,
-                uf=acidente.uf,
-                municipio=acidente.municipio,
-                tipo_acidente=acidente.tipo_acidente,
-                causa_acidente=acidente.causa_acidente,
-                mortos=acidente.mortos or 0,
-                feridos=acidente.feridos or 0,
-                classificacao_acidente=acidente.classificacao_acidente or 'Não classificado',
-                condicao_metereologica=acidente.condicao_metereologica
-            )
-            result.append(ponto)
+        resultado = await db.execute(query.limit(limit))
+        acidentes = resultado.all()
         
-        return result
+        # Converter cada linha para o formato de PontoMapa
+        return [
+            {
+                "id": id_,
+                "latitude": float(latitude),
+                "longitude": float(longitude),
+                "data": formatar_data(data_inversa),
+                "hora": formatar_hora(horario),
+                "br": br,
+                "km": float(km) if km else 0.0,
+                "uf": uf,
+                "municipio": municipio,
+                "tipo_acidente": tipo,
+                "causa_acidente": causa,
+                "mortos": mortos or 0,
+                "feridos": feridos or 0,
+                "classificacao_acidente": classificacao or 'Não classificado',
+                "condicao_metereologica": condicao
+            }
+            for (id_, latitude, longitude, data_inversa, horario, br, km, uf, municipio,
+                 tipo, causa, mortos, feridos, classificacao, condicao) in acidentes
+        ]
     
     @staticmethod
     async def get_trechos_perigosos(
-        db: Session,
+        db: AsyncSession,
         uf: Optional[str] = None, 
         ano: Optional[int] = None,
         br: Optional[str] = None,
         top: int = 10
-    ) -> List[TrechoPerigoso]:
+    ) -> List[Dict[str, Any]]:
         """
         Retorna os trechos mais perigosos com base na concentração de acidentes.
         
@@ -160,9 +267,23 @@ class MapaService:
             top: Número de trechos a retornar
             
         Returns:
-            Lista de trechos perigosos
+            Lista de trechos perigosos no formato de TrechoPerigoso
         """
-        query = db.query(TrechoPerigosoDB)
+        colunas = (
+            TrechoPerigosoDB.uf,
+            TrechoPerigosoDB.br,
+            TrechoPerigosoDB.km_inicial,
+            TrechoPerigosoDB.km_final,
+            TrechoPerigosoDB.total_acidentes,
+            TrechoPerigosoDB.total_mortos,
+            TrechoPerigosoDB.indice_periculosidade,
+            TrechoPerigosoDB.nivel_risco,
+            TrechoPerigosoDB.principais_causas,
+            TrechoPerigosoDB.municipios,
+            TrechoPerigosoDB.horarios_criticos,
+            TrechoPerigosoDB.coordenadas,
+        )
+        query = select(*colunas)
         
         # Aplicar filtros, se especificados
         if uf:
@@ -178,35 +299,22 @@ class MapaService:
         query = query.order_by(desc(TrechoPerigosoDB.indice_periculosidade))
         
         # Limitar a quantidade de registros
-        trechos_db = query.limit(top).all()
-        
-        # Converter para o modelo
-        result = []
-        for trecho_db in trechos_db:
-            trecho = TrechoPerigoso(
-                uf=trecho_db.uf,
-                br=trecho_db.br,
-                km_inicial=trecho_db.km_inicial,
-                km_final=trecho_db.km_final,
-                total_acidentes=trecho_db.total_acidentes,
-                total_mortos=trecho_db.total_mortos,
-                indice_periculosidade=trecho_db.indice_periculosidade,
-                nivel_risco=trecho_db.nivel_risco,
-                principais_causas=trecho_db.principais_causas,
-                municipios=trecho_db.municipios,
-                horarios_criticos=trecho_db.horarios_criticos,
-                coordenadas=trecho_db.coordenadas
-            )
-            result.append(trecho)
+        resultado = await db.execute(query.limit(top))
+        trechos_db = resultado.all()
         
-        return result
+        # Converter cada linha para o formato de TrechoPerigoso
+        nomes = [coluna.key for coluna in colunas]
+        return [dict(zip(nomes, trecho)) for trecho in trechos_db]
     
     @staticmethod
-    async def get_ufs_geojson() -> Dict[str, Any]:
+    async def get_ufs_geojson(zoom: Optional[int] = None) -> Dict[str, Any]:
         """
         Retorna o GeoJSON com os limites dos estados brasileiros.
+        
+        Args:
+            zoom: Nível de zoom do mapa; zooms menores recebem geometrias mais simplificadas
         """
-        return await MapaService._load_ufs_geojson()
+        return await MapaService._load_ufs_geojson(zoom)
     
     @staticmethod
     async def get_rodovias_geojson(uf: Optional[str] = None) -> Dict[str, Any]:
@@ -215,48 +323,110 @@ class MapaService:
         """
         return await MapaService._load_rodovias_geojson(uf)
     
+    @staticmethod
+    async def get_ufs_geojson_comprimido(zoom: Optional[int] = None) -> CorpoPreComprimido:
+        """
+        Retorna o GeoJSON dos estados adequado ao zoom, já codificado e comprimido.
+        
+        Cada nível é codificado e comprimido uma única vez (no aquecimento ou
+        no primeiro uso), em uma thread, para não bloquear o event loop.
+        """
+        await MapaService._garantir_ufs_geojson()
+        nivel = MapaService._nivel_ufs(zoom)
+        chave = f"ufs:{nivel if nivel is not None else ''}"
+        return await MapaService._corpo_comprimido(chave, lambda: MapaService.ufs_geojson[nivel])
+    
+    @staticmethod
+    async def get_rodovias_geojson_comprimido(uf: Optional[str] = None) -> CorpoPreComprimido:
+        """
+        Retorna o GeoJSON das rodovias (opcionalmente de uma UF) já codificado e comprimido.
+        
+        UFs sem rodovias compartilham o mesmo corpo vazio. Cada recorte é
+        codificado e comprimido uma única vez, como em get_ufs_geojson_comprimido.
+        """
+        geojson = await MapaService.get_rodovias_geojson(uf)
+        recorte = MapaService._recorte_rodovias(uf)
+        chave = f"rodovias:{recorte if recorte is not None else '*'}"
+        return await MapaService._corpo_comprimido(chave, lambda: geojson)
+    
+    @staticmethod
+    async def _corpo_comprimido(chave: str, geojson: Callable[[], Dict[str, Any]]) -> CorpoPreComprimido:
+        """
+        Retorna o corpo comprimido da chave, montando-o em uma thread se ainda
+        não existir; requisições concorrentes pela mesma chave aguardam a
+        mesma compressão.
+        
+        Args:
+            chave: Chave do corpo em corpos_geojson
+            geojson: Função que retorna o GeoJSON a comprimir
+        """
+        corpo = MapaService.corpos_geojson.get(chave)
+        if corpo is not None:
+            return corpo
+        
+        async def comprimir():
+            corpo = await asyncio.to_thread(CorpoPreComprimido, geojson())
+            MapaService.corpos_geojson[chave] = corpo
+            return corpo
+        
+        return await MapaService.calculos.executar(("comprimir", chave), comprimir)
+    
+    @staticmethod
     async def get_heatmap_data(
-        self, 
+        db: AsyncSession,
         uf: Optional[str] = None, 
         ano: Optional[int] = None,
         tipo_acidente: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Retorna dados para geração de mapa de calor de concentração de acidentes.
+        
+        Args:
+            db: Sessão do banco de dados
+            uf: Filtro por UF
+            ano: Filtro por ano
+            tipo_acidente: Filtro por tipo de acidente
+            
+        Returns:
+            Dicionário com os pontos (lat, lng, intensity), o valor máximo para
+            normalização, os limites do mapa e o total de pontos
         """
-        df = await self._load_data()
+        # Intensidade baseada no número de mortos (acidentes com mortes têm maior intensidade)
+        query = select(
+                    AcidenteDB.latitude,
+                    AcidenteDB.longitude,
+                    1 + func.coalesce(AcidenteDB.mortos, 0) * 2
+                ) \
+                .filter(AcidenteDB.latitude.isnot(None), AcidenteDB.longitude.isnot(None))
         
         # Filtrar por ano, UF e tipo, se especificados
         if ano:
-            df = df[df['year'] == ano]
+            query = query.filter(AcidenteDB.ano == ano)
         if uf:
-            df = df[df['uf'] == uf]
+            query = query.filter(AcidenteDB.uf == uf)
         if tipo_acidente:
-            df = df[df['tipo_acidente'] == tipo_acidente]
+            query = query.filter(AcidenteDB.tipo_acidente == tipo_acidente)
         
-        # Filtrar apenas registros com coordenadas válidas
-        df = df[df['latitude'].notna() & df['longitude'].notna()]
+        resultado = await db.execute(query)
         
         # Preparar dados para o heatmap (formato esperado por bibliotecas como heatmap.js)
-        heatmap_data = []
-        for _, row in df.iterrows():
-            # Intensidade baseada no número de mortos (poderia ser outra métrica)
-            intensity = 1 + row['mortos'] * 2  # Acidentes com mortes têm maior intensidade
-            
-            point = {
-                "lat": float(row['latitude']),
-                "lng": float(row['longitude']),
-                "intensity": int(intensity)
-            }
-            heatmap_data.append(point)
+        heatmap_data = [
+            {"lat": float(lat), "lng": float(lng), "intensity": int(intensity)}
+            for lat, lng, intensity in resultado.all()
+        ]
         
         # Calcular limites do mapa para melhor visualização
-        bounds = {
-            "north": df['latitude'].max() if not df.empty else -13.0,
-            "south": df['latitude'].min() if not df.empty else -22.0,
-            "east": df['longitude'].max() if not df.empty else -43.0,
-            "west": df['longitude'].min() if not df.empty else -52.0
-        }
+        if heatmap_data:
+            latitudes = [ponto["lat"] for ponto in heatmap_data]
+            longitudes = [ponto["lng"] for ponto in heatmap_data]
+            bounds = {
+                "north": max(latitudes),
+                "south": min(latitudes),
+                "east": max(longitudes),
+                "west": min(longitudes)
+            }
+        else:
+            bounds = {"north": -13.0, "south": -22.0, "east": -43.0, "west": -52.0}
         
         return {
             "data": heatmap_data,
@@ -264,15 +434,3 @@ class MapaService:
             "bounds": bounds,
             "count": len(heatmap_data)
         }
-    
-    async def get_ufs_geojson(self) -> Dict[str, Any]:
-        """
-        Retorna o GeoJSON com os limites dos estados brasileiros.
-        """
-        return await self._load_ufs_geojson()
-    
-    async def get_rodovias_geojson(self, uf: Optional[str] = None) -> Dict[str, Any]:
-        """
-        Retorna o GeoJSON com as rodovias federais.
-        """
-        return await self._load_rodovias_geojson(uf)
\ No newline at end of file
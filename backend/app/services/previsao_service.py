@@ -1,19 +1,38 @@
 import pandas as pd
 import numpy as np
-from datetime import date, datetime, timedelta
+from datetime import date, datetime
 from typing import List, Optional, Dict, Any
-from backend.app.models.previsao import PrevisaoRisco, CalculadoraRiscoInput, PrevisaoTendencia, FatorRisco
+from backend.app.models.previsao import PrevisaoRisco, CalculadoraRiscoInput, TrajetoInput, PrevisaoTendencia, FatorRisco
+from backend.app.ml.armazem import ModeloNaoEncontradoError, armazem_modelos
+from backend.app.ml.classificador import ClassificadorFatal
+from backend.app.ml.fatores_risco import carregar_fatores_risco
+from backend.app.ml.sazonal import RegistroModelos
 from backend.app.utils.data_loader import DataLoader
+from backend.app.utils.executor import executar
+from backend.app.utils.singleflight import SingleFlight
+from backend.app.utils.indice_km import IndiceKm
+from backend.app.utils.tabela_recortes import TabelaRecortes
+from backend.app.utils.tabela_risco import TabelaRisco
 from sklearn.linear_model import LinearRegression
-from sklearn.ensemble import RandomForestRegressor
-from scipy import stats
 
 class PrevisaoService:
     def __init__(self):
         self.data_loader = DataLoader()
         self.df = None
         self.modelo_previsao = None
+        self.metadados_modelo = None
         self.fatores_risco = None
+        self.analise_fatores = None
+        self.fatores_por_condicao = None
+        self.fatores_por_hora = None
+        self.tabela_risco = None
+        self.indice_km = None
+        self.recortes_tendencias = None
+        self.classificador_fatal = None
+        self.metadados_classificador = None
+        self.classificador_verificado = False
+        # Requisições concorrentes com os mesmos parâmetros compartilham um único cálculo
+        self.calculos = SingleFlight()
     
     async def _load_data(self):
         """Carrega os dados dos acidentes."""
@@ -23,92 +42,126 @@ class PrevisaoService:
     
     async def _init_modelo_previsao(self):
         """
-        Inicializa um modelo de previsão simples.
-        Em um cenário real, usaríamos um modelo mais sofisticado.
+        Carrega do armazém de modelos o registro de tendências (um modelo
+        sazonal por segmento: Brasil, UF, rodovia e tipo de acidente).
+        
+        Os modelos são treinados fora da API (python treinar_modelos.py); aqui
+        o registro é apenas carregado, uma vez por processo.
+        
+        Raises:
+            ModeloNaoEncontradoError: Se o modelo ainda não tiver sido treinado
         """
         if self.modelo_previsao is None:
-            # Esse é um modelo simplificado para demonstração
-            self.modelo_previsao = RandomForestRegressor(n_estimators=50, random_state=42)
+            async def carregar():
+                # Leitura do arquivo fora do event loop
+                return await executar(armazem_modelos.carregar, "tendencias")
             
-            # Treinar o modelo com os dados disponíveis
-            df = await self._load_data()
-            
-            # Agrupar por mês e ano
-            df['month'] = df['data_inversa'].dt.month
-            df['year'] = df['data_inversa'].dt.year
+            # As primeiras requisições concorrentes aguardam a mesma carga
+            self.modelo_previsao, self.metadados_modelo = await self.calculos.executar(("modelo_previsao",), carregar)
+        
+        return self.modelo_previsao
+    
+    async def carregar_tabela_risco(self) -> TabelaRisco:
+        """
+        Monta a tabela de risco por trecho (veja TabelaRisco) a partir dos dados
+        carregados, uma vez por processo. Chamado no aquecimento da API.
+        """
+        if self.tabela_risco is None:
+            async def montar():
+                df = await self._load_data()
+                return await executar(TabelaRisco, df)
             
-            # Recursos para o modelo
-            features = ['month', 'year']
+            self.tabela_risco = await self.calculos.executar(("tabela_risco",), montar)
+        
+        return self.tabela_risco
+    
+    async def carregar_indice_km(self) -> IndiceKm:
+        """
+        Monta o índice por km das rodovias (veja IndiceKm) a partir dos dados
+        carregados, uma vez por processo. Chamado no aquecimento da API.
+        """
+        if self.indice_km is None:
+            async def montar():
+                df = await self._load_data()
+                return await executar(IndiceKm, df)
             
-            # Agrupar dados por mês e ano
-            df_agrupado = df.groupby(['year', 'month']).agg({
-                'id': 'count',  # Total de acidentes
-                'mortos': 'sum'  # Total de mortos
-            }).reset_index()
+            self.indice_km = await self.calculos.executar(("indice_km",), montar)
+        
+        return self.indice_km
+    
+    async def carregar_classificador_fatal(self) -> Optional[ClassificadorFatal]:
+        """
+        Carrega do armazém de modelos o classificador de acidentes fatais
+        (veja ClassificadorFatal), uma vez por processo.
+        
+        Returns:
+            O classificador, ou None se ainda não tiver sido treinado (a
+            calculadora usa então a taxa de mortalidade do trecho)
+        """
+        if not self.classificador_verificado:
+            async def carregar():
+                try:
+                    return await executar(armazem_modelos.carregar, "fatal")
+                except ModeloNaoEncontradoError:
+                    return None, None
             
-            # Treinar o modelo para prever acidentes
-            X = df_agrupado[features].values
-            y_acidentes = df_agrupado['id'].values
+            carregado = await self.calculos.executar(("classificador_fatal",), carregar)
+            self.classificador_fatal, self.metadados_classificador = carregado
+            self.classificador_verificado = True
+        
+        return self.classificador_fatal
+    
+    async def carregar_recortes_tendencias(self) -> TabelaRecortes:
+        """
+        Monta o resumo dos recortes por UF, rodovia e tipo de acidente (veja
+        TabelaRecortes) no período do modelo de tendências, uma vez por processo.
+        """
+        if self.recortes_tendencias is None:
+            async def montar():
+                df = await self._load_data()
+                registro = await self._init_modelo_previsao()
+                return await executar(TabelaRecortes, df, registro.fim)
             
-            self.modelo_previsao.fit(X, y_acidentes)
+            self.recortes_tendencias = await self.calculos.executar(("recortes_tendencias",), montar)
         
-        return self.modelo_previsao
+        return self.recortes_tendencias
     
-    async def _init_fatores_risco(self):
-        """Inicializa a lista de fatores de risco."""
+    async def _init_fatores_risco(self) -> List[FatorRisco]:
+        """
+        Inicializa os fatores de risco, com o impacto medido nos dados (veja
+        calcular_fatores_risco), do maior para o menor impacto.
+        
+        A análise é calculada uma vez por versão do dataset e gravada no
+        armazém de modelos; os processos seguintes apenas a leem.
+        """
         if self.fatores_risco is None:
+            async def carregar():
+                df = await self._load_data()
+                return await executar(carregar_fatores_risco, df, self.data_loader.file_path)
+            
+            self.analise_fatores = await self.calculos.executar(("fatores_risco",), carregar)
             self.fatores_risco = [
                 FatorRisco(
-                    nome="Excesso de velocidade",
-                    descricao="Dirigir acima do limite de velocidade da via",
-                    impacto=0.8,
-                    recomendacoes=[
-                        "Respeite os limites de velocidade",
-                        "Use o controle de velocidade do veículo",
-                        "Planeje suas viagens com antecedência para evitar pressa"
-                    ]
-                ),
-                FatorRisco(
-                    nome="Consumo de álcool",
-                    descricao="Dirigir sob efeito de álcool",
-                    impacto=0.9,
-                    recomendacoes=[
-                        "Nunca dirija após consumir álcool",
-                        "Utilize alternativas como transporte por aplicativo ou táxi",
-                        "Defina um motorista da rodada que não beberá"
-                    ]
-                ),
-                FatorRisco(
-                    nome="Uso de celular",
-                    descricao="Utilizar aparelhos eletrônicos durante a condução",
-                    impacto=0.7,
-                    recomendacoes=[
-                        "Mantenha o celular fora do alcance enquanto dirige",
-                        "Use recursos de modo carro/direção do smartphone",
-                        "Faça paradas para verificar mensagens se necessário"
-                    ]
-                ),
-                FatorRisco(
-                    nome="Chuva forte",
-                    descricao="Condução sob chuva intensa que reduz visibilidade",
-                    impacto=0.6,
-                    recomendacoes=[
-                        "Reduza a velocidade em condições de chuva",
-                        "Mantenha distância segura do veículo à frente",
-                        "Verifique a condição dos pneus e das palhetas do limpador"
-                    ]
-                ),
-                FatorRisco(
-                    nome="Fadiga",
-                    descricao="Dirigir sob condição de cansaço extremo",
-                    impacto=0.7,
-                    recomendacoes=[
-                        "Faça paradas a cada 2 horas para descansar",
-                        "Não dirija por mais de 8 horas por dia",
-                        "Descanse adequadamente antes de viagens longas"
-                    ]
+                    nome=fator["nome"],
+                    descricao=fator["descricao"],
+                    impacto=fator["impacto"],
+                    recomendacoes=fator["recomendacoes"]
                 )
+                for fator in self.analise_fatores["fatores"]
             ]
+            # Fatores de cada condição meteorológica (em minúsculas) e hora com
+            # risco relativo de desfecho fatal acima de 1 nos dados
+            analise = self.analise_fatores
+            self.fatores_por_condicao = {
+                str(grupo["valor"]).casefold(): analise["fatores_por_condicao"][grupo["valor"]]
+                for grupo in analise["dimensoes"]["condicao"]
+                if grupo["risco_relativo"] > 1 and grupo["valor"] in analise["fatores_por_condicao"]
+            }
+            self.fatores_por_hora = {
+                int(grupo["valor"]): analise["fatores_por_hora"][str(grupo["valor"])]
+                for grupo in analise["dimensoes"]["hora"]
+                if grupo["risco_relativo"] > 1 and str(grupo["valor"]) in analise["fatores_por_hora"]
+            }
         
         return self.fatores_risco
     
@@ -134,99 +187,66 @@ class PrevisaoService:
         """
         Prevê o risco para uma rodovia específica.
         """
-        df = await self._load_data()
+        tabela = await self.carregar_tabela_risco()
         fatores_risco = await self._init_fatores_risco()
+        return await executar(
+            self._calcular_risco_rodovia, tabela, fatores_risco, self.analise_fatores["fatores_por_causa"],
+            uf, br, dia_semana, periodo_dia, condicao_metereologica
+        )
+    
+    def _calcular_risco_rodovia(
+        self,
+        tabela: TabelaRisco,
+        fatores_risco: List[FatorRisco],
+        fatores_por_causa: Dict[str, List[str]],
+        uf: str,
+        br: str,
+        dia_semana: Optional[str],
+        periodo_dia: Optional[str],
+        condicao_metereologica: Optional[str]
+    ) -> List[PrevisaoRisco]:
+        """Cálculo de prever_risco_rodovia, executado no pool de threads."""
+        # Estimativas por trecho de 10 km, suavizadas para o padrão da rodovia
+        # nos recortes com poucos acidentes, e para o da UF nas rodovias com
+        # poucos acidentes (veja TabelaRisco.estimar)
+        total_rodovia, trechos, probabilidades, probabilidades_fatal, causas_trechos = tabela.estimar(
+            uf, br, dia_semana, periodo_dia, condicao_metereologica
+        )
         
-        # Filtrar dados por UF e BR
-        df_filtered = df[(df['uf'] == uf) & (df['br'].astype(str) == br)]
-        
-        # Filtros adicionais se fornecidos
-        if dia_semana:
-            df_filtered = df_filtered[df_filtered['dia_semana'] == dia_semana]
-        if periodo_dia:
-            df_filtered = df_filtered[df_filtered['PERIODO_DIA'] == periodo_dia]
-        if condicao_metereologica:
-            df_filtered = df_filtered[df_filtered['condicao_metereologica'] == condicao_metereologica]
-        
-        # Se não houver dados suficientes, retorne um resultado padrão
-        if len(df_filtered) < 10:
-            return [
-                PrevisaoRisco(
-                    uf=uf,
-                    br=br,
-                    km_inicial=0,
-                    km_final=10,
-                    nivel_risco="baixo",
-                    probabilidade_acidente=0.1,
-                    probabilidade_acidente_fatal=0.01,
-                    fatores_risco=["Dados insuficientes para análise precisa"],
-                    recomendacoes=["Siga as normas de trânsito", "Dirija com cautela"]
-                )
-            ]
-        
-        # Identificar trechos de 10 km na rodovia
-        df_filtered['trecho_inicio'] = (df_filtered['km'] // 10) * 10
-        df_filtered['trecho_fim'] = df_filtered['trecho_inicio'] + 10
-        
-        # Calcular estatísticas por trecho
-        trechos = df_filtered.groupby(['trecho_inicio', 'trecho_fim']).agg({
-            'id': 'count',  # Total de acidentes
-            'mortos': 'sum',  # Total de mortos
-            'causa_acidente': lambda x: list(x.value_counts().head(3).index)  # Principais causas
-        }).reset_index()
-        
-        # Calcular probabilidades
-        total_acidentes = len(df_filtered)
-        total_trechos = len(trechos)
-        
-        # Calcular probabilidade baseada em dados históricos
-        # Em um sistema real, usaríamos modelos ML mais sofisticados
-        trechos['probabilidade_acidente'] = trechos['id'] / total_acidentes
-        trechos['probabilidade_acidente_fatal'] = (trechos['mortos'] / trechos['id']) * trechos['probabilidade_acidente']
+        # Rodovia sem acidentes (ou sem km) nos dados: não há o que estimar
+        if len(trechos) == 0:
+            return []
         
-        # Determinar nível de risco
-        trechos['nivel_risco'] = trechos['probabilidade_acidente'].apply(self._calcular_nivel_risco)
+        recomendacoes_fator = {fator.nome: fator.recomendacoes for fator in fatores_risco}
         
         # Mapear fatores de risco e recomendações
         resultado = []
-        for _, trecho in trechos.iterrows():
-            # Selecionar fatores de risco relevantes com base nas causas de acidentes
-            causas = trecho['causa_acidente']
-            fatores_trecho = []
-            if "Velocidade incompatível" in causas or "Ultrapassagem indevida" in causas:
-                fatores_trecho.append("Excesso de velocidade")
-            if "Ingestão de álcool" in causas:
-                fatores_trecho.append("Consumo de álcool")
-            if "Falta de atenção" in causas:
-                fatores_trecho.append("Uso de celular")
-                fatores_trecho.append("Fadiga")
-            if "Pista escorregadia" in causas or "Chuva" in causas:
-                fatores_trecho.append("Chuva forte")
+        for inicio, probabilidade, probabilidade_fatal, causas in zip(
+            trechos, probabilidades, probabilidades_fatal, causas_trechos
+        ):
+            # Fatores de risco associados às principais causas do trecho
+            fatores_trecho = list(dict.fromkeys(
+                nome_fator for causa in causas for nome_fator in fatores_por_causa.get(causa, [])
+            ))
             
-            # Se não encontrou fatores específicos, use os fatores gerais
+            # Se não encontrou fatores específicos, use os de maior impacto
             if not fatores_trecho:
-                fatores_trecho = [f.nome for f in fatores_risco[:3]]
+                fatores_trecho = [f.nome for f in fatores_risco if f.impacto is not None][:3]
             
-            # Obter recomendações para os fatores identificados
-            recomendacoes = []
-            for nome_fator in fatores_trecho:
-                for fator in fatores_risco:
-                    if fator.nome == nome_fator:
-                        recomendacoes.extend(fator.recomendacoes)
-                        break
-            
-            # Eliminar duplicatas nas recomendações
-            recomendacoes = list(set(recomendacoes))
+            # Recomendações dos fatores identificados, sem duplicatas
+            recomendacoes = list(dict.fromkeys(
+                recomendacao for nome_fator in fatores_trecho for recomendacao in recomendacoes_fator.get(nome_fator, [])
+            ))
             
             # Criar objeto de previsão para o trecho
             previsao = PrevisaoRisco(
                 uf=uf,
                 br=br,
-                km_inicial=float(trecho['trecho_inicio']),
-                km_final=float(trecho['trecho_fim']),
-                nivel_risco=trecho['nivel_risco'],
-                probabilidade_acidente=float(trecho['probabilidade_acidente']),
-                probabilidade_acidente_fatal=float(trecho['probabilidade_acidente_fatal']),
+                km_inicial=float(inicio),
+                km_final=float(inicio + tabela.TAMANHO_TRECHO),
+                nivel_risco=self._calcular_nivel_risco(probabilidade),
+                probabilidade_acidente=float(probabilidade),
+                probabilidade_acidente_fatal=float(probabilidade_fatal),
                 fatores_risco=fatores_trecho,
                 recomendacoes=recomendacoes
             )
@@ -241,30 +261,196 @@ class PrevisaoService:
         """
         Calcula o risco personalizado com base nos dados fornecidos pelo usuário.
         """
-        df = await self._load_data()
+        indice = await self.carregar_indice_km()
         fatores_risco = await self._init_fatores_risco()
+        classificador = await self.carregar_classificador_fatal()
+        probabilidade_fatal = self._probabilidades_fatais(classificador, [dados])[0]
+        return self._calcular_risco_personalizado(indice, fatores_risco, dados, probabilidade_fatal)
+    
+    def _probabilidades_fatais(
+        self,
+        classificador: Optional[ClassificadorFatal],
+        itens: List[CalculadoraRiscoInput]
+    ) -> List[Optional[float]]:
+        """
+        Probabilidade de um acidente ser fatal nas condições de cada viagem,
+        com todas as viagens avaliadas em uma única chamada ao classificador.
         
-        # Filtrar dados relevantes para a análise
-        df_filtered = df[(df['uf'] == dados.uf) & (df['br'].astype(str) == dados.rodovia_br)]
-        
-        # Filtros adicionais
-        if dados.dia_semana:
-            df_filtered = df_filtered[df_filtered['dia_semana'] == dados.dia_semana]
+        Returns:
+            Uma probabilidade por viagem (None para todas sem classificador)
+        """
+        if classificador is None:
+            return [None] * len(itens)
+        
+        registros = []
+        for dados in itens:
+            km = None
+            if dados.km_inicial is not None and dados.km_final is not None:
+                km = (dados.km_inicial + dados.km_final) / 2
+            registros.append({
+                "hora": self._hora(dados),
+                "dia_semana": dados.dia_semana or None,
+                "condicao_metereologica": dados.condicao_metereologica or None,
+                "uf": dados.uf,
+                "br": dados.rodovia_br,
+                "km": km,
+            })
+        return classificador.probabilidade(classificador.codificar(registros)).tolist()
+    
+    def _hora(self, dados: CalculadoraRiscoInput) -> Optional[int]:
+        """Hora do dia do horário da viagem (HH:MM)."""
+        return int(dados.horario.split(':')[0]) if dados.horario else None
+    
+    def _calcular_risco_personalizado(
+        self,
+        indice: IndiceKm,
+        fatores_risco: List[FatorRisco],
+        dados: CalculadoraRiscoInput,
+        probabilidade_fatal: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Cálculo de calcular_risco_personalizado.
         
-        # Extrair hora do horário fornecido
-        if dados.horario:
-            hora = int(dados.horario.split(':')[0])
-            df_filtered = df_filtered[df_filtered['HORA'] == hora]
+        Os acidentes e mortes da rodovia, com os filtros da viagem, vêm do
+        índice por km (duas buscas binárias) e a probabilidade de o acidente
+        ser fatal, do classificador NumPy, então o cálculo é executado
+        diretamente, sem passar pelo pool de threads.
+        """
+        hora = self._hora(dados)
+        total_acidentes, total_mortos = indice.consultar(
+            dados.uf,
+            dados.rodovia_br,
+            dados.dia_semana or None,
+            hora,
+            dados.condicao_metereologica or None,
+            dados.km_inicial,
+            dados.km_final,
+        )
+        return self._avaliar_risco(total_acidentes, total_mortos, fatores_risco, dados, probabilidade_fatal)
+    
+    async def calcular_risco_lote(self, itens: List[CalculadoraRiscoInput]) -> List[Dict[str, Any]]:
+        """
+        Calcula o risco personalizado de vários trechos/viagens de uma vez.
         
-        if dados.condicao_metereologica:
-            df_filtered = df_filtered[df_filtered['condicao_metereologica'] == dados.condicao_metereologica]
+        Returns:
+            Resultados na mesma ordem das entradas
+        """
+        indice = await self.carregar_indice_km()
+        fatores_risco = await self._init_fatores_risco()
+        classificador = await self.carregar_classificador_fatal()
+        return await executar(self._calcular_risco_lote, indice, fatores_risco, classificador, itens)
+    
+    def _calcular_risco_lote(
+        self,
+        indice: IndiceKm,
+        fatores_risco: List[FatorRisco],
+        classificador: Optional[ClassificadorFatal],
+        itens: List[CalculadoraRiscoInput]
+    ) -> List[Dict[str, Any]]:
+        """Cálculo de calcular_risco_lote, executado no pool de threads."""
+        probabilidades_fatais = self._probabilidades_fatais(classificador, itens)
+        return [
+            self._calcular_risco_personalizado(indice, fatores_risco, dados, probabilidade_fatal)
+            for dados, probabilidade_fatal in zip(itens, probabilidades_fatais)
+        ]
+    
+    async def calcular_risco_trajeto(self, dados: TrajetoInput) -> Dict[str, Any]:
+        """
+        Calcula o risco de uma viagem por um trajeto com vários trechos,
+        possivelmente em rodovias e UFs diferentes.
+        """
+        indice = await self.carregar_indice_km()
+        fatores_risco = await self._init_fatores_risco()
+        classificador = await self.carregar_classificador_fatal()
+        return await executar(self._calcular_risco_trajeto, indice, fatores_risco, classificador, dados)
+    
+    def _calcular_risco_trajeto(
+        self,
+        indice: IndiceKm,
+        fatores_risco: List[FatorRisco],
+        classificador: Optional[ClassificadorFatal],
+        dados: TrajetoInput
+    ) -> Dict[str, Any]:
+        """
+        Cálculo de calcular_risco_trajeto, executado no pool de threads.
         
-        if dados.km_inicial is not None and dados.km_final is not None:
-            df_filtered = df_filtered[(df_filtered['km'] >= dados.km_inicial) & (df_filtered['km'] <= dados.km_final)]
+        Cada trecho é avaliado como na calculadora de risco, com as condições
+        da viagem. No trajeto, os acidentes e mortes são somados, e as
+        probabilidades são combinadas supondo trechos independentes: a chance
+        de um acidente em algum trecho é 1 - produto(1 - p) dos trechos.
+        """
+        viagem = dados.model_dump(exclude={"trechos"})
+        # O trecho pode ser percorrido no sentido decrescente do km
+        entradas = [
+            CalculadoraRiscoInput(
+                **viagem,
+                uf=trecho.uf,
+                rodovia_br=trecho.rodovia_br,
+                km_inicial=min(trecho.km_inicial, trecho.km_final),
+                km_final=max(trecho.km_inicial, trecho.km_final),
+            )
+            for trecho in dados.trechos
+        ]
+        probabilidades_fatais = self._probabilidades_fatais(classificador, entradas)
+        trechos = []
+        for trecho, entrada, probabilidade_fatal in zip(dados.trechos, entradas, probabilidades_fatais):
+            resultado = self._calcular_risco_personalizado(indice, fatores_risco, entrada, probabilidade_fatal)
+            resultado["trecho"].update(km_inicial=trecho.km_inicial, km_final=trecho.km_final)
+            extensao = abs(trecho.km_final - trecho.km_inicial)
+            acidentes = resultado["estatisticas_rodovia"]["total_acidentes"]
+            resultado["trecho"]["extensao_km"] = extensao
+            resultado["estatisticas_rodovia"]["acidentes_por_km"] = round(acidentes / extensao, 2) if extensao > 0 else None
+            trechos.append(resultado)
+        
+        # Probabilidades dos trechos estão em %
+        sem_acidente = np.prod([1 - t["probabilidade_acidente"] / 100 for t in trechos])
+        sem_acidente_fatal = np.prod([1 - t["probabilidade_acidente_fatal"] / 100 for t in trechos])
+        probabilidade_acidente = min(0.99, 1 - sem_acidente)
+        probabilidade_acidente_fatal = min(0.99, 1 - sem_acidente_fatal)
+        
+        total_acidentes = sum(t["estatisticas_rodovia"]["total_acidentes"] for t in trechos)
+        total_mortos = sum(t["estatisticas_rodovia"]["total_mortos"] for t in trechos)
+        extensao_total = sum(t["trecho"]["extensao_km"] for t in trechos)
+        mais_perigoso = max(range(len(trechos)), key=lambda i: trechos[i]["probabilidade_acidente_fatal"])
         
+        return {
+            "probabilidade_acidente": round(probabilidade_acidente * 100, 2),
+            "probabilidade_acidente_fatal": round(probabilidade_acidente_fatal * 100, 2),
+            "nivel_risco": self._calcular_nivel_risco(probabilidade_acidente),
+            "fatores_risco": list(dict.fromkeys(f for t in trechos for f in t["fatores_risco"])),
+            "recomendacoes": list(dict.fromkeys(r for t in trechos for r in t["recomendacoes"])),
+            "estatisticas_trajeto": {
+                "extensao_km": extensao_total,
+                "total_acidentes": total_acidentes,
+                "total_mortos": total_mortos,
+                "taxa_mortalidade": round(total_mortos / total_acidentes * 100, 2) if total_acidentes > 0 else 0,
+                "acidentes_por_km": round(total_acidentes / extensao_total, 2) if extensao_total > 0 else None,
+            },
+            "trecho_mais_perigoso": mais_perigoso,
+            "trechos": trechos
+        }
+    
+    def _avaliar_risco(
+        self,
+        total_acidentes: int,
+        total_mortos: int,
+        fatores_risco: List[FatorRisco],
+        dados: CalculadoraRiscoInput,
+        probabilidade_fatal: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Avalia o risco de uma viagem a partir dos acidentes do seu trecho.
+        
+        Args:
+            total_acidentes: Acidentes na rodovia/trecho com os filtros da viagem
+            total_mortos: Mortos nesses acidentes
+            fatores_risco: Fatores de risco conhecidos
+            dados: Dados da viagem
+            probabilidade_fatal: Probabilidade de um acidente nas condições da
+                viagem ser fatal, do classificador; sem ela, é usada a taxa
+                de mortalidade do trecho
+        """
         # Calcular estatísticas básicas
-        total_acidentes = len(df_filtered)
-        total_mortos = df_filtered['mortos'].sum()
         taxa_mortalidade = total_mortos / total_acidentes if total_acidentes > 0 else 0
         
         # Ajustar probabilidade base com base nas condições fornecidas
@@ -295,25 +481,30 @@ class PrevisaoService:
         
         # Calcular probabilidades ajustadas
         probabilidade_acidente = min(0.99, probabilidade_base * (total_acidentes / 1000 if total_acidentes > 0 else 1))
-        probabilidade_acidente_fatal = min(0.99, probabilidade_acidente * taxa_mortalidade)
+        if probabilidade_fatal is None:
+            probabilidade_fatal = min(1.0, float(taxa_mortalidade))
+            modelo_fatalidade = "taxa_mortalidade_trecho"
+        else:
+            modelo_fatalidade = "classificador"
+        probabilidade_acidente_fatal = min(0.99, probabilidade_acidente * probabilidade_fatal)
         
         # Determinar nível de risco
         nivel_risco = self._calcular_nivel_risco(probabilidade_acidente)
         
-        # Identificar fatores de risco relevantes
+        # Fatores de risco relevantes: os associados, nos dados, à condição
+        # meteorológica e à hora da viagem, quando elas elevam o risco de
+        # desfecho fatal (veja _init_fatores_risco)
         fatores_relevantes = []
-        if dados.periodo_viagem == "noturno":
-            fatores_relevantes.append("Fadiga")
-        if dados.condicao_metereologica in ["CHUVA", "NEVOEIRO/NEBLINA", "GRANIZO", "NEVE"]:
-            fatores_relevantes.append("Chuva forte")
-        if dados.duracao_estimada > 3:
-            fatores_relevantes.append("Fadiga")
-        if dados.velocidade_media and dados.velocidade_media > 100:
-            fatores_relevantes.append("Excesso de velocidade")
+        if dados.condicao_metereologica:
+            fatores_relevantes.extend(self.fatores_por_condicao.get(dados.condicao_metereologica.casefold(), []))
+        hora = self._hora(dados)
+        if hora is not None:
+            fatores_relevantes.extend(self.fatores_por_hora.get(hora, []))
+        fatores_relevantes = list(dict.fromkeys(fatores_relevantes))
         
-        # Se não identificou fatores específicos, use os fatores gerais
+        # Se não identificou fatores específicos, use os de maior impacto medido
         if not fatores_relevantes:
-            fatores_relevantes = [f.nome for f in fatores_risco[:2]]
+            fatores_relevantes = [f.nome for f in fatores_risco if f.impacto is not None][:2]
         
         # Obter recomendações para os fatores identificados
         recomendacoes = []
@@ -323,8 +514,8 @@ class PrevisaoService:
                     recomendacoes.extend(fator.recomendacoes)
                     break
         
-        # Eliminar duplicatas nas recomendações
-        recomendacoes = list(set(recomendacoes))
+        # Eliminar duplicatas nas recomendações, mantendo a ordem dos fatores
+        recomendacoes = list(dict.fromkeys(recomendacoes))
         
         # Estatísticas da rodovia
         estatisticas_rodovia = {
@@ -344,6 +535,8 @@ class PrevisaoService:
         return {
             "probabilidade_acidente": round(probabilidade_acidente * 100, 2),
             "probabilidade_acidente_fatal": round(probabilidade_acidente_fatal * 100, 2),
+            "probabilidade_fatal_se_acidente": round(probabilidade_fatal * 100, 2),
+            "modelo_fatalidade": modelo_fatalidade,
             "nivel_risco": nivel_risco,
             "fatores_risco": fatores_relevantes,
             "recomendacoes": recomendacoes,
@@ -361,61 +554,57 @@ class PrevisaoService:
         """
         Prevê tendências de acidentes para os próximos meses.
         """
-        df = await self._load_data()
-        modelo = await self._init_modelo_previsao()
-        
-        # Filtrar dados relevantes
-        df_filtered = df.copy()
-        if uf:
-            df_filtered = df_filtered[df_filtered['uf'] == uf]
-        if br:
-            df_filtered = df_filtered[df_filtered['br'].astype(str) == br]
-        if tipo_acidente:
-            df_filtered = df_filtered[df_filtered['tipo_acidente'] == tipo_acidente]
+        async def calcular():
+            modelo = await self._init_modelo_previsao()
+            recortes = await self.carregar_recortes_tendencias()
+            return await executar(self._calcular_tendencias, modelo, recortes, uf, br, tipo_acidente, meses_futuros)
         
-        # Agrupar dados por mês e ano
-        df_filtered['month'] = df_filtered['data_inversa'].dt.month
-        df_filtered['year'] = df_filtered['data_inversa'].dt.year
+        return await self.calculos.executar(("tendencias", uf, br, tipo_acidente, meses_futuros), calcular)
+    
+    def _calcular_tendencias(
+        self,
+        registro: RegistroModelos,
+        recortes: TabelaRecortes,
+        uf: Optional[str],
+        br: Optional[str],
+        tipo_acidente: Optional[str],
+        meses_futuros: int
+    ) -> List[PrevisaoTendencia]:
+        """
+        Cálculo de prever_tendencias, executado no pool de threads.
         
-        df_mensal = df_filtered.groupby(['year', 'month']).agg({
-            'id': 'count',
-            'mortos': 'sum'
-        }).reset_index()
+        Nenhum acidente é filtrado: o histórico de um segmento com modelo
+        próprio vem do registro, e o de filtros combinados (ou sem modelo
+        próprio), do resumo dos recortes.
+        """
+        # Modelo do segmento mais específico entre os filtros (busca no registro)
+        (dimensao, valor), posicao = registro.obter(uf, br, tipo_acidente)
+        filtros = {"uf": uf, "br": br, "tipo": tipo_acidente}
+        informados = {chave for chave, filtro in filtros.items() if filtro}
+        combinado = bool(informados) and informados != {dimensao}
+        
+        if combinado:
+            meses_com_dados, ultimos_12 = recortes.consultar(uf, br, tipo_acidente)
+        elif registro.meses_com_dados is not None:
+            meses_com_dados = int(registro.meses_com_dados[posicao])
+        else:
+            # Registro treinado antes de guardar os meses com dados: o segmento
+            # tem modelo, então tem ao menos MESES_MINIMOS meses de série
+            meses_com_dados = registro.fim - registro.origem + 1
         
         # Se não houver dados suficientes, retorne uma previsão padrão
-        if len(df_mensal) < 6:
+        if meses_com_dados < 6:
             return self._gerar_previsao_padrao(meses_futuros, uf, br)
         
-        # Preparar dados para previsão
-        # Último ano e mês nos dados
-        ultimo_ano = df_mensal['year'].max()
-        ultimo_mes = df_mensal.loc[df_mensal['year'] == ultimo_ano, 'month'].max()
-        
-        # Gerar datas futuras para previsão
-        datas_futuras = []
-        anos_futuros = []
-        meses_futuros_list = []
-        
-        data_atual = date(int(ultimo_ano), int(ultimo_mes), 1)
-        for i in range(1, meses_futuros + 1):
-            data_proxima = data_atual + timedelta(days=32 * i)
-            data_proxima = date(data_proxima.year, data_proxima.month, 1)  # Primeiro dia do mês
-            datas_futuras.append(data_proxima)
-            anos_futuros.append(data_proxima.year)
-            meses_futuros_list.append(data_proxima.month)
-        
-        # Prever acidentes para os meses futuros
-        X_futuro = np.column_stack([anos_futuros, meses_futuros_list])
-        previsao_acidentes = modelo.predict(X_futuro)
-        
-        # Calcular intervalo de confiança (simplificado)
-        # Em um sistema real, usaríamos abordagens estatísticas mais robustas
-        std_acidentes = df_mensal['id'].std()
-        intervalo_confianca = stats.norm.interval(0.95, loc=0, scale=std_acidentes)
-        
-        # Calcular previsão de mortes com base na taxa histórica de mortalidade
-        taxa_mortalidade = df_filtered['mortos'].sum() / len(df_filtered) if len(df_filtered) > 0 else 0.05
-        previsao_mortes = previsao_acidentes * taxa_mortalidade
+        datas_futuras, previsao, inferior, superior = registro.prever([posicao], meses_futuros)
+        previsao, inferior, superior = previsao[0], inferior[0], superior[0]
+        
+        # Filtros combinados (ou sem modelo próprio): escalar a previsão do
+        # segmento pela participação do recorte nos últimos 12 meses da série
+        if combinado:
+            total_segmento = registro.ultimos_12[posicao]
+            escala = np.divide(ultimos_12, total_segmento, out=np.zeros(2), where=total_segmento > 0)
+            previsao, inferior, superior = previsao * escala, inferior * escala, superior * escala
         
         # Fatores considerados na previsão
         fatores = ["Sazonalidade", "Tendência histórica"]
@@ -425,39 +614,67 @@ class PrevisaoService:
             fatores.append(f"Dados específicos da rodovia BR-{br}")
         if tipo_acidente:
             fatores.append(f"Dados específicos do tipo de acidente: {tipo_acidente}")
+        fatores.append("Modelo nacional" if dimensao == "brasil" else f"Modelo do segmento {dimensao}={valor}")
         
-        # Criar objetos de previsão
-        resultado = []
-        for i, data in enumerate(datas_futuras):
-            previsao_acidentes_valor = max(0, previsao_acidentes[i])
-            previsao_mortes_valor = max(0, previsao_mortes[i])
-            
-            # Previsão de acidentes
-            tendencia_acidentes = PrevisaoTendencia(
-                data_referencia=data,
-                valor_previsto=float(previsao_acidentes_valor),
-                intervalo_confianca_inferior=float(max(0, previsao_acidentes_valor + intervalo_confianca[0])),
-                intervalo_confianca_superior=float(max(0, previsao_acidentes_valor + intervalo_confianca[1])),
-                tipo_previsao="acidentes",
-                unidade_geografica=uf if uf else "Brasil",
-                fatores_considerados=fatores
-            )
-            resultado.append(tendencia_acidentes)
-            
-            # Previsão de mortes
-            tendencia_mortes = PrevisaoTendencia(
-                data_referencia=data,
-                valor_previsto=float(previsao_mortes_valor),
-                intervalo_confianca_inferior=float(max(0, previsao_mortes_valor * 0.8)),
-                intervalo_confianca_superior=float(previsao_mortes_valor * 1.2),
-                tipo_previsao="mortes",
-                unidade_geografica=uf if uf else "Brasil",
-                fatores_considerados=fatores
-            )
-            resultado.append(tendencia_mortes)
+        return self._montar_tendencias(datas_futuras, previsao, inferior, superior, uf if uf else "Brasil", fatores)
+    
+    def _montar_tendencias(
+        self,
+        datas: List[date],
+        previsao: np.ndarray,
+        inferior: np.ndarray,
+        superior: np.ndarray,
+        unidade_geografica: str,
+        fatores: List[str]
+    ) -> List[PrevisaoTendencia]:
+        """
+        Monta as previsões de acidentes e mortes de cada mês.
         
+        Args:
+            datas: Meses previstos
+            previsao, inferior, superior: Arrays meses x 2 (acidentes, mortes)
+            unidade_geografica: UF ou "Brasil"
+            fatores: Fatores considerados na previsão
+        """
+        resultado = []
+        for i, data in enumerate(datas):
+            for j, tipo_previsao in enumerate(["acidentes", "mortes"]):
+                resultado.append(PrevisaoTendencia(
+                    data_referencia=data,
+                    valor_previsto=float(previsao[i, j]),
+                    intervalo_confianca_inferior=float(inferior[i, j]),
+                    intervalo_confianca_superior=float(superior[i, j]),
+                    tipo_previsao=tipo_previsao,
+                    unidade_geografica=unidade_geografica,
+                    fatores_considerados=fatores
+                ))
         return resultado
     
+    async def prever_tendencias_ufs(self, meses_futuros: int = 12) -> Dict[str, List[PrevisaoTendencia]]:
+        """
+        Prevê as tendências de acidentes de todas as UFs, em uma única previsão
+        vetorizada sobre os modelos das UFs.
+        """
+        async def calcular():
+            registro = await self._init_modelo_previsao()
+            return await executar(self._calcular_tendencias_ufs, registro, meses_futuros)
+        
+        return await self.calculos.executar(("tendencias_ufs", meses_futuros), calcular)
+    
+    def _calcular_tendencias_ufs(self, registro: RegistroModelos, meses_futuros: int) -> Dict[str, List[PrevisaoTendencia]]:
+        """Cálculo de prever_tendencias_ufs, executado no pool de threads."""
+        chaves = registro.segmentos("uf")
+        datas, previsao, inferior, superior = registro.prever(
+            [registro.posicoes[chave] for chave in chaves], meses_futuros
+        )
+        return {
+            uf: self._montar_tendencias(
+                datas, previsao[i], inferior[i], superior[i], uf,
+                ["Sazonalidade", "Tendência histórica", f"Modelo do segmento uf={uf}"]
+            )
+            for i, (_, uf) in enumerate(chaves)
+        }
+    
     def _gerar_previsao_padrao(self, num_meses: int, uf: Optional[str] = None, br: Optional[str] = None) -> List[PrevisaoTendencia]:
         """Gera uma previsão padrão quando não há dados suficientes."""
         resultado = []
@@ -494,21 +711,33 @@ class PrevisaoService:
     
     async def get_fatores_risco(self) -> Dict[str, Any]:
         """
-        Retorna informações sobre os principais fatores de risco.
+        Retorna informações sobre os principais fatores de risco, com o
+        impacto e o risco relativo de desfecho fatal medidos nos dados, e o
+        risco relativo de cada causa, condição meteorológica, hora e traçado.
         """
-        fatores = await self._init_fatores_risco()
+        await self._init_fatores_risco()
+        analise = self.analise_fatores
         
         return {
             "fatores": [
                 {
-                    "nome": fator.nome,
-                    "descricao": fator.descricao,
-                    "impacto": fator.impacto,
-                    "recomendacoes": fator.recomendacoes
+                    "nome": fator["nome"],
+                    "descricao": fator["descricao"],
+                    "medido": fator["medido"],
+                    "impacto": fator["impacto"],
+                    "risco_relativo": fator["risco_relativo"],
+                    "ic_95": fator["ic_95"],
+                    "acidentes": fator["acidentes"],
+                    "causas": fator["causas"],
+                    "condicoes": fator["condicoes"],
+                    "recomendacoes": fator["recomendacoes"]
                 }
-                for fator in fatores
+                for fator in analise["fatores"]
             ],
-            "metodologia": "A identificação dos fatores de risco foi realizada com base na análise estatística dos dados de acidentes, considerando correlações entre causas de acidentes, condições das vias, fatores climáticos e perfis dos condutores."
+            "dimensoes": analise["dimensoes"],
+            "taxa_fatal": analise["taxa_fatal"],
+            "versao_dados": analise["versao_dados"],
+            "metodologia": "O impacto de cada fator é medido nos dados de acidentes: o risco relativo (RR) de desfecho fatal dos acidentes com as causas ou condições meteorológicas do fator, comparados aos demais, com intervalo de 95%, e o impacto é a fração atribuível nos expostos (1 - 1/RR). Fatores sem nenhuma causa ou condição correspondente nos dados não são medidos (medido falso, impacto e risco relativo nulos). O mesmo risco relativo é calculado para cada causa, condição meteorológica, hora do dia e traçado da via. A análise é refeita a cada nova versão do dataset."
         }
     
     async def get_recomendacoes_seguranca(self, perfil: Optional[str] = None) -> Dict[str, List[str]]:
@@ -0,0 +1,81 @@
+import gzip
+import hashlib
+import orjson
+from typing import Any, Optional
+from fastapi.responses import Response
+
+# Brotli é opcional: sem o pacote, os corpos são pré-comprimidos apenas em gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+class CorpoPreComprimido:
+    """
+    Corpo JSON codificado e comprimido uma única vez, para respostas grandes que
+    mudam raramente (como os GeoJSON do mapa).
+
+    Guarda as versões sem compressão, gzip e, se disponível, brotli, além de um
+    ETag calculado sobre o conteúdo. Cada requisição apenas escolhe a versão
+    aceita pelo cliente, sem codificar nem comprimir de novo.
+    """
+
+    def __init__(self, conteudo: Any, max_age: int = 86400):
+        """
+        Args:
+            conteudo: Objeto a ser codificado em JSON
+            max_age: Tempo (segundos) de cache no navegador
+        """
+        self.corpo = orjson.dumps(conteudo)
+        self.gzip = gzip.compress(self.corpo, compresslevel=9)
+        self.brotli = brotli.compress(self.corpo, quality=11) if brotli is not None else None
+        self.etag = f'"{hashlib.sha1(self.corpo).hexdigest()}"'
+        self.max_age = max_age
+
+    def responder(self, accept_encoding: Optional[str] = None, if_none_match: Optional[str] = None) -> Response:
+        """
+        Monta a resposta com a melhor codificação aceita pelo cliente.
+
+        Args:
+            accept_encoding: Valor do cabeçalho Accept-Encoding da requisição
+            if_none_match: Valor do cabeçalho If-None-Match da requisição
+
+        Returns:
+            Response 304 se o ETag do cliente ainda for válido, senão o corpo
+            na codificação aceita de maior peso (q): brotli, gzip ou sem
+            compressão
+        """
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": f"public, max-age={self.max_age}",
+            "Vary": "Accept-Encoding",
+        }
+
+        if if_none_match and self.etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+
+        # Peso (q) de cada codificação aceita; q=0 recusa a codificação
+        pesos = {}
+        for item in (accept_encoding or "").split(","):
+            partes = [parte.strip() for parte in item.split(";")]
+            peso = 1.0
+            for parametro in partes[1:]:
+                if parametro.startswith("q="):
+                    try:
+                        peso = float(parametro[2:])
+                    except ValueError:
+                        peso = 0.0
+            if partes[0]:
+                pesos[partes[0].lower()] = peso
+
+        # A de maior peso; em caso de empate, brotli antes de gzip
+        disponiveis = [("br", self.brotli), ("gzip", self.gzip)]
+        aceitas = [(codificacao, corpo) for codificacao, corpo in disponiveis
+                   if corpo is not None and pesos.get(codificacao, 0.0) > 0]
+        if aceitas:
+            codificacao, corpo = max(aceitas, key=lambda aceita: pesos[aceita[0]])
+            headers["Content-Encoding"] = codificacao
+        else:
+            corpo = self.corpo
+
+        return Response(corpo, media_type="application/json", headers=headers)
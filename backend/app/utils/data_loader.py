@@ -3,16 +3,29 @@ import os
 from backend.app.core.config import settings
 import asyncio
 from datetime import datetime
+from typing import Dict
+from backend.app.utils.singleflight import SingleFlight
 
 class DataLoader:
     """
     Classe responsável pelo carregamento e pré-processamento dos dados de acidentes.
+    
+    O DataFrame carregado é compartilhado por todas as instâncias (um por arquivo),
+    e carregamentos concorrentes do mesmo arquivo aguardam uma única leitura do CSV.
     """
+    # DataFrames já carregados, por caminho do arquivo
+    cache: Dict[str, pd.DataFrame] = {}
+    # Carregamentos em andamento, por caminho do arquivo
+    carregamentos = SingleFlight()
     
     def __init__(self):
         self.file_path = os.path.join(settings.DATA_DIR, 'datatran_all_years.csv')
         print(f"Loading data from: {self.file_path}")
-        self.cached_data = None
+    
+    @property
+    def cached_data(self):
+        """DataFrame já carregado do arquivo desta instância, ou None."""
+        return DataLoader.cache.get(self.file_path)
     
     async def load_data(self) -> pd.DataFrame:
         """
@@ -24,12 +37,18 @@ class DataLoader:
         if self.cached_data is not None:
             return self.cached_data
         
-        # Simular operação assíncrona para carregamento de dados
-        # Em aplicações reais, isso poderia ser uma operação de leitura de banco de dados
-        loop = asyncio.get_event_loop()
+        return await DataLoader.carregamentos.executar(self.file_path, self._carregar)
+    
+    async def _carregar(self) -> pd.DataFrame:
+        """Lê o CSV fora do event loop e guarda o resultado no cache compartilhado."""
+        # Chamadas que aguardavam outro carregamento podem encontrar o cache já pronto
+        if self.cached_data is not None:
+            return self.cached_data
+        
+        loop = asyncio.get_running_loop()
         df = await loop.run_in_executor(None, self._load_data_sync)
         
-        self.cached_data = df
+        DataLoader.cache[self.file_path] = df
         return df
     
     def _load_data_sync(self) -> pd.DataFrame:
@@ -0,0 +1,165 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from backend.app.core.config import settings
+
+class FilaCheiaError(Exception):
+    """A fila do executor atingiu o limite e a tarefa foi recusada."""
+
+class TempoEsgotadoError(Exception):
+    """A tarefa não terminou dentro do tempo limite."""
+
+class ExecutorLimitado:
+    """
+    Pool de threads para cálculos pesados (pandas, scikit-learn) chamados pelos
+    endpoints, fora do event loop.
+
+    O número de tarefas aceitas é limitado a workers + fila_max: além disso, a
+    tarefa é recusada imediatamente (FilaCheiaError), em vez de acumular espera.
+    Cada tarefa tem um tempo limite (TempoEsgotadoError); a thread não pode ser
+    interrompida, então a vaga de uma tarefa já iniciada só é liberada quando
+    o cálculo de fato termina.
+
+    Threads (e não processos) porque os cálculos operam sobre o DataFrame já
+    carregado em memória, que seria copiado para cada processo; as operações
+    vetorizadas do pandas/NumPy liberam o GIL durante a maior parte do tempo.
+    """
+
+    def __init__(self, workers: int, fila_max: int, timeout: float):
+        """
+        Args:
+            workers: Número de threads
+            fila_max: Tarefas que podem aguardar por uma thread livre
+            timeout: Tempo limite padrão (segundos) de cada tarefa
+        """
+        self.workers = workers
+        self.fila_max = fila_max
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="calculo")
+        self._lock = threading.Lock()
+
+        # Métricas
+        self.em_execucao = 0
+        self.na_fila = 0
+        self.concluidas = 0
+        self.falhas = 0
+        self.recusadas = 0
+        self.expiradas = 0
+        self.tempo_execucao_total = 0.0
+        self.tempo_execucao_max = 0.0
+        self.tempo_fila_total = 0.0
+        self.tempo_fila_max = 0.0
+
+    async def executar(self, funcao: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """
+        Executa a função no pool e aguarda o resultado sem bloquear o event loop.
+
+        Args:
+            funcao: Função síncrona a ser executada
+            *args: Argumentos posicionais da função
+            timeout: Tempo limite (segundos); None usa o padrão do executor
+            **kwargs: Argumentos nomeados da função
+
+        Returns:
+            Resultado da função
+
+        Raises:
+            FilaCheiaError: Se o executor já tiver workers + fila_max tarefas
+            TempoEsgotadoError: Se a tarefa exceder o tempo limite
+        """
+        with self._lock:
+            if self.em_execucao + self.na_fila >= self.workers + self.fila_max:
+                self.recusadas += 1
+                raise FilaCheiaError(
+                    f"Executor ocupado: {self.em_execucao} tarefas em execução e {self.na_fila} na fila"
+                )
+            self.na_fila += 1
+
+        enfileirada_em = time.perf_counter()
+        futuro = self._pool.submit(self._medir, funcao, args, kwargs, enfileirada_em)
+        futuro.add_done_callback(self._liberar_cancelada)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(futuro), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.expiradas += 1
+            raise TempoEsgotadoError(f"Cálculo excedeu o tempo limite de {timeout or self.timeout:g} s")
+
+    def _liberar_cancelada(self, futuro):
+        """Libera a vaga de uma tarefa cancelada (tempo esgotado ou requisição encerrada) antes de iniciar."""
+        if futuro.cancelled():
+            with self._lock:
+                self.na_fila -= 1
+
+    def _medir(self, funcao: Callable, args: tuple, kwargs: dict, enfileirada_em: float) -> Any:
+        """Executa a função na thread do pool, atualizando as métricas."""
+        inicio = time.perf_counter()
+        espera = inicio - enfileirada_em
+        with self._lock:
+            self.na_fila -= 1
+            self.em_execucao += 1
+            self.tempo_fila_total += espera
+            self.tempo_fila_max = max(self.tempo_fila_max, espera)
+
+        sucesso = False
+        try:
+            resultado = funcao(*args, **kwargs)
+            sucesso = True
+            return resultado
+        finally:
+            duracao = time.perf_counter() - inicio
+            with self._lock:
+                self.em_execucao -= 1
+                if sucesso:
+                    self.concluidas += 1
+                else:
+                    self.falhas += 1
+                self.tempo_execucao_total += duracao
+                self.tempo_execucao_max = max(self.tempo_execucao_max, duracao)
+
+    def metricas(self) -> Dict[str, Any]:
+        """
+        Retorna o estado atual e os contadores acumulados do executor.
+
+        Returns:
+            Dicionário com ocupação, contadores e tempos (em milissegundos)
+        """
+        with self._lock:
+            finalizadas = self.concluidas + self.falhas
+            iniciadas = finalizadas + self.em_execucao
+            return {
+                "workers": self.workers,
+                "fila_max": self.fila_max,
+                "timeout_s": self.timeout,
+                "em_execucao": self.em_execucao,
+                "na_fila": self.na_fila,
+                "concluidas": self.concluidas,
+                "falhas": self.falhas,
+                "recusadas": self.recusadas,
+                "expiradas": self.expiradas,
+                "tempo_execucao_medio_ms": round(self.tempo_execucao_total / finalizadas * 1000, 2) if finalizadas else 0.0,
+                "tempo_execucao_max_ms": round(self.tempo_execucao_max * 1000, 2),
+                "tempo_fila_medio_ms": round(self.tempo_fila_total / iniciadas * 1000, 2) if iniciadas else 0.0,
+                "tempo_fila_max_ms": round(self.tempo_fila_max * 1000, 2),
+            }
+
+    def encerrar(self):
+        """Encerra o pool sem aguardar as tarefas em andamento."""
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+# Executor compartilhado pelos serviços baseados em DataFrame
+executor_calculos = ExecutorLimitado(
+    workers=settings.EXECUTOR_WORKERS or min(4, os.cpu_count() or 1),
+    fila_max=settings.EXECUTOR_FILA_MAX,
+    timeout=settings.EXECUTOR_TIMEOUT,
+)
+
+async def executar(funcao: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+    """
+    Executa um cálculo síncrono no executor compartilhado (veja ExecutorLimitado.executar).
+    """
+    return await executor_calculos.executar(funcao, *args, timeout=timeout, **kwargs)
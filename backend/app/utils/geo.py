@@ -0,0 +1,259 @@
+import pandas as pd
+import numpy as np
+from typing import Any, Dict, List, Optional
+
+# Tolerância (graus) do Douglas–Peucker por nível de zoom máximo atendido.
+# Cerca de um pixel no zoom indicado: acima do último nível, usa-se o
+# GeoJSON original, sem simplificação adicional.
+NIVEIS_ZOOM_UFS = {
+    4: 0.05,
+    6: 0.015,
+    8: 0.005,
+}
+
+def douglas_peucker(pontos: np.ndarray, tolerancia: float) -> np.ndarray:
+    """
+    Simplifica uma linha pelo algoritmo de Douglas–Peucker.
+
+    Args:
+        pontos: Array (n, 2) com as coordenadas da linha
+        tolerancia: Distância máxima (nas unidades das coordenadas) entre a
+            linha original e a simplificada
+
+    Returns:
+        Array com os pontos mantidos, incluindo sempre o primeiro e o último
+    """
+    n = len(pontos)
+    if n < 3:
+        return pontos
+
+    manter = np.zeros(n, dtype=bool)
+    manter[0] = manter[-1] = True
+
+    # Pilha de trechos (início, fim) ainda não simplificados
+    pilha = [(0, n - 1)]
+    while pilha:
+        inicio, fim = pilha.pop()
+        if fim - inicio < 2:
+            continue
+
+        a = pontos[inicio]
+        b = pontos[fim]
+        intermediarios = pontos[inicio + 1:fim]
+        segmento = b - a
+        comprimento = np.hypot(segmento[0], segmento[1])
+        if comprimento == 0:
+            distancias = np.hypot(intermediarios[:, 0] - a[0], intermediarios[:, 1] - a[1])
+        else:
+            # Distância perpendicular de cada ponto à reta que liga os extremos
+            distancias = np.abs(segmento[0] * (intermediarios[:, 1] - a[1])
+                                - segmento[1] * (intermediarios[:, 0] - a[0])) / comprimento
+
+        indice = int(np.argmax(distancias))
+        if distancias[indice] > tolerancia:
+            meio = inicio + 1 + indice
+            manter[meio] = True
+            pilha.append((inicio, meio))
+            pilha.append((meio, fim))
+
+    return pontos[manter]
+
+def simplificar_anel(anel: List[List[float]], tolerancia: float, casas_decimais: int) -> Optional[List[List[float]]]:
+    """
+    Simplifica um anel de polígono, mantendo-o fechado.
+
+    Args:
+        anel: Lista de coordenadas [lng, lat], com o último ponto igual ao primeiro
+        tolerancia: Tolerância do Douglas–Peucker
+        casas_decimais: Casas decimais mantidas nas coordenadas
+
+    Returns:
+        Anel simplificado, ou None se ele se reduzir a menos de um triângulo
+    """
+    pontos = np.asarray(anel, dtype=float)
+    if len(pontos) < 4:
+        return None
+
+    # O anel é dividido no ponto mais distante do início para que os extremos
+    # (iguais no anel fechado) não formem um segmento degenerado
+    distancias = np.hypot(pontos[:, 0] - pontos[0, 0], pontos[:, 1] - pontos[0, 1])
+    oposto = int(np.argmax(distancias))
+    if oposto == 0:
+        return None
+    primeira = douglas_peucker(pontos[:oposto + 1], tolerancia)
+    segunda = douglas_peucker(pontos[oposto:], tolerancia)
+    simplificado = np.round(np.vstack([primeira, segunda[1:]]), casas_decimais)
+
+    # Remover pontos repetidos em sequência criados pelo arredondamento
+    repetido = np.all(simplificado[1:] == simplificado[:-1], axis=1)
+    simplificado = simplificado[np.concatenate([[True], ~repetido])]
+    if len(simplificado) < 4:
+        return None
+    return simplificado.tolist()
+
+def simplificar_geometria(geometria: Dict[str, Any], tolerancia: float, casas_decimais: int = 5) -> Optional[Dict[str, Any]]:
+    """
+    Simplifica uma geometria GeoJSON do tipo Polygon ou MultiPolygon.
+
+    Anéis internos e polígonos que desaparecem na tolerância indicada são descartados.
+
+    Args:
+        geometria: Geometria GeoJSON
+        tolerancia: Tolerância do Douglas–Peucker (graus)
+        casas_decimais: Casas decimais mantidas nas coordenadas
+
+    Returns:
+        Geometria simplificada, ou None se nada restar
+    """
+    def simplificar_poligono(aneis):
+        externo = simplificar_anel(aneis[0], tolerancia, casas_decimais)
+        if externo is None:
+            return None
+        internos = [simplificar_anel(anel, tolerancia, casas_decimais) for anel in aneis[1:]]
+        return [externo] + [anel for anel in internos if anel is not None]
+
+    if geometria["type"] == "Polygon":
+        poligonos = [geometria["coordinates"]]
+    elif geometria["type"] == "MultiPolygon":
+        poligonos = geometria["coordinates"]
+    else:
+        return geometria
+
+    simplificados = [p for p in (simplificar_poligono(aneis) for aneis in poligonos) if p is not None]
+    if not simplificados:
+        # Manter ao menos o maior polígono, para a feição não sumir do mapa
+        maior = max(poligonos, key=lambda aneis: len(aneis[0]))
+        simplificados = [[np.round(np.asarray(maior[0], dtype=float), casas_decimais).tolist()]]
+
+    if len(simplificados) == 1:
+        return {"type": "Polygon", "coordinates": simplificados[0]}
+    return {"type": "MultiPolygon", "coordinates": simplificados}
+
+def simplificar_geojson(geojson: Dict[str, Any], tolerancia: float, casas_decimais: int = 5) -> Dict[str, Any]:
+    """
+    Simplifica todas as feições de uma FeatureCollection.
+
+    Args:
+        geojson: FeatureCollection GeoJSON
+        tolerancia: Tolerância do Douglas–Peucker (graus)
+        casas_decimais: Casas decimais mantidas nas coordenadas
+
+    Returns:
+        Nova FeatureCollection com as geometrias simplificadas
+    """
+    features = []
+    for feature in geojson["features"]:
+        geometria = simplificar_geometria(feature["geometry"], tolerancia, casas_decimais)
+        if geometria is not None:
+            features.append({**feature, "geometry": geometria})
+    return {"type": "FeatureCollection", "features": features}
+
+def nivel_para_zoom(zoom: Optional[int], niveis: Dict[int, float] = NIVEIS_ZOOM_UFS) -> Optional[int]:
+    """
+    Escolhe o nível de simplificação adequado a um zoom de mapa.
+
+    Args:
+        zoom: Nível de zoom do mapa (None para a geometria completa)
+        niveis: Níveis disponíveis (zoom máximo -> tolerância)
+
+    Returns:
+        Menor nível que atende ao zoom, ou None para a geometria completa
+    """
+    if zoom is None:
+        return None
+    for nivel in sorted(niveis):
+        if zoom <= nivel:
+            return nivel
+    return None
+
+def distancia_km(lat1: np.ndarray, lng1: np.ndarray, lat2: np.ndarray, lng2: np.ndarray) -> np.ndarray:
+    """
+    Distância aproximada (equirretangular) entre pares de coordenadas, em km.
+
+    Suficiente para as distâncias curtas comparadas ao traçar as rodovias.
+    """
+    lat_media = np.radians((lat1 + lat2) / 2)
+    dx = (lng2 - lng1) * 111.32 * np.cos(lat_media)
+    dy = (lat2 - lat1) * 110.57
+    return np.hypot(dx, dy)
+
+def tracar_rodovia(
+    km: np.ndarray,
+    latitude: np.ndarray,
+    longitude: np.ndarray,
+    passo_km: float = 1.0,
+    janela: int = 7,
+    desvio_max_km: float = 5.0,
+    lacuna_km: float = 25.0,
+    tolerancia: float = 0.002,
+    casas_decimais: int = 4
+) -> List[List[List[float]]]:
+    """
+    Aproxima o traçado de uma rodovia a partir das coordenadas dos acidentes.
+
+    Os acidentes são agrupados em faixas de passo_km pelo km informado e cada
+    faixa é representada pela mediana das coordenadas, o que já descarta pontos
+    isolados com coordenadas erradas. Em seguida, faixas que se afastam mais de
+    desvio_max_km da mediana móvel das vizinhas são removidas. A linha é
+    interrompida onde faltam dados por mais de lacuna_km ou onde o salto entre
+    faixas consecutivas é incompatível com a distância em km, e cada parte é
+    simplificada com Douglas–Peucker.
+
+    Args:
+        km: Quilômetro de cada acidente
+        latitude: Latitude de cada acidente
+        longitude: Longitude de cada acidente
+        passo_km: Tamanho das faixas de km
+        janela: Número de faixas da mediana móvel
+        desvio_max_km: Distância máxima de uma faixa à mediana móvel das vizinhas
+        lacuna_km: Intervalo de km sem dados a partir do qual a linha é interrompida
+        tolerancia: Tolerância do Douglas–Peucker (graus)
+        casas_decimais: Casas decimais mantidas nas coordenadas
+
+    Returns:
+        Lista de partes da linha, cada uma com coordenadas [lng, lat] ordenadas por km
+    """
+    km = np.asarray(km, dtype=float)
+    latitude = np.asarray(latitude, dtype=float)
+    longitude = np.asarray(longitude, dtype=float)
+
+    # Descartar coordenadas ausentes ou fora do território brasileiro
+    validos = (np.isfinite(km) & np.isfinite(latitude) & np.isfinite(longitude)
+               & (latitude > -34.0) & (latitude < 5.5) & (longitude > -74.0) & (longitude < -28.0))
+    if validos.sum() < 2:
+        return []
+
+    faixas = (
+        pd.DataFrame({
+            "faixa": np.floor(km[validos] / passo_km),
+            "latitude": latitude[validos],
+            "longitude": longitude[validos],
+        })
+        .groupby("faixa")
+        .median()
+    )
+
+    # Remover faixas distantes da mediana móvel das vizinhas
+    vizinhas = faixas.rolling(janela, center=True, min_periods=1).median()
+    desvio = distancia_km(faixas["latitude"].values, faixas["longitude"].values,
+                          vizinhas["latitude"].values, vizinhas["longitude"].values)
+    faixas = faixas[desvio <= desvio_max_km]
+    if len(faixas) < 2:
+        return []
+
+    km_faixas = (faixas.index.values + 0.5) * passo_km
+    lat = faixas["latitude"].values
+    lng = faixas["longitude"].values
+
+    # Interromper a linha em lacunas de km ou saltos geográficos incoerentes
+    delta_km = np.diff(km_faixas)
+    salto = distancia_km(lat[:-1], lng[:-1], lat[1:], lng[1:])
+    quebras = np.flatnonzero((delta_km > lacuna_km) | (salto > 3 * delta_km + desvio_max_km)) + 1
+
+    partes = []
+    for inicio, fim in zip(np.concatenate([[0], quebras]), np.concatenate([quebras, [len(lat)]])):
+        if fim - inicio < 2:
+            continue
+        pontos = douglas_peucker(np.column_stack([lng[inicio:fim], lat[inicio:fim]]), tolerancia)
+        partes.append(np.round(pontos, casas_decimais).tolist())
+    return partes
@@ -0,0 +1,117 @@
+from itertools import combinations
+from typing import Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+class IndiceKm:
+    """
+    Índice dos acidentes de cada rodovia ordenados por km, com as mortes
+    acumuladas, para contar acidentes e mortes em um intervalo de km sem
+    percorrer as linhas da rodovia.
+
+    Para cada combinação de filtros opcionais (dia da semana, hora e condição
+    meteorológica, incluindo nenhum) há uma visão com as linhas ordenadas pelo
+    grupo (UF e BR mais os valores dos filtros) e, dentro do grupo, pelo km.
+    Um intervalo [km_inicial, km_final] é então localizado por duas buscas
+    binárias na fatia do grupo: o número de acidentes é a diferença entre as
+    posições, e o de mortes, a diferença entre as somas acumuladas.
+
+    Cada visão guarda uma cópia do km e das mortes acumuladas (16 bytes por
+    acidente); os grupos ficam em um array ordenado de códigos inteiros.
+    """
+    # Filtros opcionais, na ordem usada para compor o código dos grupos
+    DIMENSOES = ["dia", "hora", "condicao"]
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Args:
+            df: DataFrame de acidentes pré-processado (veja DataLoader)
+        """
+        rodovia, rodovias = pd.MultiIndex.from_arrays([df['uf'], df['br'].astype(str)]).factorize()
+        self.rodovias: Dict[Tuple[str, str], int] = {tuple(chave): i for i, chave in enumerate(rodovias)}
+
+        colunas = {}
+        self.codigos: Dict[str, Dict] = {}
+        for nome, serie in [("dia", df['dia_semana']), ("hora", df['HORA']), ("condicao", df['condicao_metereologica'])]:
+            codigo, valores = pd.factorize(serie)
+            # Códigos a partir de 1; 0 fica para valores ausentes
+            colunas[nome] = codigo.astype(np.int64) + 1
+            self.codigos[nome] = {valor: i + 1 for i, valor in enumerate(valores.tolist())}
+        self.tamanhos = {nome: len(valores) + 1 for nome, valores in self.codigos.items()}
+
+        km = df['km'].to_numpy(dtype=float)
+        mortos = df['mortos'].to_numpy(dtype=np.int64)
+        self.visoes: Dict[Tuple[str, ...], Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = {}
+        for n in range(len(self.DIMENSOES) + 1):
+            for dimensoes in combinations(self.DIMENSOES, n):
+                grupo = self._codigo_grupo(rodovia.astype(np.int64), {nome: colunas[nome] for nome in dimensoes})
+                ordem = np.lexsort((km, grupo))
+                grupos, inicios = np.unique(grupo[ordem], return_index=True)
+                self.visoes[dimensoes] = (
+                    grupos,
+                    np.append(inicios, len(ordem)),
+                    km[ordem],
+                    np.concatenate([[0], np.cumsum(mortos[ordem])]),
+                )
+
+    def _codigo_grupo(self, rodovia, valores: Dict[str, object]):
+        """Código inteiro do grupo: a rodovia e os valores dos filtros em base mista."""
+        codigo = rodovia
+        for nome in self.DIMENSOES:
+            if nome in valores:
+                codigo = codigo * self.tamanhos[nome] + valores[nome]
+        return codigo
+
+    def consultar(
+        self,
+        uf: str,
+        br: str,
+        dia_semana: Optional[str] = None,
+        hora: Optional[int] = None,
+        condicao_metereologica: Optional[str] = None,
+        km_inicial: Optional[float] = None,
+        km_final: Optional[float] = None
+    ) -> Tuple[int, int]:
+        """
+        Conta os acidentes e as mortes de uma rodovia, com os filtros opcionais.
+
+        Args:
+            uf: Estado (UF)
+            br: Rodovia BR
+            dia_semana: Dia da semana
+            hora: Hora do dia (0 a 23)
+            condicao_metereologica: Condição meteorológica
+            km_inicial: Início do intervalo de km (inclusivo)
+            km_final: Fim do intervalo de km (inclusivo); o intervalo só é
+                aplicado quando os dois limites são informados
+
+        Returns:
+            Tupla (acidentes, mortos)
+        """
+        if (uf, br) not in self.rodovias:
+            return 0, 0
+
+        filtros = {"dia": dia_semana, "hora": hora, "condicao": condicao_metereologica}
+        valores = {}
+        for nome, valor in filtros.items():
+            if valor is not None:
+                if valor not in self.codigos[nome]:
+                    return 0, 0
+                valores[nome] = self.codigos[nome][valor]
+
+        grupos, limites, km, mortos_acumulados = self.visoes[tuple(valores)]
+        grupo = self._codigo_grupo(self.rodovias[(uf, br)], valores)
+        posicao = np.searchsorted(grupos, grupo)
+        if posicao == len(grupos) or grupos[posicao] != grupo:
+            return 0, 0
+        inicio, fim = int(limites[posicao]), int(limites[posicao + 1])
+
+        if km_inicial is not None and km_final is not None:
+            trecho = km[inicio:fim]
+            inicio, fim = (
+                inicio + int(np.searchsorted(trecho, km_inicial, side="left")),
+                inicio + int(np.searchsorted(trecho, km_final, side="right")),
+            )
+            fim = max(inicio, fim)
+
+        return fim - inicio, int(mortos_acumulados[fim] - mortos_acumulados[inicio])
@@ -0,0 +1,174 @@
+import json
+import orjson
+import pyarrow as pa
+from datetime import date, time
+from typing import Any, Dict, List, Optional, Sequence
+from fastapi.responses import Response
+
+# MessagePack é opcional: o formato só é oferecido se o pacote estiver instalado
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Formatos de resposta aceitos no cabeçalho Accept das listagens
+MIME_JSON = "application/json"
+MIME_COLUNAR = "application/vnd.prf.colunar+json"
+MIME_ARROW = "application/vnd.apache.arrow.stream"
+MIME_MSGPACK = "application/msgpack"
+
+# Documentação dos formatos alternativos para o OpenAPI das rotas
+RESPOSTAS_FORMATOS = {
+    200: {
+        "description": "Lista no formato escolhido pelo cabeçalho Accept",
+        "content": {
+            MIME_COLUNAR: {},
+            MIME_ARROW: {},
+            MIME_MSGPACK: {},
+        },
+    }
+}
+
+class RespostaJSON(Response):
+    """
+    Resposta JSON codificada diretamente com orjson.
+
+    Usada pelos endpoints que devolvem muitas linhas já montadas pelos serviços
+    (dicionários com tipos nativos). Ao retornar uma Response, o FastAPI não
+    valida nem serializa o conteúdo de novo pelo response_model, que continua
+    declarado na rota apenas para a documentação da API.
+    """
+    media_type = MIME_JSON
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+def formatar_data(valor: Optional[date]) -> Optional[str]:
+    """
+    Formata uma data no padrão YYYY-MM-DD.
+
+    Args:
+        valor: Data lida do banco
+
+    Returns:
+        Data formatada, ou None se não houver data
+    """
+    return valor.isoformat() if valor else None
+
+def formatar_hora(valor: Optional[time]) -> Optional[str]:
+    """
+    Formata um horário no padrão HH:MM.
+
+    Args:
+        valor: Horário lido do banco
+
+    Returns:
+        Horário formatado, ou None se não houver horário
+    """
+    return f"{valor.hour:02d}:{valor.minute:02d}" if valor else None
+
+def escolher_formato(accept: Optional[str]) -> str:
+    """
+    Escolhe o formato da resposta a partir do cabeçalho Accept.
+
+    Os tipos são considerados em ordem decrescente de preferência (parâmetro q).
+    Tipos não suportados são ignorados e, se nenhum for suportado, usa-se JSON.
+
+    Args:
+        accept: Valor do cabeçalho Accept da requisição
+
+    Returns:
+        Tipo de mídia escolhido
+    """
+    suportados = [MIME_JSON, MIME_COLUNAR, MIME_ARROW]
+    if msgpack is not None:
+        suportados += [MIME_MSGPACK, "application/x-msgpack"]
+
+    preferencias = []
+    for posicao, item in enumerate((accept or "").split(",")):
+        partes = [parte.strip() for parte in item.split(";")]
+        peso = 1.0
+        for parametro in partes[1:]:
+            if parametro.startswith("q="):
+                try:
+                    peso = float(parametro[2:])
+                except ValueError:
+                    peso = 0.0
+        if partes[0] and peso > 0:
+            preferencias.append((-peso, posicao, partes[0].lower()))
+
+    for _, _, tipo in sorted(preferencias):
+        if tipo in suportados:
+            return MIME_MSGPACK if tipo == "application/x-msgpack" else tipo
+    return MIME_JSON
+
+def para_colunas(linhas: List[Dict[str, Any]], colunas: Sequence[str]) -> Dict[str, List[Any]]:
+    """
+    Converte uma lista de linhas (dicionários) para o layout colunar, com uma lista por campo.
+
+    Args:
+        linhas: Linhas com os campos de colunas
+        colunas: Nomes dos campos, na ordem da resposta
+
+    Returns:
+        Dicionário campo -> lista de valores
+    """
+    return {coluna: [linha[coluna] for linha in linhas] for coluna in colunas}
+
+def resposta_negociada(
+    linhas: List[Dict[str, Any]],
+    colunas: Sequence[str],
+    accept: Optional[str],
+    metadados: Optional[Dict[str, Any]] = None,
+    chave_linhas: str = "data"
+) -> Response:
+    """
+    Monta a resposta de uma listagem no formato pedido pelo cabeçalho Accept.
+
+    Formatos:
+        application/json: lista de objetos (ou {chave_linhas: [...], **metadados})
+        application/vnd.prf.colunar+json: um array por campo, sem repetir os nomes
+        application/vnd.apache.arrow.stream: Arrow IPC (stream), metadados no schema
+        application/msgpack: layout colunar codificado em MessagePack (se instalado)
+
+    Args:
+        linhas: Linhas já no formato de resposta
+        colunas: Nomes dos campos de cada linha
+        accept: Valor do cabeçalho Accept da requisição
+        metadados: Campos adicionais enviados junto com as linhas
+        chave_linhas: Chave das linhas quando há metadados
+
+    Returns:
+        Response com o corpo codificado e o cabeçalho Vary: Accept
+    """
+    formato = escolher_formato(accept)
+
+    if formato == MIME_JSON:
+        conteudo = linhas if metadados is None else {chave_linhas: linhas, **metadados}
+        resposta = RespostaJSON(conteudo)
+    elif formato == MIME_ARROW:
+        arrays = {}
+        for nome, valores in para_colunas(linhas, colunas).items():
+            array = pa.array(valores)
+            # Textos repetidos (UF, causa, município...) vão como dicionário
+            arrays[nome] = array.dictionary_encode() if pa.types.is_string(array.type) else array
+        tabela = pa.table(arrays)
+        if metadados:
+            tabela = tabela.replace_schema_metadata(
+                {chave: json.dumps(valor) for chave, valor in metadados.items()}
+            )
+        corpo = pa.BufferOutputStream()
+        with pa.ipc.new_stream(corpo, tabela.schema) as escritor:
+            escritor.write_table(tabela)
+        resposta = Response(corpo.getvalue().to_pybytes(), media_type=MIME_ARROW)
+    else:
+        conteudo = para_colunas(linhas, colunas)
+        if metadados is not None:
+            conteudo = {chave_linhas: conteudo, **metadados}
+        if formato == MIME_MSGPACK:
+            resposta = Response(msgpack.packb(conteudo), media_type=MIME_MSGPACK)
+        else:
+            resposta = Response(orjson.dumps(conteudo), media_type=MIME_COLUNAR)
+
+    resposta.headers["Vary"] = "Accept"
+    return resposta
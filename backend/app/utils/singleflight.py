@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """
+    Coalescência de chamadas concorrentes idênticas ("single flight").
+
+    A primeira chamada com uma chave executa o cálculo; as chamadas com a mesma
+    chave que chegam enquanto ele está em andamento aguardam o mesmo resultado
+    (ou a mesma exceção), em vez de repetir o trabalho. Assim que o cálculo
+    termina a chave é liberada: nada é guardado além da execução em andamento,
+    e o cache de resultados, quando existe, continua a cargo de quem chama.
+    """
+
+    def __init__(self):
+        self._em_andamento: Dict[Hashable, asyncio.Task] = {}
+
+    async def executar(self, chave: Hashable, funcao: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Executa funcao() uma única vez por chave entre as chamadas concorrentes.
+
+        Args:
+            chave: Identificação do cálculo (ex.: nome do método e parâmetros)
+            funcao: Função sem argumentos que retorna a corrotina do cálculo
+
+        Returns:
+            Resultado do cálculo, compartilhado por todas as chamadas com a mesma chave
+        """
+        tarefa = self._em_andamento.get(chave)
+        if tarefa is None:
+            tarefa = asyncio.ensure_future(funcao())
+            self._em_andamento[chave] = tarefa
+            tarefa.add_done_callback(lambda concluida: self._liberar(chave, concluida))
+
+        # shield: o cancelamento de uma requisição (cliente desconectado) não
+        # interrompe o cálculo aguardado pelas demais
+        return await asyncio.shield(tarefa)
+
+    def _liberar(self, chave: Hashable, tarefa: asyncio.Task):
+        """Remove a chave ao fim do cálculo, se ela ainda apontar para a mesma tarefa."""
+        if self._em_andamento.get(chave) is tarefa:
+            del self._em_andamento[chave]
+
+    def em_andamento(self) -> int:
+        """Retorna o número de cálculos em andamento."""
+        return len(self._em_andamento)
@@ -0,0 +1,69 @@
+from itertools import combinations
+from typing import Dict, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+class TabelaRecortes:
+    """
+    Resumo de cada recorte dos acidentes por UF, rodovia e tipo de acidente
+    (cada valor e cada combinação de valores), usado pelas previsões de
+    tendência com filtros combinados ou sem modelo próprio.
+
+    Para cada recorte ficam o número de meses com acidentes e os totais de
+    acidentes e mortes nos últimos 12 meses das séries do modelo, de modo que
+    uma requisição é respondida por uma busca em dicionário, sem filtrar os
+    acidentes.
+    """
+    # Filtros das previsões de tendência, na ordem das chaves
+    DIMENSOES = ["uf", "br", "tipo"]
+
+    def __init__(self, df: pd.DataFrame, fim: int):
+        """
+        Args:
+            df: DataFrame de acidentes pré-processado (veja DataLoader)
+            fim: Índice absoluto (ano * 12 + mês - 1) do último mês das séries
+                do modelo de tendências
+        """
+        base = pd.DataFrame({
+            "indice": df['data_inversa'].dt.year * 12 + df['data_inversa'].dt.month - 1,
+            "mortos": df['mortos'],
+            "uf": df['uf'],
+            "br": df['br'].astype(str),
+            "tipo": df['tipo_acidente'],
+        }).dropna(subset=["indice"])
+        recente = (base["indice"] > fim - 12).astype(int)
+        base["acidentes_12"] = recente
+        base["mortos_12"] = base["mortos"] * recente
+
+        self.recortes: Dict[Tuple[str, ...], Dict[Tuple[str, ...], Tuple[int, np.ndarray]]] = {}
+        for n in range(1, len(self.DIMENSOES) + 1):
+            for dimensoes in combinations(self.DIMENSOES, n):
+                agregado = base.groupby(list(dimensoes)).agg(
+                    meses=("indice", "nunique"), acidentes=("acidentes_12", "sum"), mortos=("mortos_12", "sum")
+                )
+                self.recortes[dimensoes] = {
+                    tuple(str(v) for v in (chave if isinstance(chave, tuple) else (chave,))): (
+                        int(meses), np.array([acidentes, mortos], dtype=float)
+                    )
+                    for chave, meses, acidentes, mortos in zip(
+                        agregado.index, agregado["meses"], agregado["acidentes"], agregado["mortos"]
+                    )
+                }
+
+    def consultar(
+        self,
+        uf: Optional[str] = None,
+        br: Optional[str] = None,
+        tipo_acidente: Optional[str] = None
+    ) -> Tuple[int, np.ndarray]:
+        """
+        Resumo do recorte dos filtros informados (ao menos um).
+
+        Returns:
+            Tupla (meses com acidentes, totais de acidentes e mortes nos
+            últimos 12 meses); (0, zeros) se não houver acidentes no recorte
+        """
+        filtros = {"uf": uf, "br": br, "tipo": tipo_acidente}
+        dimensoes = tuple(nome for nome in self.DIMENSOES if filtros[nome])
+        valores = tuple(str(filtros[nome]) for nome in dimensoes)
+        return self.recortes[dimensoes].get(valores, (0, np.zeros(2)))
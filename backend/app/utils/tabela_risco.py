@@ -0,0 +1,273 @@
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+class TabelaRisco:
+    """
+    Tabela pré-calculada de acidentes por trecho de rodovia, usada pela
+    previsão de risco por rodovia.
+
+    Os acidentes são agregados uma única vez, na carga dos dados, no nível
+    mais detalhado das consultas: (UF e BR, dia da semana, período do dia,
+    condição meteorológica, trecho de 10 km, causa), com o total de acidentes
+    e de mortos de cada combinação. As linhas ficam ordenadas pela rodovia,
+    então os dados de uma (UF, BR) são uma fatia contígua dos arrays,
+    localizada por um índice. Uma consulta, com ou sem os filtros opcionais,
+    apenas filtra e soma essa fatia com NumPy.
+
+    As dimensões categóricas são guardadas como códigos inteiros (-1 para
+    valores ausentes), com os valores originais em listas.
+
+    As estimativas de risco de um recorte (rodovia com filtros) são suavizadas
+    por Bayes empírico: a participação de cada trecho nos acidentes do recorte
+    é puxada para a participação do trecho em toda a rodovia, que por sua vez
+    é puxada para o prior da UF (acidentes por km constantes ao longo da
+    rodovia, isto é, divisão igual entre os trechos); e as mortes por acidente
+    do trecho, para as da rodovia, que por sua vez são puxadas para as da UF.
+    A força de cada prior (em acidentes equivalentes) é estimada uma vez, pelo
+    método dos momentos, sobre todos os segmentos da tabela. Assim, um recorte
+    ou uma rodovia com poucos acidentes fica próximo do padrão do nível acima,
+    e com muitos acidentes, próximo dos próprios dados.
+    """
+    # Tamanho (km) dos trechos
+    TAMANHO_TRECHO = 10
+
+    # Número de causas principais por trecho
+    NUM_CAUSAS = 3
+
+    # Limites da força dos priors (em acidentes equivalentes)
+    FORCA_MINIMA = 1.0
+    FORCA_MAXIMA = 1e4
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Args:
+            df: DataFrame de acidentes pré-processado (veja DataLoader)
+        """
+        rodovia, rodovias = pd.MultiIndex.from_arrays([df['uf'], df['br'].astype(str)]).factorize()
+        dia, self.dias = pd.factorize(df['dia_semana'])
+        periodo, self.periodos = pd.factorize(df['PERIODO_DIA'].astype(object))
+        condicao, self.condicoes = pd.factorize(df['condicao_metereologica'])
+        causa, self.causas = pd.factorize(df['causa_acidente'])
+        trecho = np.floor(df['km'].to_numpy(dtype=float) / self.TAMANHO_TRECHO)
+        trecho = np.where(np.isnan(trecho), -1, trecho).astype(np.int32)
+
+        agregado = pd.DataFrame({
+            "rodovia": rodovia, "dia": dia, "periodo": periodo, "condicao": condicao,
+            "trecho": trecho, "causa": causa, "mortos": df['mortos'].to_numpy(),
+            "linha": np.arange(len(df)),
+        }).groupby(["rodovia", "dia", "periodo", "condicao", "trecho", "causa"], sort=True).agg(
+            acidentes=("mortos", "size"), mortos=("mortos", "sum"), primeira=("linha", "min")
+        ).reset_index()
+
+        self.rodovia = agregado["rodovia"].to_numpy(np.int32)
+        self.dia = agregado["dia"].to_numpy(np.int16)
+        self.periodo = agregado["periodo"].to_numpy(np.int16)
+        self.condicao = agregado["condicao"].to_numpy(np.int16)
+        self.trecho = agregado["trecho"].to_numpy(np.int32)
+        self.causa = agregado["causa"].to_numpy(np.int32)
+        self.acidentes = agregado["acidentes"].to_numpy(np.int64)
+        self.mortos = agregado["mortos"].to_numpy(np.int64)
+        # Primeira linha do dataset de cada combinação, para desempatar as
+        # causas pela ordem de ocorrência (como value_counts)
+        self.primeira = agregado["primeira"].to_numpy(np.int64)
+
+        # (UF, BR) -> (início, fim) da fatia da rodovia nos arrays
+        limites = np.searchsorted(self.rodovia, np.arange(len(rodovias) + 1))
+        self.indice: Dict[Tuple[str, str], Tuple[int, int]] = {
+            tuple(chave): (int(limites[i]), int(limites[i + 1])) for i, chave in enumerate(rodovias)
+        }
+        self.uf_rodovia = [uf for uf, _ in rodovias]
+        self._estimar_priors(agregado, len(rodovias))
+        self.codigos = {
+            "dia": {valor: i for i, valor in enumerate(self.dias)},
+            "periodo": {valor: i for i, valor in enumerate(self.periodos)},
+            "condicao": {valor: i for i, valor in enumerate(self.condicoes)},
+        }
+
+    def __len__(self) -> int:
+        return len(self.rodovia)
+
+    @classmethod
+    def _forca(cls, numerador: float, denominador: float) -> float:
+        """Força de um prior (numerador / denominador), limitada a [FORCA_MINIMA, FORCA_MAXIMA]."""
+        if numerador <= 0 or denominador <= 0:
+            # Sem variação além da esperada pelo acaso: o prior domina
+            return cls.FORCA_MAXIMA
+        return float(np.clip(numerador / denominador, cls.FORCA_MINIMA, cls.FORCA_MAXIMA))
+
+    def _estimar_priors(self, agregado: pd.DataFrame, num_rodovias: int):
+        """
+        Estima, para todos os segmentos de uma vez, as forças dos priors e as
+        mortes por acidente de cada rodovia (já suavizadas para a UF).
+
+        - forca_participacao: concentração m de um modelo Dirichlet-multinomial
+          para a distribuição dos acidentes de cada célula (rodovia, dia,
+          período, condição) entre os trechos, centrada na distribuição da
+          rodovia. Pelos momentos, a soma sobre as células de
+          N·Σ(p - q)² tem esperança Σ (1 - Σq²)·(N + m) / (1 + m).
+        - forca_participacao_rodovia: a mesma concentração para a
+          distribuição dos acidentes (com km) de cada rodovia entre os seus T
+          trechos, centrada na divisão igual (q = 1/T, Σq² = 1/T).
+        - forca_letalidade_trecho e forca_letalidade_rodovia: k de um modelo
+          gama-Poisson para as mortes por acidente dos trechos em torno da
+          rodovia e das rodovias em torno da UF, em que A·(r - L)² tem
+          esperança L + A·L² / k.
+        """
+        agregado = agregado[agregado["rodovia"] >= 0]
+        celula = ["rodovia", "dia", "periodo", "condicao"]
+
+        # Participação dos trechos: célula x trecho contra rodovia x trecho
+        por_trecho = agregado.groupby(["rodovia", "trecho"]).agg(acidentes=("acidentes", "sum"), mortos=("mortos", "sum"))
+        acidentes_rodovia = np.bincount(agregado["rodovia"], weights=agregado["acidentes"], minlength=num_rodovias)
+        mortos_rodovia = np.bincount(agregado["rodovia"], weights=agregado["mortos"], minlength=num_rodovias)
+        rodovia_trecho = por_trecho.index.get_level_values("rodovia").to_numpy()
+        participacao = por_trecho["acidentes"].to_numpy() / acidentes_rodovia[rodovia_trecho]
+        soma_quadrados = np.bincount(rodovia_trecho, weights=participacao ** 2, minlength=num_rodovias)
+
+        celulas = agregado.groupby(celula + ["trecho"])["acidentes"].sum().reset_index()
+        total_celula = celulas.groupby(celula)["acidentes"].transform("sum").to_numpy()
+        q = pd.Series(participacao, index=por_trecho.index).reindex(
+            pd.MultiIndex.from_frame(celulas[["rodovia", "trecho"]])
+        ).to_numpy()
+        p = celulas["acidentes"].to_numpy() / total_celula
+        celulas["desvio"] = (p - q) ** 2 - q ** 2
+        por_celula = celulas.groupby(celula).agg(total=("acidentes", "sum"), desvio=("desvio", "sum"))
+        n = por_celula["total"].to_numpy()
+        s2 = soma_quadrados[por_celula.index.get_level_values("rodovia").to_numpy()]
+        peso = 1 - s2
+        observado = (n * (por_celula["desvio"].to_numpy() + s2)).sum()
+        self.forca_participacao = self._forca((peso * n).sum() - observado, observado - peso.sum())
+
+        # Participação dos trechos: rodovia x trecho contra a divisão igual entre os trechos
+        com_km = por_trecho.index.get_level_values("trecho").to_numpy() >= 0
+        rodovia_km = rodovia_trecho[com_km]
+        acidentes_km = por_trecho["acidentes"].to_numpy()[com_km]
+        total_km = np.bincount(rodovia_km, weights=acidentes_km, minlength=num_rodovias)
+        num_trechos = np.bincount(rodovia_km, minlength=num_rodovias)
+        desvio = (acidentes_km / total_km[rodovia_km] - 1 / num_trechos[rodovia_km]) ** 2
+        com_trechos = num_trechos > 0
+        n = total_km[com_trechos]
+        peso = 1 - 1 / num_trechos[com_trechos]
+        observado = (n * np.bincount(rodovia_km, weights=desvio, minlength=num_rodovias)[com_trechos]).sum()
+        self.forca_participacao_rodovia = self._forca((peso * n).sum() - observado, observado - peso.sum())
+
+        # Mortes por acidente: trechos em torno da rodovia
+        letalidade_bruta = mortos_rodovia / np.maximum(acidentes_rodovia, 1)
+        A = por_trecho["acidentes"].to_numpy()
+        L = letalidade_bruta[rodovia_trecho]
+        r = por_trecho["mortos"].to_numpy() / A
+        self.forca_letalidade_trecho = self._forca((A * L ** 2).sum(), (A * (r - L) ** 2 - L).sum())
+
+        # Mortes por acidente: rodovias em torno da UF
+        uf, ufs = pd.factorize(pd.Series(self.uf_rodovia, dtype=object))
+        acidentes_uf = np.bincount(uf, weights=acidentes_rodovia, minlength=len(ufs))
+        letalidade_uf = np.bincount(uf, weights=mortos_rodovia, minlength=len(ufs)) / np.maximum(acidentes_uf, 1)
+        L = letalidade_uf[uf]
+        self.forca_letalidade_rodovia = self._forca(
+            (acidentes_rodovia * L ** 2).sum(), (acidentes_rodovia * (letalidade_bruta - L) ** 2 - L).sum()
+        )
+        self.letalidade_rodovia = (mortos_rodovia + self.forca_letalidade_rodovia * L) / (
+            acidentes_rodovia + self.forca_letalidade_rodovia
+        )
+
+    def estimar(
+        self,
+        uf: str,
+        br: str,
+        dia_semana: Optional[str] = None,
+        periodo_dia: Optional[str] = None,
+        condicao_metereologica: Optional[str] = None
+    ) -> Tuple[int, np.ndarray, np.ndarray, np.ndarray, List[List[str]]]:
+        """
+        Estimativas de risco suavizadas de cada trecho de uma rodovia, com os
+        filtros opcionais.
+
+        Sem filtros, a probabilidade de acidente de um trecho é a sua
+        participação nos acidentes da rodovia, suavizada para a divisão igual
+        entre os T trechos: q = (a + c/T) / (A + c), com a e A os acidentes do
+        trecho e da rodovia e c a força do prior. Com filtros, é a
+        participação no recorte, suavizada para q: (n + m·q) / (N + m), com n
+        e N os acidentes do trecho e do recorte e m a força do prior. A probabilidade de acidente fatal multiplica essa
+        probabilidade pelas mortes por acidente do trecho no recorte,
+        suavizadas para as da rodovia. Trechos sem acidentes no recorte também
+        são retornados, com a estimativa do prior.
+
+        Args:
+            uf: Estado (UF)
+            br: Rodovia BR
+            dia_semana: Dia da semana
+            periodo_dia: Período do dia
+            condicao_metereologica: Condição meteorológica
+
+        Returns:
+            Tupla (total de acidentes da rodovia, incluindo os sem km; início
+            (km) de cada trecho; probabilidade de acidente; probabilidade de
+            acidente fatal; até NUM_CAUSAS causas mais frequentes de cada
+            trecho, priorizando as do recorte e completando com as da rodovia)
+        """
+        vazio = (0, np.zeros(0), np.zeros(0), np.zeros(0), [])
+        if (uf, br) not in self.indice:
+            return vazio
+        inicio, fim = self.indice[(uf, br)]
+
+        # Valores de filtro inexistentes nos dados deixam o recorte vazio
+        filtro = np.ones(fim - inicio, dtype=bool)
+        filtrado = bool(dia_semana or periodo_dia or condicao_metereologica)
+        for nome, coluna, valor in [("dia", self.dia, dia_semana),
+                                    ("periodo", self.periodo, periodo_dia),
+                                    ("condicao", self.condicao, condicao_metereologica)]:
+            if valor:
+                filtro &= coluna[inicio:fim] == self.codigos[nome].get(valor, -2)
+
+        acidentes = self.acidentes[inicio:fim]
+        total_rodovia = int(acidentes.sum())
+        total_recorte = int(acidentes[filtro].sum())
+        trecho = self.trecho[inicio:fim]
+        com_km = trecho >= 0
+        if not com_km.any():
+            return (total_rodovia, *vazio[1:])
+
+        acidentes = acidentes[com_km]
+        mortos = self.mortos[inicio:fim][com_km]
+        causa = self.causa[inicio:fim][com_km]
+        primeira = self.primeira[inicio:fim][com_km]
+        filtro = filtro[com_km]
+        trechos, posicao = np.unique(trecho[com_km], return_inverse=True)
+        num_trechos = len(trechos)
+        acidentes_trecho = np.bincount(posicao, weights=acidentes, minlength=num_trechos)
+        acidentes_recorte = np.bincount(posicao[filtro], weights=acidentes[filtro], minlength=num_trechos)
+        mortos_recorte = np.bincount(posicao[filtro], weights=mortos[filtro], minlength=num_trechos)
+
+        c = self.forca_participacao_rodovia
+        probabilidade = (acidentes_trecho + c / num_trechos) / (total_rodovia + c)
+        if filtrado:
+            m = self.forca_participacao
+            probabilidade = (acidentes_recorte + m * probabilidade) / (total_recorte + m)
+        k = self.forca_letalidade_trecho
+        letalidade = (mortos_recorte + k * self.letalidade_rodovia[self.rodovia[inicio]]) / (acidentes_recorte + k)
+        probabilidade_fatal = letalidade * probabilidade
+
+        # Contagem por (trecho, causa) em matrizes trechos x causas (no recorte
+        # e na rodovia) e as NUM_CAUSAS maiores de cada linha, sem laço por
+        # trecho; empates ficam com a causa que ocorreu primeiro
+        num_causas = len(self.causas)
+        com_causa = causa >= 0
+        celula = posicao[com_causa] * num_causas + causa[com_causa]
+
+        def contar(pesos: np.ndarray) -> np.ndarray:
+            return np.bincount(celula, weights=pesos, minlength=num_trechos * num_causas).reshape(num_trechos, num_causas)
+
+        contagem_recorte = contar(np.where(filtro, acidentes, 0)[com_causa])
+        contagem_rodovia = contar(acidentes[com_causa])
+        ocorrencia = np.full(num_trechos * num_causas, np.iinfo(np.int64).max)
+        np.minimum.at(ocorrencia, celula, primeira[com_causa])
+        ordem = np.lexsort(
+            (ocorrencia.reshape(num_trechos, num_causas), -contagem_rodovia, -contagem_recorte), axis=1
+        )[:, :self.NUM_CAUSAS]
+        principais = np.take_along_axis(contagem_rodovia, ordem, axis=1) > 0
+        causas = [
+            [self.causas[c] for c, presente in zip(linha, presentes) if presente]
+            for linha, presentes in zip(ordem, principais)
+        ]
+        return total_rodovia, trechos * self.TAMANHO_TRECHO, probabilidade, probabilidade_fatal, causas
@@ -0,0 +1,71 @@
+"""
+Benchmark da inferência do classificador de acidentes fatais da calculadora de risco.
+
+Treina o classificador (gradient boosting) sobre dados sintéticos e compara a
+inferência pelo sklearn (predict_proba do GradientBoostingClassifier) com a
+forma compacta exportada (ClassificadorFatal.probabilidade, só com NumPy):
+latência de uma única requisição, incluindo a codificação das features, e
+linhas por segundo em lotes. Confere também a maior diferença entre as
+probabilidades dos dois caminhos.
+
+Uso:
+    python benchmarks/bench_classificador.py [--linhas 200000] [--arvores 150] [--profundidade 3]
+"""
+import argparse
+import time
+import numpy as np
+from dados_sinteticos import gerar_acidentes
+
+# Cada medição usa o menor tempo entre as repetições
+REPETICOES = 200
+
+TAMANHOS = [1, 100, 10_000]
+
+
+def medir(funcao, repeticoes=REPETICOES):
+    """Executa a função repeticoes vezes e retorna o menor tempo."""
+    duracao = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        duracao = min(duracao, time.perf_counter() - inicio)
+    return duracao
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da inferência do classificador de acidentes fatais")
+    parser.add_argument("--linhas", type=int, default=200_000, help="Acidentes sintéticos a gerar")
+    parser.add_argument("--arvores", type=int, default=150, help="Árvores do gradient boosting")
+    parser.add_argument("--profundidade", type=int, default=3, help="Profundidade das árvores")
+    args = parser.parse_args()
+
+    from backend.app.ml.classificador import _treinar
+    from backend.app.utils.data_loader import DataLoader
+
+    df = DataLoader()._preprocess_data(gerar_acidentes(args.linhas))
+    inicio = time.perf_counter()
+    classificador, (modelo, X), metadados = _treinar(df, len(df), args.arvores, args.profundidade, 42)
+    print(f"Treinamento: {len(df)} acidentes, {time.perf_counter() - inicio:.1f} s, {metadados['nos']} nós")
+    print(f"Métricas: {metadados['metricas']}")
+    diferenca = np.abs(classificador.probabilidade(X) - modelo.predict_proba(X)[:, 1]).max()
+    print(f"Maior diferença NumPy x sklearn ({len(X)} linhas de validação): {diferenca:.2e}\n")
+
+    registro = {"hora": 22, "dia_semana": "sábado", "condicao_metereologica": "CHUVA", "uf": "MG", "br": "381", "km": 450.0}
+    t_sklearn = medir(lambda: modelo.predict_proba(classificador.codificar([registro])))
+    t_numpy = medir(lambda: classificador.prever(registro))
+    print(f"Requisição única (codificação + inferência): sklearn {t_sklearn * 1e6:,.0f} µs, "
+          f"NumPy {t_numpy * 1e6:,.0f} µs ({t_sklearn / t_numpy:.1f}x)\n")
+
+    cabecalho = f"{'linhas':>7} {'sklearn (linhas/s)':>19} {'NumPy (linhas/s)':>17} {'ganho':>7}"
+    print(cabecalho)
+    print("-" * len(cabecalho))
+    for tamanho in TAMANHOS:
+        lote = np.resize(X, (tamanho, X.shape[1]))
+        repeticoes = max(5, REPETICOES * 100 // tamanho)
+        t_sk = medir(lambda: modelo.predict_proba(lote), repeticoes)
+        t_np = medir(lambda: classificador.probabilidade(lote), repeticoes)
+        print(f"{tamanho:>7} {tamanho / t_sk:>19,.0f} {tamanho / t_np:>17,.0f} {t_sk / t_np:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
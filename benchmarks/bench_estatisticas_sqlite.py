@@ -0,0 +1,147 @@
+"""
+Benchmark do endpoint /api/v1/estatisticas da versão SQLite (app.py).
+
+Compara a implementação anterior (cinco consultas com a mesma cláusula WHERE)
+com a consulta agrupada única, medindo varreduras da tabela, linhas lidas,
+passos da máquina virtual do SQLite e tempo de execução.
+
+Uso:
+    python benchmarks/bench_estatisticas_sqlite.py [--db acidentes.db] [--linhas 200000]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from dados_sinteticos import criar_banco_sqlite
+
+# Consultas da implementação anterior, mantidas aqui apenas para comparação
+CONSULTAS_ANTERIORES = [
+    "SELECT COUNT(*) AS total {base}",
+    "SELECT COALESCE(SUM(feridos), 0) AS total {base}",
+    "SELECT COALESCE(SUM(mortos), 0) AS total {base}",
+    "SELECT causa_acidente AS causa, COUNT(*) AS total {base} GROUP BY causa_acidente ORDER BY total DESC LIMIT 10",
+    "SELECT tipo_acidente AS tipo, COUNT(*) AS total {base} GROUP BY tipo_acidente ORDER BY total DESC LIMIT 10",
+]
+
+# Cada medição usa o menor tempo entre as repetições
+REPETICOES = 3
+
+CENARIOS = [
+    ("sem filtros", {}),
+    ("uf=MG", {"uf": "MG"}),
+    ("uf=SC, ano=2022", {"uf": "SC", "ano": 2022}),
+]
+
+
+class ContadorPassos:
+    """Conta os passos da máquina virtual do SQLite via progress handler."""
+
+    def __init__(self, conexao):
+        self.conexao = conexao
+        self.passos = 0
+
+    def _incrementar(self):
+        self.passos += 100
+        return 0
+
+    def __enter__(self):
+        self.passos = 0
+        self.conexao.set_progress_handler(self._incrementar, 100)
+        return self
+
+    def __exit__(self, *args):
+        self.conexao.set_progress_handler(None, 0)
+
+
+def montar_base(filtros, legado=False):
+    base = "FROM acidentes WHERE 1=1"
+    params = {}
+    if filtros.get("uf"):
+        base += " AND uf = :uf"
+        params["uf"] = filtros["uf"]
+    if filtros.get("ano") and legado:
+        base += " AND strftime('%Y', data) = :ano"
+        params["ano"] = str(filtros["ano"])
+    elif filtros.get("ano"):
+        base += " AND ano = :ano"
+        params["ano"] = filtros["ano"]
+    return base, params
+
+
+def linhas_lidas(conexao, sql, params, linhas_filtradas, linhas_tabela):
+    """Estima as linhas lidas por uma consulta a partir do plano de execução."""
+    plano = conexao.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    varreduras = [p[3] for p in plano if "acidentes" in p[3]]
+    total = 0
+    for passo in varreduras:
+        # SCAN percorre a tabela inteira; SEARCH percorre apenas as linhas do índice
+        total += linhas_tabela if passo.startswith("SCAN") else linhas_filtradas
+    return len(varreduras), total
+
+
+def medir_anterior(conexao, filtros, linhas_tabela):
+    base, params = montar_base(filtros, legado=True)
+    linhas_filtradas = conexao.execute(f"SELECT COUNT(*) {base}", params).fetchone()[0]
+    varreduras = lidas = 0
+    duracao = float("inf")
+    for _ in range(REPETICOES):
+        with ContadorPassos(conexao) as contador:
+            inicio = time.perf_counter()
+            for consulta in CONSULTAS_ANTERIORES:
+                conexao.execute(consulta.format(base=base), params).fetchall()
+            duracao = min(duracao, time.perf_counter() - inicio)
+    for consulta in CONSULTAS_ANTERIORES:
+        v, l = linhas_lidas(conexao, consulta.format(base=base), params, linhas_filtradas, linhas_tabela)
+        varreduras += v
+        lidas += l
+    return varreduras, lidas, contador.passos, duracao
+
+
+def medir_atual(app_module, sessao, conexao, filtros, linhas_tabela):
+    base, params = montar_base(filtros)
+    linhas_filtradas = conexao.execute(f"SELECT COUNT(*) {base}", params).fetchone()[0]
+    duracao = float("inf")
+    for _ in range(REPETICOES):
+        with ContadorPassos(conexao) as contador:
+            inicio = time.perf_counter()
+            resultado = asyncio.run(app_module.get_estatisticas(uf=filtros.get("uf"), ano=filtros.get("ano"), db=sessao))
+            duracao = min(duracao, time.perf_counter() - inicio)
+    sql = ("SELECT causa_acidente, tipo_acidente, COUNT(*), SUM(feridos), SUM(mortos) "
+           f"{base} GROUP BY causa_acidente, tipo_acidente")
+    varreduras, lidas = linhas_lidas(conexao, sql, params, linhas_filtradas, linhas_tabela)
+    return varreduras, lidas, contador.passos, duracao, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de /api/v1/estatisticas (SQLite)")
+    parser.add_argument("--db", help="Banco SQLite existente (padrão: gera dados sintéticos)")
+    parser.add_argument("--linhas", type=int, default=200_000, help="Linhas sintéticas a gerar")
+    args = parser.parse_args()
+
+    caminho = args.db or criar_banco_sqlite(os.path.join(tempfile.mkdtemp(), "bench.db"), args.linhas)
+    os.environ["DATABASE_URL"] = f"sqlite:///{caminho}"
+
+    import app as app_module
+
+    sessao = app_module.SessionLocal()
+    conexao = sessao.connection().connection.driver_connection
+    linhas_tabela = conexao.execute("SELECT COUNT(*) FROM acidentes").fetchone()[0]
+    print(f"Banco: {caminho} ({linhas_tabela} acidentes)\n")
+
+    cabecalho = f"{'cenário':<18} {'versão':<9} {'varreduras':>10} {'linhas lidas':>13} {'passos VM':>12} {'tempo (ms)':>11}"
+    print(cabecalho)
+    print("-" * len(cabecalho))
+    for nome, filtros in CENARIOS:
+        v_ant, l_ant, p_ant, t_ant = medir_anterior(conexao, filtros, linhas_tabela)
+        v_at, l_at, p_at, t_at, _ = medir_atual(app_module, sessao, conexao, filtros, linhas_tabela)
+        print(f"{nome:<18} {'anterior':<9} {v_ant:>10} {l_ant:>13} {p_ant:>12} {t_ant * 1000:>11.1f}")
+        print(f"{'':<18} {'atual':<9} {v_at:>10} {l_at:>13} {p_at:>12} {t_at * 1000:>11.1f}")
+        print(f"{'':<18} {'redução':<9} {'':>10} {1 - l_at / max(l_ant, 1):>12.0%} "
+              f"{1 - p_at / max(p_ant, 1):>11.0%} {1 - t_at / max(t_ant, 1e-9):>10.0%}")
+
+    sessao.close()
+
+
+if __name__ == "__main__":
+    main()
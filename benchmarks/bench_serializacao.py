@@ -0,0 +1,135 @@
+"""
+Benchmark da serialização das listagens do backend (/acidentes e /mapas/pontos).
+
+Compara o caminho anterior (objetos ORM completos, um modelo Pydantic por linha
+e nova validação/serialização pelo response_model do FastAPI) com o caminho
+atual (SELECT apenas das colunas da resposta, dicionários montados a partir
+das tuplas e codificação direta com orjson), em linhas por segundo.
+
+Uso:
+    python benchmarks/bench_serializacao.py [--db backend.db] [--linhas 200000]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from typing import List
+from dados_sinteticos import criar_banco_backend
+
+# Cada medição usa o menor tempo entre as repetições
+REPETICOES = 5
+
+TAMANHOS = [100, 1_000, 10_000]
+
+
+def medir(funcao):
+    """Executa a função REPETICOES vezes e retorna o menor tempo e o tamanho do corpo gerado."""
+    duracao = float("inf")
+    for _ in range(REPETICOES):
+        inicio = time.perf_counter()
+        corpo = funcao()
+        duracao = min(duracao, time.perf_counter() - inicio)
+    return duracao, len(corpo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de serialização das listagens do backend")
+    parser.add_argument("--db", help="Banco SQLite do backend existente (padrão: gera dados sintéticos)")
+    parser.add_argument("--linhas", type=int, default=200_000, help="Linhas sintéticas a gerar")
+    args = parser.parse_args()
+
+    if args.db:
+        caminho = args.db
+        os.environ["DATABASE_URL"] = f"sqlite:///{caminho}"
+    else:
+        caminho = criar_banco_backend(os.path.join(tempfile.mkdtemp(), "bench_backend.db"), args.linhas)
+
+    from pydantic import TypeAdapter
+    from sqlalchemy import desc
+    from backend.app.db.database import AsyncSessionLocal, SessionLocal, async_engine
+    from backend.app.db.models import Acidente as AcidenteDB
+    from backend.app.models.acidente import AcidenteFilter, AcidenteResponse
+    from backend.app.models.ponto_mapa import PontoMapa
+    from backend.app.services.acidente_service import AcidenteService
+    from backend.app.services.mapa_service import MapaService
+    from backend.app.utils.serializacao import RespostaJSON
+
+    sessao = SessionLocal()
+    # Os serviços usam a sessão assíncrona; um único event loop mantém as
+    # conexões do pool válidas entre as medições
+    loop = asyncio.new_event_loop()
+    sessao_async = AsyncSessionLocal()
+    print(f"Banco: {caminho}\n")
+
+    # Validação e serialização feitas pelo FastAPI quando a rota retorna modelos
+    adaptador_acidentes = TypeAdapter(List[AcidenteResponse])
+    adaptador_pontos = TypeAdapter(List[PontoMapa])
+
+    def acidentes_anterior(limite):
+        sessao.expunge_all()
+        linhas = sessao.query(AcidenteDB) \
+                       .order_by(desc(AcidenteDB.data_inversa), desc(AcidenteDB.id)) \
+                       .limit(limite).all()
+        modelos = [AcidenteResponse(
+            id=a.id,
+            data=a.data_inversa.isoformat() if a.data_inversa else None,
+            dia_semana=a.dia_semana,
+            hora=a.horario.strftime("%H:%M") if a.horario else None,
+            uf=a.uf, br=a.br, km=a.km, municipio=a.municipio,
+            causa_acidente=a.causa_acidente, tipo_acidente=a.tipo_acidente,
+            classificacao_acidente=a.classificacao_acidente or "Não classificado",
+            condicao_metereologica=a.condicao_metereologica,
+            mortos=a.mortos or 0, feridos=a.feridos or 0, veiculos=a.veiculos or 0,
+            latitude=a.latitude, longitude=a.longitude,
+        ) for a in linhas]
+        return adaptador_acidentes.dump_json(adaptador_acidentes.validate_python(modelos, from_attributes=True))
+
+    def acidentes_atual(limite):
+        linhas = loop.run_until_complete(AcidenteService.get_acidentes(sessao_async, AcidenteFilter(), limite))
+        return RespostaJSON(linhas).body
+
+    def pontos_anterior(limite):
+        sessao.expunge_all()
+        linhas = sessao.query(AcidenteDB) \
+                       .filter(AcidenteDB.latitude.isnot(None), AcidenteDB.longitude.isnot(None)) \
+                       .order_by(desc(AcidenteDB.data_inversa)) \
+                       .limit(limite).all()
+        modelos = [PontoMapa(
+            id=a.id, latitude=float(a.latitude), longitude=float(a.longitude),
+            data=a.data_inversa.isoformat() if a.data_inversa else None,
+            hora=a.horario.strftime('%H:%M') if a.horario else None,
+            br=a.br, km=float(a.km) if a.km else 0.0, uf=a.uf, municipio=a.municipio,
+            tipo_acidente=a.tipo_acidente, causa_acidente=a.causa_acidente,
+            mortos=a.mortos or 0, feridos=a.feridos or 0,
+            classificacao_acidente=a.classificacao_acidente or 'Não classificado',
+            condicao_metereologica=a.condicao_metereologica,
+        ) for a in linhas]
+        return adaptador_pontos.dump_json(adaptador_pontos.validate_python(modelos, from_attributes=True))
+
+    def pontos_atual(limite):
+        linhas = loop.run_until_complete(MapaService.get_pontos_acidentes(sessao_async, limit=limite))
+        return RespostaJSON(linhas).body
+
+    cenarios = [
+        ("/acidentes", acidentes_anterior, acidentes_atual),
+        ("/mapas/pontos", pontos_anterior, pontos_atual),
+    ]
+
+    cabecalho = f"{'endpoint':<14} {'linhas':>7} {'anterior (linhas/s)':>20} {'atual (linhas/s)':>17} {'ganho':>7}"
+    print(cabecalho)
+    print("-" * len(cabecalho))
+    for nome, anterior, atual in cenarios:
+        for limite in TAMANHOS:
+            t_ant, _ = medir(lambda: anterior(limite))
+            t_at, _ = medir(lambda: atual(limite))
+            print(f"{nome:<14} {limite:>7} {limite / t_ant:>20,.0f} {limite / t_at:>17,.0f} {t_ant / t_at:>6.1f}x")
+
+    sessao.close()
+    loop.run_until_complete(sessao_async.close())
+    loop.run_until_complete(async_engine.dispose())
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
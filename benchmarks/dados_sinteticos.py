@@ -0,0 +1,236 @@
+"""
+Geração de dados sintéticos de acidentes para os benchmarks.
+
+Os dados imitam o formato do CSV consolidado da PRF (datatran_all_years.csv),
+permitindo executar os benchmarks sem depender do download do dataset real.
+"""
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+# Permitir importar os módulos do projeto a partir da pasta de benchmarks
+RAIZ_PROJETO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ_PROJETO not in sys.path:
+    sys.path.append(RAIZ_PROJETO)
+
+# Centroides aproximados (latitude, longitude) das UFs
+UFS = {
+    'AC': (-9.0, -70.5), 'AL': (-9.6, -36.6), 'AP': (1.4, -51.8), 'AM': (-4.0, -63.0),
+    'BA': (-12.5, -41.7), 'CE': (-5.2, -39.5), 'DF': (-15.8, -47.9), 'ES': (-19.6, -40.6),
+    'GO': (-15.9, -49.8), 'MA': (-5.0, -45.3), 'MT': (-13.0, -56.0), 'MS': (-20.5, -54.6),
+    'MG': (-18.5, -44.5), 'PA': (-4.0, -52.5), 'PB': (-7.2, -36.7), 'PR': (-24.6, -51.6),
+    'PE': (-8.3, -37.9), 'PI': (-7.7, -42.7), 'RJ': (-22.4, -42.7), 'RN': (-5.8, -36.5),
+    'RS': (-29.7, -53.2), 'RO': (-10.9, -62.8), 'RR': (2.1, -61.4), 'SC': (-27.3, -50.2),
+    'SP': (-22.3, -48.7), 'SE': (-10.6, -37.4), 'TO': (-10.2, -48.3),
+}
+
+# Peso relativo de cada UF no total de acidentes
+PESOS_UF = {
+    'MG': 12, 'SC': 10, 'PR': 10, 'RS': 7, 'SP': 6, 'BA': 5, 'GO': 5, 'RJ': 5,
+    'PE': 4, 'ES': 3, 'MT': 3, 'MS': 3, 'PB': 2, 'RN': 2, 'CE': 2, 'RO': 2,
+    'PI': 2, 'MA': 2, 'DF': 2, 'PA': 2, 'AL': 1, 'SE': 1, 'TO': 1, 'AC': 0.5,
+    'AM': 0.3, 'AP': 0.3, 'RR': 0.3,
+}
+
+BRS = ['101', '116', '040', '381', '153', '364', '262', '277', '376', '470',
+       '163', '020', '050', '060', '070', '230', '232', '316', '324', '386']
+
+CAUSAS = [
+    'Falta de atenção à condução', 'Velocidade incompatível', 'Ingestão de álcool',
+    'Desobediência às normas de trânsito', 'Não guardar distância de segurança',
+    'Ultrapassagem indevida', 'Defeito mecânico no veículo', 'Pista escorregadia',
+    'Condutor dormindo', 'Falta de atenção do pedestre', 'Animais na pista',
+    'Defeito na via', 'Avarias e/ou desgaste excessivo no pneu', 'Chuva',
+]
+PESOS_CAUSA = [30, 12, 8, 8, 7, 5, 5, 4, 4, 3, 3, 3, 2, 6]
+
+TIPOS = [
+    'Colisão traseira', 'Saída de leito carroçável', 'Colisão transversal',
+    'Colisão lateral', 'Tombamento', 'Colisão frontal', 'Atropelamento de Pedestre',
+    'Queda de ocupante de veículo', 'Colisão com objeto', 'Capotamento', 'Engavetamento',
+]
+PESOS_TIPO = [20, 14, 12, 10, 8, 7, 5, 5, 8, 6, 5]
+
+CONDICOES = ['CÉU CLARO', 'NUBLADO', 'CHUVA', 'SOL', 'GAROA/CHUVISCO', 'NEVOEIRO/NEBLINA', 'VENTO']
+PESOS_CONDICAO = [55, 15, 12, 10, 5, 2, 1]
+
+DIAS_SEMANA = ['segunda-feira', 'terça-feira', 'quarta-feira', 'quinta-feira',
+               'sexta-feira', 'sábado', 'domingo']
+
+TRACADOS = ['Reta', 'Curva', 'Interseção de vias', 'Aclive', 'Declive', 'Rotatória']
+PESOS_TRACADO = [60, 18, 8, 6, 6, 2]
+
+CLASSIFICACOES = ['Com Vítimas Feridas', 'Sem Vítimas', 'Com Vítimas Fatais']
+
+# Causas e tipos com maior letalidade, usados para gerar o número de mortos
+CAUSAS_LETAIS = {'Velocidade incompatível': 3.0, 'Ultrapassagem indevida': 4.0,
+                 'Ingestão de álcool': 2.5, 'Condutor dormindo': 3.0}
+TIPOS_LETAIS = {'Colisão frontal': 6.0, 'Atropelamento de Pedestre': 5.0}
+
+
+def _normalizar(pesos):
+    pesos = np.asarray(pesos, dtype=float)
+    return pesos / pesos.sum()
+
+
+def gerar_acidentes(n: int = 200_000, seed: int = 42, ano_inicial: int = 2017, ano_final: int = 2023) -> pd.DataFrame:
+    """
+    Gera um DataFrame no formato bruto do CSV da PRF.
+
+    Args:
+        n: Número de acidentes
+        seed: Semente do gerador aleatório
+        ano_inicial: Primeiro ano dos dados
+        ano_final: Último ano dos dados
+
+    Returns:
+        DataFrame com as colunas do datatran (data_inversa, horario, uf, br, km, ...)
+    """
+    rng = np.random.default_rng(seed)
+
+    ufs = np.array(list(PESOS_UF.keys()))
+    uf = rng.choice(ufs, size=n, p=_normalizar(list(PESOS_UF.values())))
+
+    # Cada UF usa um subconjunto estável de rodovias
+    br = np.empty(n, dtype=object)
+    for i, sigla in enumerate(ufs):
+        mascara = uf == sigla
+        rodovias = np.array(BRS)[np.random.default_rng(i).choice(len(BRS), size=5, replace=False)]
+        br[mascara] = rng.choice(rodovias, size=mascara.sum(), p=_normalizar([8, 5, 3, 2, 1]))
+
+    km = np.round(rng.gamma(2.0, 120.0, size=n), 1)
+
+    # Coordenadas ao redor do centroide da UF, deslocadas ao longo do km
+    centro = np.array([UFS[s] for s in uf])
+    angulo = np.array([int(b) * 37 % 360 for b in br]) * np.pi / 180
+    latitude = centro[:, 0] + np.cos(angulo) * km / 150 + rng.normal(0, 0.05, n)
+    longitude = centro[:, 1] + np.sin(angulo) * km / 150 + rng.normal(0, 0.05, n)
+
+    # Datas com sazonalidade leve (mais acidentes no fim do ano)
+    anos = rng.integers(ano_inicial, ano_final + 1, size=n)
+    meses = rng.choice(12, size=n, p=_normalizar([9, 8, 8, 8, 8, 8, 9, 8, 8, 8, 8, 10])) + 1
+    dias_mes = rng.integers(1, 29, size=n)
+    datas = pd.to_datetime(pd.DataFrame({'year': anos, 'month': meses, 'day': dias_mes}))
+    datas = pd.DatetimeIndex(datas)
+    horas = rng.choice(24, size=n, p=_normalizar([2, 2, 1.5, 1.5, 2, 3, 4, 5, 5, 4, 4, 4,
+                                                  4, 4, 4, 5, 6, 7, 7, 6, 5, 4, 3, 2.5]))
+    minutos = rng.integers(0, 60, size=n)
+
+    causa = rng.choice(CAUSAS, size=n, p=_normalizar(PESOS_CAUSA))
+    tipo = rng.choice(TIPOS, size=n, p=_normalizar(PESOS_TIPO))
+    condicao = rng.choice(CONDICOES, size=n, p=_normalizar(PESOS_CONDICAO))
+    tracado = rng.choice(TRACADOS, size=n, p=_normalizar(PESOS_TRACADO))
+
+    # Taxa de mortos dependente de causa, tipo e período noturno
+    taxa = np.full(n, 0.04)
+    taxa *= np.array([CAUSAS_LETAIS.get(c, 1.0) for c in causa])
+    taxa *= np.array([TIPOS_LETAIS.get(t, 1.0) for t in tipo])
+    taxa *= np.where((horas >= 19) | (horas <= 4), 1.6, 1.0)
+    taxa *= np.where(condicao == 'CHUVA', 1.3, 1.0)
+    mortos = rng.poisson(np.minimum(taxa, 2.0))
+    feridos_leves = rng.poisson(1.0, size=n)
+    feridos_graves = rng.poisson(0.3, size=n)
+
+    classificacao = np.where(
+        mortos > 0, CLASSIFICACOES[2],
+        np.where(feridos_leves + feridos_graves > 0, CLASSIFICACOES[0], CLASSIFICACOES[1])
+    )
+
+    return pd.DataFrame({
+        'id': np.arange(1, n + 1),
+        'data_inversa': datas.strftime('%Y-%m-%d'),
+        'dia_semana': np.array(DIAS_SEMANA)[datas.dayofweek],
+        'horario': [f'{h:02d}:{m:02d}:00' for h, m in zip(horas, minutos)],
+        'uf': uf,
+        'br': br,
+        'km': km,
+        'municipio': [f'MUNICIPIO {s}-{int(k // 50)}' for s, k in zip(uf, km)],
+        'causa_acidente': causa,
+        'tipo_acidente': tipo,
+        'classificacao_acidente': classificacao,
+        'fase_dia': np.where((horas >= 6) & (horas < 18), 'Pleno dia', 'Plena Noite'),
+        'sentido_via': rng.choice(['Crescente', 'Decrescente'], size=n),
+        'condicao_metereologica': condicao,
+        'tipo_pista': rng.choice(['Simples', 'Dupla', 'Múltipla'], size=n, p=[0.5, 0.4, 0.1]),
+        'tracado_via': tracado,
+        'uso_solo': rng.choice(['Sim', 'Não'], size=n),
+        'pessoas': feridos_leves + feridos_graves + mortos + rng.integers(1, 4, size=n),
+        'mortos': mortos,
+        'feridos_leves': feridos_leves,
+        'feridos_graves': feridos_graves,
+        'ilesos': rng.integers(0, 3, size=n),
+        'ignorados': np.zeros(n, dtype=int),
+        'feridos': feridos_leves + feridos_graves,
+        'veiculos': rng.integers(1, 4, size=n),
+        'latitude': np.round(latitude, 6),
+        'longitude': np.round(longitude, 6),
+    })
+
+
+def preparar_para_sqlite(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte o formato bruto para o formato produzido por load_csv_to_sqlite.process_csv.
+    """
+    df = df.drop(columns=['id']).rename(columns={'data_inversa': 'data'})
+    hora = df['horario'].str.slice(0, 2).astype(int)
+    df['periodo_dia'] = pd.cut(hora, bins=[-1, 4, 11, 17, 23],
+                               labels=['MADRUGADA', 'MANHÃ', 'TARDE', 'NOITE']).astype(str)
+    df['ano'] = df['data'].str.slice(0, 4).astype(int)
+    df['amostra'] = np.random.default_rng(42).random(len(df))
+    return df
+
+
+def criar_banco_sqlite(caminho: str, n: int = 200_000, seed: int = 42) -> str:
+    """
+    Cria um banco SQLite com o schema de load_csv_to_sqlite e dados sintéticos.
+
+    Args:
+        caminho: Caminho do arquivo .db a ser criado
+        n: Número de acidentes
+        seed: Semente do gerador aleatório
+
+    Returns:
+        Caminho do banco criado
+    """
+    import load_csv_to_sqlite
+
+    if os.path.exists(caminho):
+        os.remove(caminho)
+
+    load_csv_to_sqlite.DB_PATH = caminho
+    load_csv_to_sqlite.create_tables()
+    load_csv_to_sqlite.load_to_sqlite(preparar_para_sqlite(gerar_acidentes(n, seed)), batch_size=50_000)
+    return caminho
+
+
+def criar_banco_backend(caminho: str, n: int = 200_000, seed: int = 42) -> str:
+    """
+    Cria um banco SQLite com o schema do backend (backend/app/db/models.py) e dados sintéticos.
+
+    A variável DATABASE_URL é apontada para o banco criado, portanto esta função
+    deve ser chamada antes de importar os módulos do backend.
+
+    Args:
+        caminho: Caminho do arquivo .db a ser criado
+        n: Número de acidentes
+        seed: Semente do gerador aleatório
+
+    Returns:
+        Caminho do banco criado
+    """
+    if os.path.exists(caminho):
+        os.remove(caminho)
+    os.environ["DATABASE_URL"] = f"sqlite:///{caminho}"
+
+    from backend.app.db.database import engine
+    from backend.app.db.models import Acidente
+    from backend.app.db.init_db import create_tables
+
+    create_tables()
+
+    df = gerar_acidentes(n, seed)
+    df['ano'] = df['data_inversa'].str.slice(0, 4).astype(int)
+    colunas = [c for c in df.columns if c in Acidente.__table__.columns.keys()]
+    df[colunas].to_sql('acidentes', engine, if_exists='append', index=False, chunksize=50_000)
+    return caminho
@@ -0,0 +1,72 @@
+"""
+Script para gerar as versões simplificadas do GeoJSON dos estados brasileiros
+
+Lê o GeoJSON completo versionado em backend/static/geo/ufs.geojson e grava uma
+versão simplificada (Douglas–Peucker) para cada nível de zoom definido em
+backend/app/utils/geo.py (NIVEIS_ZOOM_UFS), no formato ufs_z<zoom>.geojson.
+
+O ufs.geojson foi gerado pela dissolução da malha municipal do IBGE (2005)
+por UF. Para substituí-lo, basta gravar outra FeatureCollection com as
+propriedades "name" e "uf" e executar este script novamente.
+
+Uso:
+    python gerar_geojson_ufs.py [--origem caminho/para/ufs.geojson]
+"""
+import os
+import sys
+import json
+import argparse
+import logging
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from backend.app.utils.geo import NIVEIS_ZOOM_UFS, simplificar_geojson
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO, 
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('geojson_ufs')
+
+# Pasta dos GeoJSON servidos pelo backend
+GEO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend", "static", "geo")
+
+def gerar_niveis(origem: str, destino: str):
+    """
+    Gera um arquivo simplificado por nível de zoom.
+    
+    Args:
+        origem: GeoJSON completo dos estados
+        destino: Pasta onde os arquivos serão gravados
+    """
+    with open(origem, encoding="utf-8") as f:
+        geojson = json.load(f)
+    
+    tamanho_original = os.path.getsize(origem)
+    logger.info(f"GeoJSON original: {len(geojson['features'])} feições, {tamanho_original / 1024:.0f} KB")
+    
+    for zoom, tolerancia in sorted(NIVEIS_ZOOM_UFS.items()):
+        # Menos casas decimais nos níveis mais grosseiros (0,0001° ≈ 11 m)
+        casas_decimais = 3 if tolerancia >= 0.01 else 4
+        simplificado = simplificar_geojson(geojson, tolerancia, casas_decimais)
+        
+        caminho = os.path.join(destino, f"ufs_z{zoom}.geojson")
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(simplificado, f, ensure_ascii=False, separators=(",", ":"))
+        
+        logger.info(f"Zoom até {zoom} (tolerância {tolerancia}°): {os.path.getsize(caminho) / 1024:.0f} KB -> {caminho}")
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Gera os níveis de simplificação do GeoJSON das UFs")
+    parser.add_argument("--origem", default=os.path.join(GEO_DIR, "ufs.geojson"), help="GeoJSON completo dos estados")
+    parser.add_argument("--destino", default=GEO_DIR, help="Pasta de saída")
+    args = parser.parse_args()
+    
+    try:
+        gerar_niveis(args.origem, args.destino)
+        logger.info("Processo concluído com sucesso!")
+    except Exception as e:
+        logger.error(f"Erro durante a execução: {e}")
+        raise
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Script para gerar o GeoJSON das rodovias federais a partir dos acidentes
+
+Para cada par (UF, BR), os acidentes são ordenados pelo km e suas coordenadas
+usadas para aproximar o traçado da rodovia (veja tracar_rodovia em
+backend/app/utils/geo.py): agrupamento por faixas de km, remoção de pontos
+fora da curva e simplificação por Douglas–Peucker.
+
+O resultado é gravado em backend/static/geo/rodovias.geojson, com as feições
+ordenadas por UF e um índice "indice" (UF -> [início, fim] na lista de
+feições), usado pelo backend para montar os recortes por UF na inicialização.
+
+Uso:
+    python gerar_rodovias_geojson.py [--ano 2023] [--min-acidentes 20]
+"""
+import os
+import sys
+import json
+import argparse
+import logging
+from datetime import datetime
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sqlalchemy import select
+from backend.app.db.database import engine
+from backend.app.db.models import Acidente
+from backend.app.utils.geo import tracar_rodovia
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('geojson_rodovias')
+
+# Pasta dos GeoJSON servidos pelo backend
+GEO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend", "static", "geo")
+
+def carregar_coordenadas(ano: int = None) -> pd.DataFrame:
+    """
+    Lê do banco as coordenadas dos acidentes com km informado.
+
+    Args:
+        ano: Ano específico, ou None para todos os anos
+
+    Returns:
+        DataFrame com uf, br, km, latitude e longitude
+    """
+    query = select(Acidente.uf, Acidente.br, Acidente.km, Acidente.latitude, Acidente.longitude) \
+        .where(Acidente.uf.isnot(None), Acidente.br.isnot(None), Acidente.km.isnot(None),
+               Acidente.latitude.isnot(None), Acidente.longitude.isnot(None))
+    if ano:
+        query = query.where(Acidente.ano == ano)
+
+    with engine.connect() as conexao:
+        return pd.read_sql(query, conexao)
+
+def gerar_geojson(df: pd.DataFrame, min_acidentes: int = 20) -> dict:
+    """
+    Monta a FeatureCollection com o traçado aproximado de cada (UF, BR).
+
+    Args:
+        df: Coordenadas dos acidentes
+        min_acidentes: Mínimo de acidentes para traçar uma rodovia
+
+    Returns:
+        FeatureCollection ordenada por UF e BR, com o índice por UF
+    """
+    features = []
+    indice = {}
+
+    for (uf, br), grupo in df.groupby(["uf", "br"], sort=True):
+        if len(grupo) < min_acidentes:
+            continue
+
+        partes = tracar_rodovia(grupo["km"].values, grupo["latitude"].values, grupo["longitude"].values)
+        if not partes:
+            continue
+
+        if len(partes) == 1:
+            geometria = {"type": "LineString", "coordinates": partes[0]}
+        else:
+            geometria = {"type": "MultiLineString", "coordinates": partes}
+
+        inicio = indice.get(uf, [len(features)])[0]
+        features.append({
+            "type": "Feature",
+            "properties": {
+                "uf": uf,
+                "br": br,
+                "nome": f"BR-{br}",
+                "km_inicial": round(float(grupo["km"].min()), 1),
+                "km_final": round(float(grupo["km"].max()), 1),
+                "total_acidentes": int(len(grupo)),
+            },
+            "geometry": geometria,
+        })
+        indice[uf] = [inicio, len(features)]
+
+    return {
+        "type": "FeatureCollection",
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "indice": indice,
+        "features": features,
+    }
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Gera o GeoJSON das rodovias federais a partir dos acidentes")
+    parser.add_argument("--ano", type=int, help="Usar apenas os acidentes de um ano")
+    parser.add_argument("--min-acidentes", type=int, default=20, help="Mínimo de acidentes por (UF, BR)")
+    parser.add_argument("--destino", default=os.path.join(GEO_DIR, "rodovias.geojson"), help="Arquivo de saída")
+    args = parser.parse_args()
+
+    try:
+        df = carregar_coordenadas(args.ano)
+        logger.info(f"{len(df)} acidentes com coordenadas e km")
+
+        geojson = gerar_geojson(df, args.min_acidentes)
+        with open(args.destino, "w", encoding="utf-8") as f:
+            json.dump(geojson, f, ensure_ascii=False, separators=(",", ":"))
+
+        logger.info(f"{len(geojson['features'])} rodovias em {len(geojson['indice'])} UFs: "
+                    f"{os.path.getsize(args.destino) / 1024:.0f} KB -> {args.destino}")
+        logger.info("Processo concluído com sucesso!")
+    except Exception as e:
+        logger.error(f"Erro durante a execução: {e}")
+        raise
+
+if __name__ == "__main__":
+    main()
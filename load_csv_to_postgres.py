@@ -77,6 +77,15 @@ def create_tables(engine):
             )
             """))
             
+            # Versão dos dados de cada tabela, usada pelos caches da API
+            conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS versao_dados (
+                tabela VARCHAR PRIMARY KEY,
+                versao INTEGER NOT NULL DEFAULT 0,
+                atualizado_em TIMESTAMP
+            )
+            """))
+            
             conn.commit()
             logger.info("Tabelas criadas com sucesso!")
     except SQLAlchemyError as e:
@@ -187,6 +196,13 @@ def process_csv(file_path):
         logger.error(f"Erro ao processar o arquivo CSV: {e}")
         raise
 
+def registrar_alteracao(conn, tabela="acidentes"):
+    """Incrementa a versão dos dados da tabela (veja init_db.registrar_alteracao)"""
+    conn.execute(text("""
+    INSERT INTO versao_dados (tabela, versao, atualizado_em) VALUES (:tabela, 1, NOW())
+    ON CONFLICT (tabela) DO UPDATE SET versao = versao_dados.versao + 1, atualizado_em = NOW()
+    """), {"tabela": tabela})
+
 def load_to_postgres(df, engine, batch_size=5000):
     """Carrega dados para PostgreSQL"""
     try:
@@ -200,6 +216,7 @@ def load_to_postgres(df, engine, batch_size=5000):
                 choice = input().lower()
                 if choice == 's':
                     conn.execute(text("TRUNCATE TABLE acidentes RESTART IDENTITY"))
+                    registrar_alteracao(conn)
                     conn.commit()
                     logger.info("Tabela limpa.")
                 else:
@@ -217,6 +234,10 @@ def load_to_postgres(df, engine, batch_size=5000):
             
             logger.info(f"Carregados registros {i+1} até {end} de {total_rows}")
         
+        with engine.connect() as conn:
+            registrar_alteracao(conn)
+            conn.commit()
+        
         logger.info("Carga concluída com sucesso!")
     except SQLAlchemyError as e:
         logger.error(f"Erro ao carregar dados para PostgreSQL: {e}")
@@ -55,10 +55,16 @@ def create_tables():
             uso_solo TEXT,
             pessoas INTEGER,
             classificacao_acidente TEXT,
-            sentido_via TEXT
+            sentido_via TEXT,
+            ano INTEGER,
+            hora INTEGER GENERATED ALWAYS AS (CAST(substr(horario, 1, 2) AS INTEGER)) VIRTUAL,
+            amostra REAL
         )
         """)
         
+        # Atualizar bancos criados antes das colunas derivadas
+        migrar_colunas_derivadas(cursor)
+        
         # Criar tabela para trechos perigosos
         cursor.execute("""
         CREATE TABLE IF NOT EXISTS trechos_perigosos (
@@ -87,6 +93,42 @@ def create_tables():
         logger.error(f"Erro ao criar tabelas: {e}")
         raise
 
+def migrar_colunas_derivadas(cursor):
+    """Adiciona as colunas ano, hora e amostra em tabelas de acidentes criadas por versões anteriores"""
+    cursor.execute("PRAGMA table_xinfo(acidentes)")
+    colunas = [row[1] for row in cursor.fetchall()]
+    
+    if 'ano' not in colunas:
+        logger.info("Adicionando coluna ano à tabela de acidentes...")
+        cursor.execute("ALTER TABLE acidentes ADD COLUMN ano INTEGER")
+        cursor.execute("UPDATE acidentes SET ano = CAST(strftime('%Y', data) AS INTEGER)")
+    
+    if 'hora' not in colunas:
+        logger.info("Adicionando coluna hora à tabela de acidentes...")
+        cursor.execute("""
+        ALTER TABLE acidentes ADD COLUMN 
+            hora INTEGER GENERATED ALWAYS AS (CAST(substr(horario, 1, 2) AS INTEGER)) VIRTUAL
+        """)
+    
+    if 'amostra' not in colunas:
+        logger.info("Adicionando coluna amostra à tabela de acidentes...")
+        cursor.execute("ALTER TABLE acidentes ADD COLUMN amostra REAL")
+        # random() retorna um inteiro de 64 bits; normalizar para [0, 1)
+        cursor.execute("UPDATE acidentes SET amostra = random() / 18446744073709551616.0 + 0.5")
+    
+    if not {'ano', 'hora', 'amostra'}.issubset(colunas):
+        criar_indices_derivados(cursor)
+
+def criar_indices_derivados(cursor):
+    """Cria os índices das colunas derivadas ano, hora e amostra"""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_acidentes_hora ON acidentes (hora)")
+    # A coluna amostra fica por último para que os filtros por UF e ano já
+    # devolvam as linhas na ordem da chave de amostragem
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_acidentes_amostra ON acidentes (amostra)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_acidentes_uf_amostra ON acidentes (uf, amostra)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_acidentes_ano_amostra ON acidentes (ano, amostra)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_acidentes_uf_ano_amostra ON acidentes (uf, ano, amostra)")
+
 def process_csv(file_path):
     """Processa o CSV e retorna um DataFrame"""
     logger.info(f"Carregando dados do arquivo: {file_path}")
@@ -102,7 +144,7 @@ def process_csv(file_path):
         if 'data' in df.columns:
             df['data'] = pd.to_datetime(df['data'], errors='coerce')
         
-        # Extrair ano
+        # Extrair ano (armazenado como coluna inteira indexada)
         if 'data' in df.columns:
             df['ano'] = df['data'].dt.year
         
@@ -177,6 +219,9 @@ def process_csv(file_path):
             if col in df.columns and len(df[col].dropna()) > 0:
                 df[col] = df[col].fillna(df[col].mode()[0] if not df[col].empty else 'DESCONHECIDO')
         
+        # Chave aleatória fixa para amostragem reprodutível dos pontos do mapa
+        df['amostra'] = np.random.default_rng(42).random(len(df))
+        
         # Converter data para string
         if 'data' in df.columns:
             df['data'] = df['data'].dt.strftime('%Y-%m-%d')
@@ -257,6 +302,9 @@ def load_to_sqlite(df, force_reload=True, batch_size=1000):
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_acidentes_data ON acidentes (data)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_acidentes_causa ON acidentes (causa_acidente)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_acidentes_tipo ON acidentes (tipo_acidente)")
+        # Índice de cobertura para o agrupamento único do endpoint /api/v1/estatisticas
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_acidentes_causa_tipo ON acidentes (causa_acidente, tipo_acidente, feridos, mortos)")
+        criar_indices_derivados(cursor)
         conn.commit()
         
         conn.close()
@@ -303,7 +351,7 @@ def gerar_trechos_perigosos(ano=None, force_reload=True):
         # Obter combinações de UF/BR
         query = "SELECT DISTINCT uf, br FROM acidentes WHERE uf IS NOT NULL AND br IS NOT NULL"
         if ano:
-            query += f" AND strftime('%Y', data) = '{ano}'"
+            query += f" AND ano = {int(ano)}"
         
         uf_br_result = cursor.execute(query).fetchall()
         
@@ -322,8 +370,8 @@ def gerar_trechos_perigosos(ano=None, force_reload=True):
             params = [uf, br]
             
             if ano:
-                acidente_query += f" AND strftime('%Y', data) = ?"
-                params.append(str(ano))
+                acidente_query += " AND ano = ?"
+                params.append(int(ano))
             
             acidentes = cursor.execute(acidente_query, params).fetchall()
             
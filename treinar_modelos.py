@@ -0,0 +1,86 @@
+"""
+Script para treinar os modelos de previsão e gravá-los no armazém de modelos
+
+Lê o CSV de acidentes (o mesmo usado pela API, em DATA_DIR), treina os modelos
+de tendências (um modelo sazonal para o Brasil, cada UF, as rodovias com mais
+acidentes e cada tipo de acidente, em paralelo entre os núcleos) e grava uma
+nova versão do registro em MODELOS_DIR (padrão: backend/modelos), com os
+metadados do treinamento: versão dos dados, features, período, segmentos e
+métricas de validação. Treina também o classificador de acidentes fatais
+usado pela calculadora de risco (gradient boosting exportado para arrays
+NumPy), gravado como o modelo "fatal". A API apenas carrega a versão atual na inicialização;
+nenhum modelo é treinado durante as requisições.
+
+Uso:
+    python treinar_modelos.py [--modelos-dir backend/modelos] [--top-brs 30] [--processos 4]
+"""
+import os
+import sys
+import json
+import argparse
+import logging
+import time
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from backend.app.ml.armazem import ArmazemModelos
+from backend.app.ml.classificador import treinar_classificador_fatal
+from backend.app.ml.treinamento import TOP_BRS, treinar_registro_tendencias, versao_dados
+from backend.app.core.config import settings
+from backend.app.utils.data_loader import DataLoader
+
+# Configurar logging
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('treinar_modelos')
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Treina os modelos de previsão e os grava no armazém de modelos")
+    parser.add_argument("--modelos-dir", default=settings.MODELOS_DIR, help="Pasta do armazém de modelos")
+    parser.add_argument("--top-brs", type=int, default=TOP_BRS, help="Rodovias com modelo próprio")
+    parser.add_argument("--processos", type=int, help="Processos de treinamento (padrão: número de CPUs)")
+    args = parser.parse_args()
+
+    try:
+        loader = DataLoader()
+        inicio = time.perf_counter()
+        df = loader._load_data_sync()
+        logger.info(f"{len(df)} acidentes carregados em {time.perf_counter() - inicio:.1f} s")
+
+        armazem = ArmazemModelos(args.modelos_dir)
+        versao_csv = versao_dados(loader.file_path)
+
+        inicio = time.perf_counter()
+        registro, metadados = treinar_registro_tendencias(df, args.top_brs, args.processos)
+        metadados.update({
+            "versao_dados": versao_csv,
+            "linhas": int(len(df)),
+            "duracao_treinamento_s": round(time.perf_counter() - inicio, 2),
+        })
+        versao = armazem.salvar("tendencias", registro, metadados)
+
+        logger.info(f"{len(registro)} modelos treinados em {metadados['duracao_treinamento_s']} s: "
+                    f"{json.dumps(metadados['segmentos'])}")
+        logger.info(f"Modelo 'tendencias' versão {versao} (dados {versao_csv}) gravado em {args.modelos_dir}")
+        logger.info(f"Métricas: {json.dumps(metadados['metricas'], ensure_ascii=False)}")
+
+        inicio = time.perf_counter()
+        classificador, metadados = treinar_classificador_fatal(df)
+        metadados.update({
+            "versao_dados": versao_csv,
+            "linhas": int(len(df)),
+            "duracao_treinamento_s": round(time.perf_counter() - inicio, 2),
+        })
+        versao = armazem.salvar("fatal", classificador, metadados)
+
+        logger.info(f"Classificador de acidentes fatais ({metadados['nos']} nós) treinado em "
+                    f"{metadados['duracao_treinamento_s']} s")
+        logger.info(f"Modelo 'fatal' versão {versao} (dados {versao_csv}) gravado em {args.modelos_dir}")
+        logger.info(f"Métricas: {json.dumps(metadados['metricas'], ensure_ascii=False)}")
+        logger.info("Processo concluído com sucesso!")
+    except Exception as e:
+        logger.error(f"Erro durante a execução: {e}")
+        raise
+
+if __name__ == "__main__":
+    main()